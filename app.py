@@ -1,16 +1,32 @@
 # app.py
 
+import os
+
 from dash import Dash
+from flask_caching import Cache
 import dash_bootstrap_components as dbc
 
 FONT_AWESOME = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.1/css/all.min.css"
 
 external_stylesheets = [dbc.themes.SOLAR, FONT_AWESOME]
 
+# Component JS (e.g. the plotly.js bundle behind dcc.Graph) is loaded asynchronously, only once it is rendered
 app = Dash(__name__, 
            external_stylesheets=external_stylesheets,
-           suppress_callback_exceptions=True
+           suppress_callback_exceptions=True,
+           eager_loading=False
            )
 
 app.title = 'Christofk_Grapha'
 server = app.server
+
+# Server-side cache for the uploaded DataFrames; the dcc.Store components only hold the cache keys.
+# A new upload overwrites the entry of its store, but a page reload or a new tab starts with empty stores
+# and new keys, leaving the previous entries behind. Entries therefore expire a day after they were written
+# (a missing entry is reported like missing data), and the threshold bounds the number of files in between.
+cache = Cache(server, config={
+    'CACHE_TYPE': 'FileSystemCache',
+    'CACHE_DIR': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache-directory'),
+    'CACHE_DEFAULT_TIMEOUT': 86400,
+    'CACHE_THRESHOLD': 1000
+})
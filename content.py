@@ -3,7 +3,7 @@
 from dash import html, dcc
 
 from layout.main import get_main_layout
-from layout.storage import build_storage_components
+from layout.storage import STORAGE_COMPONENTS
 from layout.modals import build_modal_components
 from layout.tabs import get_tabs_parent
 
@@ -19,7 +19,8 @@ def create_layout():
             
             *build_modal_components(),
             
-            *build_storage_components(),
+            # All dcc.Store components grouped in a single container
+            html.Div(id='storage-container', children=list(STORAGE_COMPONENTS)),
             
             get_main_layout(),
             
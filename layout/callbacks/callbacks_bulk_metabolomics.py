@@ -1,6 +1,5 @@
 # callbacks_bulk_metabolomics
 
-import io
 import pandas as pd
 import numpy as np
 import dash_bootstrap_components as dbc
@@ -8,6 +7,7 @@ from dash.dependencies import Input, Output, State
 from dash import html, dcc, no_update, callback_context
 
 from app import app
+from layout.storage import get_cached_dataframe
 from layout.toast import generate_toast
 from layout.utilities_figure import normalize_met_pool_data, group_met_pool_data, generate_single_met_iso_figure, add_p_value_annotations_iso, generate_single_met_pool_figure, add_p_value_annotations_pool, compile_met_pool_ratio_data, generate_corrected_pvalues
 
@@ -45,10 +45,10 @@ def display_met_data(n_clicks,
     Parameters:
     n_clicks : int
         Number of times the generate-metabolomics button has been clicked.
-    pool_data : json
-        JSON data from the pooled metabolite data.
-    iso_data : json
-        JSON data from the isotopologue data.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
+    iso_data : str
+        Cache key of the isotopologue data DataFrame in the server-side cache.
     met_classes : dict
         User-selected metabolite classes.
     met_normalization : dict
@@ -82,22 +82,23 @@ def display_met_data(n_clicks,
         # Validation: Check if necessary user inputs are provided
         # Each validation step returns a toast message if the validation fails
 
-        # Validate the presence of pool data
-        if pool_data is None:
+        # Validate the presence of pool data, also in the server-side cache
+        df_pool = get_cached_dataframe(pool_data)
+        if df_pool is None:
             return no_update, generate_toast("error", 
                                              "Error", 
                                              "Upload a valid metabolomics file.")
         
-        pool_json_file = io.StringIO(pool_data)
-        df_pool = pd.read_json(pool_json_file, orient='split')
-        
         # Initialize bool variable to check if isotopologue data is present
         df_iso = None
         
         # Reas isotopologue data if available
         if iso_data is not None:
-            iso_json_file = io.StringIO(iso_data)
-            df_iso = pd.read_json(iso_json_file, orient='split')
+            df_iso = get_cached_dataframe(iso_data)
+            if df_iso is None:
+                return no_update, generate_toast("error", 
+                                                 "Error", 
+                                                 "No uploaded isotopologue (labelling) data detected.")
             
             iso_present = True
         else:
@@ -7,6 +7,7 @@ from dash import html, dcc, no_update, callback_context
 import base64
 
 from app import app
+from layout.storage import get_cached_dataframe
 from layout.config import normalization_preselected, df_met_group_list
 from layout.toast import generate_toast
 from layout.utilities_download import get_download_df_normalized_pool, get_download_df_iso, get_download_df_lingress, perform_two_sided_ttest_download, generate_corrected_pvalues_download, sort_pvalue_df_cols
@@ -29,12 +30,12 @@ def generate_download_container_data_type(n_clicks, pool_data, iso_data, lin_dat
     ----------
     n_clicks : int
         Number of times the modal open button has been clicked.
-    pool_data : json
-        JSON-formatted string containing the pool data DataFrame.
-    iso_data : json
-        JSON-formatted string containing the isotopologue data DataFrame.
-    lin_data : json
-        JSON-formatted string containing the lingress data DataFrame.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
+    iso_data : str
+        Cache key of the isotopologue data DataFrame in the server-side cache.
+    lin_data : str
+        Cache key of the lingress data DataFrame in the server-side cache.
 
     Returns:
     -------
@@ -74,8 +75,8 @@ def toggle_lingress_checkbox(pool_checked, lin_data):
     ----------
     pool_checked : bool
         Indicates if the Pool Data checkbox is checked.
-    lin_data : json
-        JSON-formatted string containing the lingress data DataFrame.
+    lin_data : str
+        Cache key of the lingress data DataFrame in the server-side cache.
 
     Returns:
     -------
@@ -129,8 +130,8 @@ def generate_download_container_normalization(n_clicks, pool_data):
     ----------
     n_clicks : int
         Number of times the modal open button has been clicked.
-    pool_data : json
-        JSON-formatted string containing the pool data DataFrame.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
 
     Returns:
     -------
@@ -142,7 +143,9 @@ def generate_download_container_normalization(n_clicks, pool_data):
         # If the button has not been clicked yet, do not generate the normalization dropdown
         raise PreventUpdate
 
-    disabled = not pool_data
+    # Read the pool data from the server-side cache, a missing entry is handled like no uploaded data
+    df_pool = get_cached_dataframe(pool_data)
+    disabled = df_pool is None
 
     placeholder_message = html.Div(
         'Please upload a metabolomics data file to populate the normalization options.',
@@ -152,13 +155,9 @@ def generate_download_container_normalization(n_clicks, pool_data):
     options = []
     preselected_options = []
 
-    if pool_data:
+    if df_pool is not None:
         strings_to_check = normalization_preselected
 
-        # Read the pool data into a pandas DataFrame
-        pool_json_file = io.StringIO(pool_data)
-        df_pool = pd.read_json(pool_json_file, orient='split')
-
         # Loop through each keyword and each compound to identify matching options
         for string in strings_to_check:
             for compound in df_pool['Compound'].values:
@@ -504,16 +503,18 @@ def download_sheet_w_options(download_config, filename, pool_data, iso_data, lin
     else:
         grouped_samples = 'all'
 
+    # Normalized pool data, built at most once and shared by the pool, lingress and p-value sheets
+    df_download_normalized_pool = None
+
     # Initialize an Excel writer
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
         # Check if pool data is selected and available
         if 'download-pool' in selected_data_types and selected_data_types['download-pool']:
-            if pool_data is None:
+            df_download_pool = get_cached_dataframe(pool_data)
+            if df_download_pool is None:
                 return generate_toast("error", "Error", "No uploaded pool data."), no_update
 
-            pool_json_file = io.StringIO(pool_data)
-            df_download_pool = pd.read_json(pool_json_file, orient='split')
             # Proceed with generating the pool data dataframe
             df_download_normalized_pool = get_download_df_normalized_pool(df_download_pool, met_classes, normalization_list, grouped_samples, met_ratios)
 
@@ -523,31 +524,32 @@ def download_sheet_w_options(download_config, filename, pool_data, iso_data, lin
             
         # Check if iso data is selected and available
         if 'download-iso' in selected_data_types and selected_data_types['download-iso']:
-            if iso_data is None:
+            df_iso = get_cached_dataframe(iso_data)
+            if df_iso is None:
                 return generate_toast("error", "Error", "No uploaded iso data."), no_update
 
-            iso_json_file = io.StringIO(iso_data)
-            df_iso = pd.read_json(iso_json_file, orient='split')
             # Proceed with generating the iso data dataframe
             df_download_iso = get_download_df_iso(df_iso, met_classes)
             df_download_iso.to_excel(writer, sheet_name='Normalized', index=False)
 
         # Check if lingress data is selected and available
         if 'download-lingress' in selected_data_types and selected_data_types['download-lingress']:
-            if lingress_data is None:
-                return generate_toast("error", "Error", "No uploaded lingress data."), no_update
+            df_download_pool = get_cached_dataframe(pool_data)
+            if df_download_pool is None:
+                return generate_toast("error", "Error", "No uploaded pool data."), no_update
 
-            lingress_json_file = io.StringIO(lingress_data)
+            df_download_lingress = get_cached_dataframe(lingress_data)
+            if df_download_lingress is None:
+                return generate_toast("error", "Error", "No uploaded lingress data."), no_update
 
-            pool_json_file = io.StringIO(pool_data)
-            df_download_pool = pd.read_json(pool_json_file, orient='split')
-            
-            df_download_lingress = pd.read_json(lingress_json_file, orient='split')
+            # Normalize the pool data only once for all variables, reusing the pool sheet's data if it was built
+            if df_download_normalized_pool is None:
+                df_download_normalized_pool = get_download_df_normalized_pool(df_download_pool, met_classes, normalization_list, grouped_samples, met_ratios)
             # Get each possible variable for the lingress (can do more than one)
             for _, row in df_download_lingress.iterrows():
                 df_var_data = pd.DataFrame(row).T
                 # Proceed with generating the lingress data dataframe
-                df_download_lingress_stats = get_download_df_lingress(df_var_data, df_download_pool, met_classes, normalization_list, grouped_samples, met_ratios)
+                df_download_lingress_stats = get_download_df_lingress(df_var_data, df_download_pool, met_classes, normalization_list, grouped_samples, met_ratios, df_download_normalized_pool)
                 df_download_lingress_stats.to_excel(writer, sheet_name=f'Lingress Data {row["Variable"]}', index=False)
 
 
@@ -583,8 +585,9 @@ def download_sheet_w_options(download_config, filename, pool_data, iso_data, lin
             if 'download-iso' in selected_data_types and selected_data_types['download-iso']:
                 pass
 
-    # Save the Excel file to BytesIO buffer
-    output.seek(0)
+    # Take the Excel file out of the BytesIO buffer and release the buffer before the
+    # file is base64 encoded for sending, so that only one copy of the workbook is held
     excel_data = output.getvalue()
+    output.close()
 
     return generate_toast("success", "Success", f"File {filename}.xlsx downloaded."), dcc.send_bytes(excel_data, f"{filename}.xlsx")
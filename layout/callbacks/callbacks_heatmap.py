@@ -1,14 +1,12 @@
 # callbacks_heatmap.py
 
-import plotly.utils
-import io
 import pandas as pd
-import json
 from plotly.graph_objects import Figure
 from dash.dependencies import Input, Output, State
 from dash import html, dcc, callback_context, no_update
 
 from app import app
+from layout.storage import get_cached_dataframe
 from layout.toast import generate_toast
 from layout.utilities_figure import normalize_met_pool_data, group_met_pool_data, generate_group_significance, transform_log2_and_adjust_control_data, generate_individual_heatmap, compile_met_pool_ratio_data
 
@@ -61,7 +59,6 @@ def update_heatmap_dropdown_options(grouped_samples):
 @app.callback(
 [
     Output('bulk-heatmap-plot-container', 'children'),
-    Output('store-bulk-heatmap-plot', 'data'),
     Output('toast-container', 'children', allow_duplicate=True)
 ],
     Input('generate-bulk-heatmap-plot', 'n_clicks'),
@@ -79,14 +76,13 @@ def update_heatmap_dropdown_options(grouped_samples):
 def display_bulk_heatmap_plot(n_clicks, pool_data, met_classes, met_normalization, met_groups, ctrl_group, settings, met_ratio_selection):
     '''
     Display the heatmap plot based on user-selected parameters and provided data. 
-    The function also stores a JSON representation of the plot for later use.
     
     Parameters:
     ----------
     n_clicks : int
         Number of times the 'Generate Heatmap Plot' button is clicked.
-    pool_data : dict
-        Data from the data pool.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
     met_classes : dict
         Selected metabolic classes for the bulk heatmap.
     met_normalization : dict
@@ -104,8 +100,6 @@ def display_bulk_heatmap_plot(n_clicks, pool_data, met_classes, met_normalizatio
     -------
     list
         A list of HTML Divs containing heatmap plots.
-    json
-        JSON representation of the created heatmap plots.
     '''
     
     ctx = callback_context
@@ -121,41 +115,39 @@ def display_bulk_heatmap_plot(n_clicks, pool_data, met_classes, met_normalizatio
     
     # Execute the function only if the generate-metabolomics button was clicked
     if triggered_id  == 'generate-bulk-heatmap-plot' and n_clicks > 0:
-        if pool_data is None:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Upload a valid metabolomics file.")
+        # Read the pool data from the server-side cache, a missing entry is handled like no uploaded data
+        df_pool = get_cached_dataframe(pool_data)
+        if df_pool is None:
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Upload a valid metabolomics file.")
             
         # Check if the user has selected a control group for the heatmap        
         if ctrl_group is None:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Select a control group for the heatmap.")
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Select a control group for the heatmap.")
 
         # Check if the user has selected any metabolite classes  and if not return an error toast
         if not met_classes or met_classes['selected_values'] is None:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Not selected metabolite classes. Refer to 'Select Metabolite Classes to be Displayed'.")
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Not selected metabolite classes. Refer to 'Select Metabolite Classes to be Displayed'.")
         
         # Check if the user has entered any sample groups  and if not return an error toast
         if not met_groups:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Not selected sample groups for grouping replicates. Refer to 'Group Sample Replicates for Data Analysis.'")
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Not selected sample groups for grouping replicates. Refer to 'Group Sample Replicates for Data Analysis.'")
         
         # Check if the user has selected the normalization variables and if not return an error toast
         if not met_normalization:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Not selected normalization variables for the data (possible to have none). Refer to 'Change Normalization Variables'.")
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Not selected normalization variables for the data (possible to have none). Refer to 'Change Normalization Variables'.")
         
 
 
-        # Reading and processing the data
-        pool_json_file = io.StringIO(pool_data)
-        df_pool = pd.read_json(pool_json_file, orient='split')
-
         # Further data processing steps involving grouping, normalization, and log2 transformation
         grouped_samples = {group: samples for group, samples in met_groups.items() if group and samples}
         normalization_list = met_normalization['selected_values']
@@ -208,20 +200,18 @@ def display_bulk_heatmap_plot(n_clicks, pool_data, met_classes, met_normalizatio
                 print(f"An issue occurred while generating the heatmap for pathway: {pathway_name}")
             
         
-        figures_json = json.dumps(heatmap_list, cls=plotly.utils.PlotlyJSONEncoder)
         
         if heatmap_list:
-            return heatmap_list, figures_json, no_update
+            return heatmap_list, no_update
         else:
-            return no_update, no_update, no_update
+            return no_update, no_update
 
-    return no_update, no_update, no_update
+    return no_update, no_update
 
 
 @app.callback(
 [
     Output('bulk-isotopologue-heatmap-plot-container', 'children'),
-    Output('store-bulk-isotopologue-heatmap-plot', 'data'),
     Output('toast-container', 'children', allow_duplicate=True)
 ],
     Input('generate-bulk-isotopologue-heatmap-plot', 'n_clicks'),
@@ -237,14 +227,13 @@ def display_bulk_isotopologue_heatmap_plot(n_clicks, iso_data, met_classes, met_
     '''
     Display the heatmap plot of isotopologue data if it is available in the uploaded data
     based on user-selected parameters and provided data. 
-    The function also stores a JSON representation of the plot for later use.
     
     Parameters:
     ----------
     n_clicks : int
         Number of times the 'Generate Heatmap Plot' button is clicked.
-    iso_data : dict
-        Isotopologue data from uploaded file.
+    iso_data : str
+        Cache key of the isotopologue data DataFrame in the server-side cache.
     met_classes : dict
         Selected metabolic classes for the bulk heatmap.
     met_groups : dict
@@ -256,8 +245,6 @@ def display_bulk_isotopologue_heatmap_plot(n_clicks, iso_data, met_classes, met_
     -------
     list
         A list of HTML Divs containing heatmap plots.
-    json
-        JSON representation of the created heatmap plots.
     '''
     
     ctx = callback_context
@@ -274,28 +261,26 @@ def display_bulk_isotopologue_heatmap_plot(n_clicks, iso_data, met_classes, met_
          # Execute the function only if the generate-bulk-isotopologue-heatmap button was clicked
         if triggered_id  == 'generate-bulk-isotopologue-heatmap-plot' and n_clicks > 0:
             
-            if iso_data is None:
-                return no_update, no_update, generate_toast("error", 
-                                                            "Error", 
-                                                            "No uploaded isopotologue (labelling) data detected.")
+            # Read the isotopologue data from the server-side cache, a missing entry is handled like no uploaded data
+            df_iso = get_cached_dataframe(iso_data)
+            if df_iso is None:
+                return no_update, generate_toast("error", 
+                                                 "Error", 
+                                                 "No uploaded isopotologue (labelling) data detected.")
     
             # Check if the user has selected any metabolite classes  and if not return an error toast
             if not met_classes or met_classes['selected_values'] is None:
-                return no_update, no_update, generate_toast("error", 
-                                                            "Error", 
-                                                            "Not selected metabolite classes. Refer to 'Select Metabolite Classes to be Displayed'.")
+                return no_update, generate_toast("error", 
+                                                 "Error", 
+                                                 "Not selected metabolite classes. Refer to 'Select Metabolite Classes to be Displayed'.")
         
             # Check if the user has entered any sample groups  and if not return an error toast
             if not met_groups:
-                return no_update, no_update, generate_toast("error", 
-                                                            "Error", 
-                                                            "Not selected sample groups for grouping replicates. Refer to 'Group Sample Replicates for Data Analysis.'")
+                return no_update, generate_toast("error", 
+                                                 "Error", 
+                                                 "Not selected sample groups for grouping replicates. Refer to 'Group Sample Replicates for Data Analysis.'")
 
 
-            # Reading and processing the data
-            iso_json_file = io.StringIO(iso_data)
-            df_iso = pd.read_json(iso_json_file, orient='split')
-            
             # Further data processing steps involving grouping, normalization, and log2 transformation
             grouped_samples = {group: samples for group, samples in met_groups.items() if group and samples}
             selected_met_classes = met_classes['selected_values']
@@ -353,15 +338,14 @@ def display_bulk_isotopologue_heatmap_plot(n_clicks, iso_data, met_classes, met_
                 else:
                     print(f"An issue occurred while generating the heatmap for pathway: {pathway_name}")
         
-            figures_json = json.dumps(heatmap_list, cls=plotly.utils.PlotlyJSONEncoder)
         
             if heatmap_list:
-                return heatmap_list, figures_json, no_update
+                return heatmap_list, no_update
         
             else:
-                return no_update, no_update, no_update
+                return no_update, no_update
 
-    return no_update, no_update, no_update
+    return no_update, no_update
             
             
 
@@ -369,7 +353,6 @@ def display_bulk_isotopologue_heatmap_plot(n_clicks, iso_data, met_classes, met_
 @app.callback(
 [
     Output('custom-heatmap-plot-container', 'children'),
-    Output('store-custom-heatmap-plot', 'data'),
     Output('toast-container', 'children', allow_duplicate=True)
 ],
     Input('generate-custom-heatmap-plot', 'n_clicks'),
@@ -386,14 +369,13 @@ def display_bulk_isotopologue_heatmap_plot(n_clicks, iso_data, met_classes, met_
 def display_custom_heatmap_plot(n_clicks, pool_data, met_normalization, met_groups, ctrl_group, custom_met_list, settings):
     '''
     Generate and display a custom heatmap plot based on user-selected metabolites and groups.
-    The function also stores a JSON representation of the plot for later use.
 
     Parameters:
     ----------
     n_clicks : int
         Number of times the 'Generate Heatmap Plot' button is clicked.
-    pool_data : JSON
-        Stored metabolomics pool data.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
     met_normalization : dict
         Selected normalization methods for the heatmap.
     met_groups : dict
@@ -409,8 +391,6 @@ def display_custom_heatmap_plot(n_clicks, pool_data, met_normalization, met_grou
     -------
     list
         A list of HTML Divs containing custom heatmap plots.
-    json
-        JSON representation of the created custom heatmap plots.
     '''
     
     # Get context to identify the triggering input
@@ -421,39 +401,38 @@ def display_custom_heatmap_plot(n_clicks, pool_data, met_normalization, met_grou
     
     # Execute the function only if the generate button is clicked and necessary data is available
     if triggered_id == 'generate-custom-heatmap-plot':
-        # Check if there is any uploaded valid metabolomics data        
-        if pool_data is None:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Upload a valid metabolomics file.")
+        # Check if there is any uploaded valid metabolomics data, also in the server-side cache
+        df_pool = get_cached_dataframe(pool_data)
+        if df_pool is None:
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Upload a valid metabolomics file.")
             
         # Check if the user has selected a control group for the heatmap        
         if ctrl_group is None:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Select a control group for the heatmap.")
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Select a control group for the heatmap.")
             
         # Check if the user has entered any sample groups  and if not return an error toast    
         if custom_met_list is None:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Enter at least one metabolite to the custom heatmap list.")  
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Enter at least one metabolite to the custom heatmap list.")  
         
         # Check if the user has entered any sample groups  and if not return an error toast
         if not met_groups:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Not selected sample groups for grouping replicates. Refer to 'Group Sample Replicates for Data Analysis.'")
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Not selected sample groups for grouping replicates. Refer to 'Group Sample Replicates for Data Analysis.'")
         
         # Check if the user has selected the normalization variables and if not return an error toast
         if not met_normalization:
-            return no_update, no_update, generate_toast("error", 
-                                                        "Error", 
-                                                        "Not selected normalization variables for the data (possible to have none). Refer to 'Change Normalization Variables'.")
+            return no_update, generate_toast("error", 
+                                             "Error", 
+                                             "Not selected normalization variables for the data (possible to have none). Refer to 'Change Normalization Variables'.")
         
         # Load and preprocess the data based on the provided states
-        pool_json_file = io.StringIO(pool_data)
-        df_pool = pd.read_json(pool_json_file, orient='split')
         grouped_samples = {group: samples for group, samples in met_groups.items() if group and samples}
         normalization_list = met_normalization['selected_values']
         ctrl_cols = grouped_samples[ctrl_group]
@@ -496,14 +475,11 @@ def display_custom_heatmap_plot(n_clicks, pool_data, met_normalization, met_grou
                 }
             ))
         
-        # Convert heatmap figure to json for storage
-        figures_json = json.dumps(heatmap_list, cls=plotly.utils.PlotlyJSONEncoder)
-        
-        # Return the generated heatmap elements and the stored JSON data
-        return heatmap_list, figures_json, no_update
+        # Return the generated heatmap elements
+        return heatmap_list, no_update
     
     # Prevent update if the generate button isn't clicked
-    return no_update, no_update, no_update
+    return no_update, no_update
         
 
 @app.callback(
@@ -519,8 +495,8 @@ def update_custom_heatmap_metabolite_list_options(pool_data):
 
     Parameters:
     ----------
-    pool_data : json
-        JSON-formatted string containing the metabolite pool data DataFrame.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
 
     Returns:
     -------
@@ -529,14 +505,13 @@ def update_custom_heatmap_metabolite_list_options(pool_data):
         representing the metabolites available for selection in the heatmap.
     '''
     
-    if pool_data is None:
+    # Fetching the DataFrame from the server-side cache
+    df_pool = get_cached_dataframe(pool_data)
+    
+    if df_pool is None:
         # If there's no data, returning an empty options list
         return []
     else:
-        # Converting the JSON string back to a DataFrame
-        pool_json_file = io.StringIO(pool_data)
-        df_pool = pd.read_json(pool_json_file, orient='split')
-        
         # Getting unique compounds from the DataFrame and sorting them in a case-insensitive manner
         unique_compounds = sorted(df_pool['Compound'].unique(), key=lambda x: x.lower())
         
@@ -1,13 +1,12 @@
 # callbacks_isotopologue_distribution.py
 
-import io
-import pandas as pd
 from plotly.graph_objects import Figure, Bar
 from dash import html, dcc, callback_context, no_update
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
 
 from app import app
+from layout.storage import get_cached_dataframe
 from layout.toast import generate_toast
 from layout.utilities_figure import generate_isotopologue_distribution_figure, add_p_value_annotations_iso_distribution, generate_corrected_pvalues, filter_and_order_isotopologue_data_by_met_class
 
@@ -25,8 +24,8 @@ def update_iso_distribution_dropdown_options(iso_data):
 
     Parameters:
     ----------
-    iso_data : json
-        JSON-formatted string containing the isotopologue data DataFrame.
+    iso_data : str
+        Cache key of the isotopologue data DataFrame in the server-side cache.
 
     Returns:
     -------
@@ -35,14 +34,13 @@ def update_iso_distribution_dropdown_options(iso_data):
         representing the metabolites available for selection in the isotopologue distribution.
     '''
     
-    if iso_data is None:
+    # Fetching the DataFrame from the server-side cache
+    df_iso = get_cached_dataframe(iso_data)
+    
+    if df_iso is None:
         # If there's no data, return an empty options list
         return []
     else:
-        # Converting the JSON string back to a DataFrame
-        iso_json_file = io.StringIO(iso_data)
-        df_iso = pd.read_json(iso_json_file, orient='split')
-        
         # Getting unique compounds from the DataFrame and sorting them in a case-insensitive manner
         unique_compounds = sorted(df_iso['Compound'].unique(), key=lambda x: x.lower())
         
@@ -76,8 +74,8 @@ def display_single_isotopologue_distribution_plot(n_clicks_single, iso_data, met
     ----------
     n_clicks_single : int
         Number of times the single compound button has been clicked.
-    iso_data : json
-        JSON-formatted string containing the isotopologue data DataFrame.
+    iso_data : str
+        Cache key of the isotopologue data DataFrame in the server-side cache.
     met_name : str
         Name of the selected metabolite from the dropdown.
     met_groups : dict
@@ -111,12 +109,10 @@ def display_single_isotopologue_distribution_plot(n_clicks_single, iso_data, met
         if met_name is None:
             return no_update, generate_toast("error", "Error", "No selected metabolite for isotopologue distribution plot.")
 
-        try:
-            # Read the isotopologue data from the JSON string
-            iso_json_file = io.StringIO(iso_data)
-            df_iso = pd.read_json(iso_json_file, orient='split')
-        except ValueError as e:
-            return no_update, generate_toast("error", "Error", "Failed to read isotopologue data.")
+        # Read the isotopologue data from the server-side cache
+        df_iso = get_cached_dataframe(iso_data)
+        if df_iso is None:
+            return no_update, generate_toast("error", "Error", "No uploaded isotopologue (labelling) data detected.")
 
         df_iso_met = df_iso[df_iso['Compound'] == met_name].fillna(0).reset_index(drop=True)
 
@@ -194,8 +190,8 @@ def display_all_isotopologue_distribution_plots(n_clicks_all, iso_data, met_grou
     ----------
     n_clicks_all : int
         Number of times the all compounds button has been clicked.
-    iso_data : json
-        JSON-formatted string containing the isotopologue data DataFrame.
+    iso_data : str
+        Cache key of the isotopologue data DataFrame in the server-side cache.
     met_groups : dict
         Dictionary containing the grouping of samples for analysis.
     met_classes : list
@@ -227,12 +223,10 @@ def display_all_isotopologue_distribution_plots(n_clicks_all, iso_data, met_grou
         if not met_groups:
             return no_update, generate_toast("error", "Error", "No selected sample groups for grouping replicates. Refer to 'Group Sample Replicates for Data Analysis.'")
 
-        try:
-            # Read the isotopologue data from the JSON string
-            iso_json_file = io.StringIO(iso_data)
-            df_iso = pd.read_json(iso_json_file, orient='split')
-        except ValueError as e:
-            return no_update, generate_toast("error", "Error", "Failed to read isotopologue data.")
+        # Read the isotopologue data from the server-side cache
+        df_iso = get_cached_dataframe(iso_data)
+        if df_iso is None:
+            return no_update, generate_toast("error", "Error", "No uploaded isotopologue (labelling) data detected.")
         
         # Filter and order the df_iso based on met_classes
         filtered_ordered_df, compound_metadata_df = filter_and_order_isotopologue_data_by_met_class(df_iso, met_classes['selected_values'])
@@ -1,14 +1,14 @@
 #callbacks_lingress.py
 
-import io
 import pandas as pd
-from dash import html, dcc, callback_context, no_update
+from dash import html, dcc, callback_context, no_update, Patch
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output, State, ALL
 
 from app import app
+from layout.storage import get_cached_dataframe
 from layout.toast import generate_toast
-from layout.utilities_figure import normalize_met_pool_data, group_met_pool_data, generate_single_lingress_plot, compile_met_pool_ratio_data
+from layout.utilities_figure import normalize_met_pool_data, group_met_pool_data, generate_single_lingress_plot, compile_met_pool_ratio_data, patch_figure_layout_settings
 
 
 @app.callback(
@@ -25,8 +25,8 @@ def update_lingress_dropdown_options(lingress_data):
     
         Parameters:
     ----------
-    lingress_data : json
-        JSON-formatted string containing the lingress data DataFrame.
+    lingress_data : str
+        Cache key of the linear regression data DataFrame in the server-side cache.
 
     Returns:
     -------
@@ -35,12 +35,13 @@ def update_lingress_dropdown_options(lingress_data):
         variables available for selection in the linear regression plotting.
     '''
 
-    if lingress_data is None:
+    # Read the linear regression data from the server-side cache
+    df_lingress = get_cached_dataframe(lingress_data)
+    
+    if df_lingress is None:
         return []
     
     else:
-        lingress_json_file = io.StringIO(lingress_data)
-        df_lingress = pd.read_json(lingress_json_file, orient='split')
         unique_variables = sorted(df_lingress['Variable'].unique(), key=lambda x: x.lower())
         options = [{'label': variable, 'value': variable} for variable in unique_variables]
         
@@ -86,8 +87,8 @@ def display_lingress_plots(n_clicks,
     ----------
     n_clicks : int
         Number of times the button has been clicked.
-    lingress_data : json
-        JSON-formatted string containing the linear regression data DataFrame.
+    lingress_data : str
+        Cache key of the linear regression data DataFrame in the server-side cache.
     var_name : str
         Name of the selected variable from the linear regression.
     met_groups : dict
@@ -110,13 +111,15 @@ def display_lingress_plots(n_clicks,
 
     if triggered_id == 'generate-lingress' and n_clicks > 0:
 
-        # Validate the presence of pool data
-        if pool_data is None:
+        # Validate the presence of pool data, also in the server-side cache
+        df_pool = get_cached_dataframe(pool_data)
+        if df_pool is None:
             return no_update, generate_toast("error", 
                                              "Error", 
                                              "Upload a valid metabolomics file.")
             
-        if lingress_data is None:
+        df_lingress = get_cached_dataframe(lingress_data)
+        if df_lingress is None:
             return no_update, generate_toast("error", "Error", "No uploaded linear regression variable data detected.")
         
         if var_name is None:
@@ -140,13 +143,8 @@ def display_lingress_plots(n_clicks,
                                              "Error", 
                                              "Not selected sample groups for grouping replicates. Refer to 'Group Sample Replicates for Data Analysis.'")
         
-        pool_json_file = io.StringIO(pool_data)
-        df_pool = pd.read_json(pool_json_file, orient='split')
         df_pool = df_pool.replace(0, 1000)  # Replace zeros with 1000
         
-        lingress_json_file = io.StringIO(lingress_data)
-        df_lingress = pd.read_json(lingress_json_file, orient='split')
-        
         # Filter the data for the selected external variable
         df_var = df_lingress[df_lingress['Variable'] == var_name].fillna(0).reset_index(drop=True)
 
@@ -203,6 +201,7 @@ def display_lingress_plots(n_clicks,
 
                 # Create Graph component for the plot
                 plot_component = dcc.Graph(
+                                    id={'type': 'lingress-plot', 'index': lingress_filename},
                                     figure=fig,
                                     config={
                                         'toImageButtonOptions': {
@@ -233,3 +232,44 @@ def display_lingress_plots(n_clicks,
     else:
         return no_update, no_update
 
+
+@app.callback(
+    Output({'type': 'lingress-plot', 'index': ALL}, 'figure'),
+    Input('store-settings-lingress', 'data'),
+    prevent_initial_call=True
+)
+def patch_lingress_plot_settings(settings):
+    '''
+    Apply updated size, font, datapoint, regression line and statistics annotation settings to the displayed
+    linear regression plots by sending only the changed figure attributes instead of regenerating every plot.
+
+    Parameters:
+    ----------
+    settings : dict
+        The updated linear regression plot settings.
+
+    Returns:
+    -------
+    list
+        A partial figure update (dash.Patch) for each displayed linear regression plot.
+    '''
+    
+    num_plots = len(callback_context.outputs_list)
+    if not settings or num_plots == 0:
+        return [no_update] * num_plots
+
+    patched_fig = patch_figure_layout_settings(Patch(), settings)
+    
+    # First trace holds the datapoints and the second one the regression line
+    patched_fig['data'][0]['marker']['size'] = settings['datapoint_size']
+    patched_fig['data'][0]['marker']['color'] = settings['datapoint_color']
+    patched_fig['data'][1]['line']['width'] = settings['line_thickness']
+    patched_fig['data'][1]['line']['color'] = settings['line_color']
+    patched_fig['data'][1]['opacity'] = settings['line_opacity']
+    
+    # The statistics annotation is part of every plot and only shown when required
+    patched_fig['layout']['annotations'][0]['visible'] = settings.get('show_stats', False)
+    patched_fig['layout']['annotations'][0]['font']['family'] = settings['font_selector']
+    patched_fig['layout']['annotations'][0]['font']['size'] = settings['font_size']
+
+    return [patched_fig] * num_plots
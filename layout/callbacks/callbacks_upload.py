@@ -4,19 +4,23 @@ from dash.dependencies import Input, Output, State
 from dash import html
 
 from app import app
+from layout.storage import cache_dataframe
 from layout.utilities_security import process_pool_data, process_iso_data, process_lingress_data
 
 
 @app.callback(
     Output('store-data-pool', 'data'),
     Input('upload-data', 'contents'),
-    State('upload-data', 'filename')
+[
+    State('upload-data', 'filename'),
+    State('store-data-pool', 'data')
+]
 )
-def store_metabolomics_pool_data(contents, filename):
+def store_metabolomics_pool_data(contents, filename, current_pool_key):
     '''
     Process and store the metabolomics pool data from an uploaded file.
     This callback function takes the contents and filename of an uploaded file, processes the data 
-    using the `process_pool_data` function, and then stores the processed data in JSON format in a Dash Store component 
+    using the `process_pool_data` function, and then keeps the processed DataFrame in the server-side cache, storing only its key in a Dash Store component 
     for later use in the application.
 
     Parameters:
@@ -25,18 +29,20 @@ def store_metabolomics_pool_data(contents, filename):
         The content of the uploaded file, encoded as a base64 string.
     filename : str
         The name of the uploaded file.
+    current_pool_key : str
+        Cache key of the currently stored pool data, reused for the new upload.
 
     Returns:
     -------
     str
-        A JSON-formatted string representing the processed pool data, if the uploaded file contains data; 
+        The cache key of the processed pool data, if the uploaded file contains data; 
         returns None if the file is empty or not properly uploaded.
     '''
     
     # Check if the uploaded file has contents
     if contents:
-        # If there are contents, process the pool data and return the JSON representation
-        return process_pool_data(contents, filename)
+        # If there are contents, process the pool data and return its cache key
+        return cache_dataframe(process_pool_data(contents, filename), current_pool_key)
     
     # If there are no contents in the uploaded file, return None
     return None
@@ -48,38 +54,43 @@ def store_metabolomics_pool_data(contents, filename):
     Input('upload-data', 'contents'),
     Input('store-data-pool', 'data')
 ],  
-    State('upload-data', 'filename')
+[
+    State('upload-data', 'filename'),
+    State('store-data-iso', 'data')
+]
 )
-def store_metabolomics_iso_data(contents, stored_pool_data, filename):
+def store_metabolomics_iso_data(contents, stored_pool_data, filename, current_iso_key):
     '''
     Process and store the metabolomics isotopic data from an uploaded file.
     This callback function takes the contents and filename of an uploaded file and 
     previously stored pool data as inputs. It processes the isotopic data using the `process_iso_data` function and 
-    stores the processed data in JSON format in a Dash Store component for later use in the application.
+    keeps the processed DataFrame in the server-side cache, storing only its key in a Dash Store component for later use in the application.
 
     Parameters:
     ----------
     contents : str
         The content of the uploaded file, encoded as a base64 string.
     stored_pool_data : str
-        JSON-formatted string of the previously stored pool data.
+        Cache key of the previously stored pool data.
     filename : str
         The name of the uploaded file.
+    current_iso_key : str
+        Cache key of the currently stored isotopic data, reused for the new upload.
 
     Returns:
     -------
     str
-        A JSON-formatted string representing the processed isotopic data, if the uploaded file and stored pool data are valid; 
+        The cache key of the processed isotopic data, if the uploaded file and stored pool data are valid; 
         returns None if either the file is empty, not properly uploaded, or the pool data is not available.
     '''
     
     # Check if the uploaded file and stored pool data are present
     if contents and stored_pool_data:
-        # If both are present, process the isotopic data and return the JSON representation
-        return process_iso_data(contents, filename, stored_pool_data)
+        # If both are present, process the isotopic data and return its cache key
+        return cache_dataframe(process_iso_data(contents, filename, stored_pool_data), current_iso_key)
     
-    # If either the uploaded file or stored pool data is missing, return None
-    return None
+    # If either the uploaded file or stored pool data is missing, remove the previous isotopic data and return None
+    return cache_dataframe(None, current_iso_key)
 
 
 @app.callback(
@@ -88,39 +99,44 @@ def store_metabolomics_iso_data(contents, stored_pool_data, filename):
     Input('upload-data', 'contents'),
     Input('store-data-pool', 'data')
 ],  
-    State('upload-data', 'filename')
+[
+    State('upload-data', 'filename'),
+    State('store-data-lingress', 'data')
+]
 )
-def store_lingress_data(contents, stored_pool_data, filename):
+def store_lingress_data(contents, stored_pool_data, filename, current_lingress_key):
     '''
     Process and store external variable data for linear regression with metabolomics data.
     This callback function takes the contents and filename of an uploaded file and 
     previously stored pool data as inputs. It processes the external variable data using the `process_lingress_data` function and 
-    stores the processed data in JSON format in a Dash Store component for later use in the application.
+    keeps the processed DataFrame in the server-side cache, storing only its key in a Dash Store component for later use in the application.
 
     Parameters:
     ----------
     contents : str
         The content of the uploaded file, encoded as a base64 string.
     stored_pool_data : str
-        JSON-formatted string of the previously stored pool data.
+        Cache key of the previously stored pool data.
     filename : str
         The name of the uploaded file.
+    current_lingress_key : str
+        Cache key of the currently stored external variable data, reused for the new upload.
 
     Returns:
     -------
     str
-        A JSON-formatted string representing the processed external variable data for linear regression,
+        The cache key of the processed external variable data for linear regression,
         if the uploaded file and stored pool data are valid; 
         returns None if either the file is empty, not properly uploaded, or the pool data is not available.
     '''
     
     # Check if the uploaded file and stored pool data are present
     if contents and stored_pool_data:
-        # If both are present, process the external variable data and return the JSON representation
-        return process_lingress_data(contents, filename, stored_pool_data)
+        # If both are present, process the external variable data and return its cache key
+        return cache_dataframe(process_lingress_data(contents, filename, stored_pool_data), current_lingress_key)
     
-    # If either the uploaded file or stored pool data is missing, return None
-    return None
+    # If either the uploaded file or stored pool data is missing, remove the previous data and return None
+    return cache_dataframe(None, current_lingress_key)
 
 
 @app.callback(
@@ -145,11 +161,11 @@ def update_upload_status(stored_pool_data, stored_iso_data, stored_lingress_data
     Parameters:
     ----------
     stored_pool_data : str
-        JSON-formatted string representing the stored metabolomics pool data.
+        Cache key of the stored metabolomics pool data.
     stored_iso_data : str
-        JSON-formatted string representing the stored isotopologue data.
+        Cache key of the stored isotopologue data.
     stored_lingress_data : str
-        JSON-formatted string representing the stored linear regression data.
+        Cache key of the stored linear regression data.
     filename : str
         The name of the most recently uploaded file.
 
@@ -1,7 +1,5 @@
 # callbacks_user.py
 
-import io
-import pandas as pd
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State, ALL
 from dash.exceptions import PreventUpdate
@@ -9,7 +7,9 @@ from dash import html, dcc, no_update, callback_context
 import json
 
 from app import app
-from layout.config import normalization_preselected, metabolite_ratios_default
+from layout.storage import get_cached_dataframe
+from layout.config import normalization_preselected, metabolite_ratios_default, lingress_settings_default
+from layout.modals import get_settings_modal_lingress_body
 
 
 # Met classes callback functions
@@ -131,8 +131,8 @@ def generate_normalization_dropdown(pool_data):
 
     Parameters:
     ----------
-    pool_data : json
-        JSON-formatted string containing the metabolomics pool data.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
 
     Returns:
     -------
@@ -141,8 +141,11 @@ def generate_normalization_dropdown(pool_data):
         a placeholder message indicating the state of the data or options.
     '''
     
-    # Determine whether to disable the dropdown based on the presence of pool_data
-    disabled = not pool_data
+    # Read the pool data from the server-side cache, a missing entry is handled like no uploaded data
+    df_pool = get_cached_dataframe(pool_data)
+    
+    # Determine whether to disable the dropdown based on the presence of the pool data
+    disabled = df_pool is None
     
     # Placeholder message displayed when no data is uploaded
     placeholder_message = html.Div(
@@ -153,13 +156,9 @@ def generate_normalization_dropdown(pool_data):
     options = []  # List to store the dropdown options
     preselected_options = []  # List to store options that should be preselected
     
-    if pool_data:  # Check if pool_data is available
+    if df_pool is not None:  # Check if the pool data is available
         strings_to_check = normalization_preselected  # Keywords to identify relevant options
         
-        # Read the pool data into a pandas DataFrame
-        pool_json_file = io.StringIO(pool_data)
-        df_pool = pd.read_json(pool_json_file, orient='split')
-        
         # Loop through each keyword and each compound to identify matching options
         for string in strings_to_check:
             for compound in df_pool['Compound'].values:
@@ -229,8 +228,8 @@ def display_met_groups(pool_data):
 
     Parameters:
     ----------
-    pool_data : json
-        JSON-formatted string containing the stored data from the uploaded metabolomics file.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
 
     Returns:
     -------
@@ -238,18 +237,17 @@ def display_met_groups(pool_data):
         A list of HTML Div components, each containing labels and input fields for managing metabolic groups.
     '''
     
-    # Check if there's any data uploaded
-    if not pool_data:
+    # Read the pool data from the server-side cache
+    df_pool = get_cached_dataframe(pool_data)
+    
+    # Check if there's any data uploaded, a missing cache entry is handled like no uploaded data
+    if df_pool is None:
         # Return a placeholder message if there's no uploaded data
         return html.Div(
             "Please upload a metabolomics data file to display metabolic groups.",
             className='modal-placeholder-message'
         )
     
-    # Read the pool data into a DataFrame
-    pool_json_file = io.StringIO(pool_data)
-    df_pool = pd.read_json(pool_json_file, orient='split')
-    
     # Extract sample names from the DataFrame columns
     sample_names = df_pool.columns.tolist()[1:]
     
@@ -1273,12 +1271,44 @@ def store_settings_isotopologue_distribution(
     return no_update
 
 
+@app.callback(
+    Output('modal-settings-lingress-body', 'children'),
+    Input('change-settings-lingress', 'n_clicks'),
+    prevent_initial_call = True
+)
+def render_settings_lingress_body(n_clicks):
+    '''
+    Render the linear regression settings controls when the settings modal is opened for the first time.
+    The modal body is left empty in the initial layout, later openings keep the already rendered controls.
+    '''
+    
+    if n_clicks == 1:
+        return get_settings_modal_lingress_body()
+    
+    return no_update
+
+
 @app.callback(
     Output('store-settings-lingress', 'data'),
-[
+    Input('store-data-order', 'data'),
+    State('store-settings-lingress', 'data')
+)
+def initialize_settings_lingress(stored_data_order, current_settings):
+    '''
+    Store the default linear regression plot settings once the data order is available.
+    The settings controls are only rendered on the first opening of the settings modal, 
+    so the defaults are taken from the config instead of the modal components.
+    '''
+    
+    if stored_data_order is not None and current_settings is None:
+        return dict(lingress_settings_default)
+    
+    return no_update
+
+
+@app.callback(
+    Output('store-settings-lingress', 'data', allow_duplicate=True),
     Input('update-settings-lingress', 'n_clicks'),
-    Input('store-data-order', 'data')
-],
 [
     State('lingress-plot-height', 'value'),
     State('lingress-plot-width', 'value'),
@@ -1290,11 +1320,11 @@ def store_settings_isotopologue_distribution(
     State('lingress-line-color', 'value'),
     State('lingress-line-opacity', 'value'),
     State('lingress-show-stats-in-graph', 'value')
-]
+],
+    prevent_initial_call = True
 )
 def store_settings_lingress(
                     n_clicks,
-                    stored_data_order,
                     height,
                     width,
                     font_style,
@@ -1306,24 +1336,7 @@ def store_settings_lingress(
                     line_opacity,
                     show_stats):
     
-    if stored_data_order is not None and (n_clicks is None or n_clicks == 0):
-        # Store the initial settings
-        initial_settings = {
-            'height': height,
-            'width': width,
-            'font_selector': font_style if font_style else 'Arial',
-            'font_size': font_size,
-            'datapoint_size': datapoint_size,
-            'datapoint_color': datapoint_color,
-            'line_thickness': line_thickness,
-            'line_color': line_color,
-            'line_opacity': line_opacity,
-            'show_stats': True if show_stats == [1] else False
-        }
-        
-        return initial_settings
-    
-    elif n_clicks > 0:  # Update button has been clicked
+    if n_clicks > 0:  # Update button has been clicked
         
         # Update the settings with the current values
         new_settings = {
@@ -1345,97 +1358,62 @@ def store_settings_lingress(
     return no_update
 
 
-@app.callback(
-[
-    Output('normalization-display-container-bulk-heatmap', 'children'),
-    Output('normalization-display-container-custom-heatmap', 'children'),
-    Output('normalization-display-container-bulk-metabolomics', 'children'),
-    Output('normalization-display-container-volcano', 'children'),
-    Output('normalization-display-container-lingress', 'children')
-
-],
-[
-    Input('generate-bulk-heatmap-plot', 'n_clicks'),
-    Input('generate-custom-heatmap-plot', 'n_clicks'),
-    Input('generate-metabolomics', 'n_clicks'),
-    Input('generate-volcano-plot', 'n_clicks'),
-    Input('generate-lingress', 'n_clicks'),
-],
-    State('store-data-normalization', 'data'),
-    prevent_initial_call = True
-)
-def display_selected_normalization(bulk_heatmap, custom_heatmap, bulk_metabolomics, volcano, lingress, met_normalization):
+def display_selected_normalization(n_clicks, met_normalization):
     '''
-    Display selected normalization variables for various plots in a Dash application.
+    Display selected normalization variables for the plot of a single tab in a Dash application.
 
-    This callback function is activated by the click of any of the four specified buttons in the Dash app. 
-    It identifies which button was clicked and shows the chosen normalization variables for the relevant plot. 
+    One callback is registered per tab, so generating a plot only updates the normalization 
+    display of its own tab instead of re-rendering the displays of every tab.
 
     Parameters:
     ----------
-    bulk_heatmap : int
-        Number of clicks on the 'generate-bulk-heatmap-plot' button.
-    custom_heatmap : int
-        Number of clicks on the 'generate-custom-heatmap-plot' button.
-    bulk_metabolomics : int
-        Number of clicks on the 'generate-metabolomics' button.
-    volcano : int
-        Number of clicks on the 'generate-volcano-plot' button.
-    lingress : int
-        Number of clicks on the 'generate-lingress' button.
+    n_clicks : int
+        Number of clicks on the tab's generate plot button.
     met_normalization : dict
         A dictionary containing the 'selected_values' key with a list of selected normalization methods.
 
     Returns:
     -------
-    Tuple of Dash components
-        A tuple where each element corresponds to the content displayed in the respective 'normalization-display-container-*' component. 
-        The content is updated with the selected normalization methods for the corresponding plot.
+    dash.html.Div
+        The content displayed in the tab's 'normalization-display-container-*' component.
 
     Raises:
     -------
     PreventUpdate
-        If no button has been clicked or if no normalization method is selected.
+        If the button has not been clicked or if no normalization method is selected.
     '''
     
-    ctx = callback_context
-    
-    if not ctx.triggered:
+    if not n_clicks or met_normalization is None:
         raise PreventUpdate
     
-    else:
-        button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-        
-        if met_normalization is None:
-            raise PreventUpdate
-        
-        normalization_list = met_normalization['selected_values']
-        
-        if normalization_list == []:
-            normalization_display = "No selected normalization variables!"
-            
-        else:
-            normalization_display = "Data normalized by: " + ', '.join(normalization_list)
+    normalization_list = met_normalization['selected_values']
+    
+    if normalization_list == []:
+        normalization_display = "No selected normalization variables!"
         
-        # Define an empty default display for all outputs
-        default_display = html.Div()
-        # Create a display message wrapped in a Div
-        display_message = html.Div(normalization_display)
-
-        # Based on which button was clicked, return the message for the corresponding Div
-        if button_id == 'generate-bulk-heatmap-plot':
-            return display_message, default_display, default_display, default_display, default_display
-        elif button_id == 'generate-custom-heatmap-plot':
-            return default_display, display_message, default_display, default_display, default_display
-        elif button_id == 'generate-metabolomics':
-            return default_display, default_display, display_message, default_display, default_display
-        elif button_id == 'generate-volcano-plot':
-            return default_display, default_display, default_display, display_message, default_display
-        elif button_id == 'generate-lingress':
-            return default_display, default_display, default_display, default_display, display_message
-        else:
-            # If for some reason, the button_id doesn't match, raise PreventUpdate to avoid updating
-            raise PreventUpdate
+    else:
+        normalization_display = "Data normalized by: " + ', '.join(normalization_list)
+    
+    # Create a display message wrapped in a Div
+    return html.Div(normalization_display)
+
+
+# Generate plot buttons and the normalization display container of their tab
+normalization_display_tabs = [
+    ('generate-bulk-heatmap-plot', 'normalization-display-container-bulk-heatmap'),
+    ('generate-custom-heatmap-plot', 'normalization-display-container-custom-heatmap'),
+    ('generate-metabolomics', 'normalization-display-container-bulk-metabolomics'),
+    ('generate-volcano-plot', 'normalization-display-container-volcano'),
+    ('generate-lingress', 'normalization-display-container-lingress')
+]
+
+for button_id, container_id in normalization_display_tabs:
+    app.callback(
+        Output(container_id, 'children'),
+        Input(button_id, 'n_clicks'),
+        State('store-data-normalization', 'data'),
+        prevent_initial_call = True
+    )(display_selected_normalization)
         
         
 @app.callback(
@@ -1468,9 +1446,10 @@ def display_iso_distribution_selection(n_clicks, iso_data, met_name, met_groups)
         if not met_name:
             return no_update
         
-       # Read the isotopologue data from the JSON string
-        iso_json_file = io.StringIO(iso_data)
-        df_iso = pd.read_json(iso_json_file, orient='split') 
+       # Read the isotopologue data from the server-side cache
+        df_iso = get_cached_dataframe(iso_data)
+        if df_iso is None:
+            return no_update
         
         # Filter the data for the selected metabolite
         df_iso_met = df_iso[df_iso['Compound'] == met_name].fillna(0).reset_index(drop=True)
@@ -1579,8 +1558,8 @@ def manage_metabolite_ratios_dropdown(add_clicks, clear_clicks, restore_clicks,
         Number of times the restore metabolite ratios button has been clicked.
     delete_clicks_list : list
         List containing the number of clicks for each delete button, correlated by index.
-    pool_data : json
-        JSON formatted string containing data from the user's uploaded file.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
     children : list
         Current list of children elements (metabolite ratio dropdowns) in the metabolite ratios container.
     user_action : dict
@@ -1611,7 +1590,9 @@ def manage_metabolite_ratios_dropdown(add_clicks, clear_clicks, restore_clicks,
         # Clear the children and update the store to indicate the user action
         return [], {'cleared': True}
     
-    if pool_data is None:
+    # Read the pool data from the server-side cache, a missing entry is handled like no uploaded data
+    df_pool = get_cached_dataframe(pool_data)
+    if df_pool is None:
         # If no data is uploaded, do not update children, but reset the cleared flag if restoring
         if button_id == 'restore-metabolite-ratios' and restore_clicks:
             return children, {'cleared': False}
@@ -1619,8 +1600,6 @@ def manage_metabolite_ratios_dropdown(add_clicks, clear_clicks, restore_clicks,
                                        className='modal-placeholder-message')
         return [placeholder_message], no_update
 
-    pool_json_file = io.StringIO(pool_data)
-    df_pool = pd.read_json(pool_json_file, orient='split')
     met_list = df_pool['Compound'].tolist()
 
     # Optionally check for first initialization or restoring after a clear action
@@ -2,18 +2,23 @@
 
 import pandas as pd
 import numpy as np
-import io
 import json
 import plotly.utils
 import plotly.graph_objects as go 
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
-from dash import dcc, no_update, callback_context
+from dash import dcc, no_update, callback_context, Patch
 
 from app import app
+from layout.storage import get_cached_dataframe, cache_figure_json, get_cached_figure_json
 from layout.toast import generate_toast
 from layout.utilities_layout import generate_available_dropdown_options
-from layout.utilities_figure import normalize_met_pool_data, group_met_pool_data, ttest_volcano, assign_color, generate_volcano_plot, compile_met_pool_ratio_data
+from layout.utilities_figure import normalize_met_pool_data, group_met_pool_data, ttest_volcano, assign_color, generate_volcano_plot, compile_met_pool_ratio_data, patch_figure_layout_settings, generate_volcano_cutoff_shapes_and_annotations, generate_volcano_datapoint_annotations
+
+# -log10 p-value cutoffs of the ***, ** and * significance levels in the volcano plot
+THIRD_PVALUE_CUTOFF = 3
+SECOND_PVALUE_CUTOFF = 2
+FIRST_PVALUE_CUTOFF = 1.3
 
 @app.callback(
 [
@@ -110,7 +115,8 @@ def update_volcano_dropdown_options(grouped_samples, volcano_control_group, volc
     State('volcano-control-group-dropdown', 'value'),
     State('volcano-condition-group-dropdown', 'value'),
     State('store-volcano-settings', 'data'),
-    State('store-metabolite-ratios', 'data')
+    State('store-metabolite-ratios', 'data'),
+    State('store-volcano-plot', 'data')
 ],
     prevent_initial_call = True
 )
@@ -123,7 +129,8 @@ def display_volcano_plot(n_clicks,
                          ctrl_group, 
                          cond_group, 
                          settings, 
-                         met_ratio_selection):
+                         met_ratio_selection,
+                         stored_volcano_fig):
     '''
     Generates and displays the volcano plot based on the user inputs and selected parameters.
     
@@ -135,8 +142,8 @@ def display_volcano_plot(n_clicks,
     search_value : str
         Metabolite name to highlight in the volcano plot.
         
-    pool_data : json
-        JSON formatted string containing the pool data.
+    pool_data : str
+        Cache key of the pool data DataFrame in the server-side cache.
         
     met_classes : dict
         Dictionary containing selected metabolite classes.
@@ -159,10 +166,13 @@ def display_volcano_plot(n_clicks,
     met_ratio_selection : list
         List of dictionaries for user selected metabolite ratios
         
+    stored_volcano_fig : str
+        Cache key of the currently stored volcano plot, reused for the new plot.
+        
     Returns:
     -------
     tuple
-        Tuple containing the dash html component of the plot and JSON formatted plot data.
+        Tuple containing the dash html component of the plot and the cache key of the JSON formatted plot data.
     '''
     
     # Getting context to identify which input triggered the callback
@@ -179,7 +189,9 @@ def display_volcano_plot(n_clicks,
     
     # Execute the function only if generate-metabolomics button was clicked
     if triggered_id == 'volcano-search-dropdown' or (triggered_id == 'generate-volcano-plot' and n_clicks > 0):
-        if pool_data is None:
+        # Read the pool data from the server-side cache, a missing entry is handled like no uploaded data
+        df_pool = get_cached_dataframe(pool_data)
+        if df_pool is None:
             return no_update, no_update, generate_toast("error", 
                                                         "Error", 
                                                         "Upload a valid metabolomics file.")
@@ -215,8 +227,6 @@ def display_volcano_plot(n_clicks,
                                                         "Not selected normalization variables for the data (possible to have none). Refer to 'Change Normalization Variables'.")
         
 
-        pool_json_file = io.StringIO(pool_data)
-        df_pool = pd.read_json(pool_json_file, orient='split')
         df_pool = df_pool.replace(0, 1000)  # Replacing 0 values
         
         grouped_samples = {group: samples for group, samples in met_groups.items() if group and samples}
@@ -247,7 +257,7 @@ def display_volcano_plot(n_clicks,
         df_volcano['value_cond'] = df_pool_normalized_grouped[cond_cols].mean(axis=1)
         
         # Calculating the p-value between average values of control and condition groups from the ttest_volcano function
-        df_volcano['p-value'] = df_pool_normalized_grouped.apply(ttest_volcano, axis=1, ctrl_cols=ctrl_cols, cond_cols=cond_cols)
+        df_volcano['p-value'] = ttest_volcano(df_pool_normalized_grouped, ctrl_cols, cond_cols)
         
         # Calculating log2FC and -log10(p-value)
         df_volcano['log2FC'] = np.log2(df_volcano['value_cond'] / df_volcano['value_ctrl'])
@@ -255,25 +265,22 @@ def display_volcano_plot(n_clicks,
         
         # Defining cutoffs and assigning colors from the assign_color function
         FC_cutoff = settings['fc_value']
-        third_pvalue_cutoff = 3
-        second_pvalue_cutoff = 2
-        first_pvalue_cutoff = 1.3
         
         # Assigning the color based on selected fold-change and p-value cutoff values
-        df_volcano['color'] = df_volcano.apply(assign_color, 
-                                      axis=1, 
-                                      args=(FC_cutoff, 
-                                            third_pvalue_cutoff, 
-                                            second_pvalue_cutoff, 
-                                            first_pvalue_cutoff,
-                                            settings))
+        df_volcano['color'] = assign_color(df_volcano, 
+                                           FC_cutoff, 
+                                           THIRD_PVALUE_CUTOFF, 
+                                           SECOND_PVALUE_CUTOFF, 
+                                           FIRST_PVALUE_CUTOFF,
+                                           settings)
         
         # Generating the volcano plot
-        fig = generate_volcano_plot(df_volcano, FC_cutoff, third_pvalue_cutoff, second_pvalue_cutoff, first_pvalue_cutoff, settings, search_value)
+        fig = generate_volcano_plot(df_volcano, FC_cutoff, THIRD_PVALUE_CUTOFF, SECOND_PVALUE_CUTOFF, FIRST_PVALUE_CUTOFF, settings, search_value)
         
         
-        # Convert plotly figure for storage in dcc.Store
-        fig_json = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        # Serialize the plotly figure once and keep it in the server-side cache under the key of the store,
+        # storing only its key in dcc.Store
+        fig_json = cache_figure_json(json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder), stored_volcano_fig)
         
         filename = 'volcano_' + ctrl_group + '_' + cond_group
         
@@ -313,13 +320,17 @@ def update_volcano_plot_on_click(stored_points, stored_volcano_fig, settings):
     stored_points : list
         A list of dictionaries containing information of the clicked data points (x, y, and metabolite name).
         
-    stored_volcano_fig : json
-        A JSON representation of the existing volcano plot figure.
+    stored_volcano_fig : str
+        Cache key of the JSON representation of the existing volcano plot figure.
+        
+    settings : dict
+        The current volcano plot settings.
         
     Returns:
     -------
-    plotly.graph_objs._figure.Figure
-        An updated plotly Figure object with new annotations added based on the clicked points.
+    dash.Patch
+        A partial update of the volcano plot figure replacing its annotations with the p-value cutoff labels
+        and the annotations of the clicked points.
     '''
     
     ctx = callback_context
@@ -327,57 +338,70 @@ def update_volcano_plot_on_click(stored_points, stored_volcano_fig, settings):
     # Identify which input triggered the callback
     if not ctx.triggered:
         return no_update
-    else:
-        triggered_id  = ctx.triggered[0]['prop_id'].split('.')[0]
     
     if not stored_volcano_fig:
-         raise PreventUpdate  # Prevent updating the figure if there is no stored figure data
+         raise PreventUpdate  # Prevent updating the figure if no volcano plot has been generated yet
     
-    fig = go.Figure(json.loads(stored_volcano_fig))  # Load the existing figure from JSON
+    # The annotations are replaced as a whole to avoid duplicates, keeping the labels of the p-value cutoff lines
+    _, cutoff_annotations = generate_volcano_cutoff_shapes_and_annotations(settings['fc_value'], THIRD_PVALUE_CUTOFF, SECOND_PVALUE_CUTOFF, FIRST_PVALUE_CUTOFF, settings)
     
-    # Clear existing annotations to avoid duplicates
-    fig.update_layout(annotations=[])
+    patched_fig = Patch()
+    patched_fig['layout']['annotations'] = cutoff_annotations + generate_volcano_datapoint_annotations(stored_points, settings)
     
-    # Loop through the stored points and add annotations
-    for point in stored_points:
-        x = point['x']
-        y = point['y']
-        met_name = point['met_name']
-        
-        # Calculate the offsets for all points
-        # offsets = calculate_offsets_for_volcano_annotations(point, stored_points)
+    return patched_fig
+
+
+@app.callback(
+    Output('volcano-plot', 'figure', allow_duplicate=True),
+    Input('store-volcano-settings', 'data'),
+[
+    State('store-volcano-plot', 'data'),
+    State('store-volcano-clicked-datapoints', 'data')
+],
+    prevent_initial_call=True
+)
+def patch_volcano_plot_settings(settings, stored_volcano_fig, stored_points):
+    '''
+    Apply updated settings to the displayed volcano plot by sending only the changed figure attributes
+    (datapoint colors and size, cutoff lines and annotations, size and fonts) instead of regenerating the whole figure.
+    
+    Parameters:
+    ----------
+    settings : dict
+        The updated volcano plot settings.
+    stored_volcano_fig : str
+        Cache key of the JSON representation of the existing volcano plot figure.
+    stored_points : list
+        A list of dictionaries containing information of the clicked data points (x, y, and metabolite name).
         
-        if x > 0: 
-            ax=30 
-        else: 
-            ax=-30
-            
-        if y > 1.3: 
-            ay=-30 
-        else: 
-            ay=30
-        
-        # Adding annotations to the figure
-        fig.add_annotation(
-            text=met_name,  # Metabolite name as the annotation text
-            x=x,
-            y=y,
-            showarrow=True,  # Show arrows pointing to the annotated points
-            ax=ax,
-            ay=ay,
-            standoff=8,  # Distance between the point and the start of the arrow
-            arrowhead=1,
-            arrowwidth=1,
-            arrowsize=1,
-            arrowcolor="#636363",
-            font=dict(
-                family=settings['font_selector'],
-                size=settings['font_size'],               
-                color="rgba(0,0,0,1)"  # Font color
-            )
-        )
-    
-    return fig  # Return the updated figure
+    Returns:
+    -------
+    dash.Patch
+        A partial update of the volcano plot figure.
+    '''
+    
+    stored_fig_json = get_cached_figure_json(stored_volcano_fig)
+    if not settings or not stored_fig_json:
+        raise PreventUpdate  # Nothing to update if no volcano plot has been generated yet
+    
+    # The first trace holds all the volcano datapoints, their colors follow the new cutoff and color settings
+    datapoints = json.loads(stored_fig_json)['data'][0]
+    df_volcano = pd.DataFrame({
+        'log2FC': pd.to_numeric(pd.Series(datapoints['x'], dtype=object)),
+        'logp-value': pd.to_numeric(pd.Series(datapoints['y'], dtype=object))
+    })
+    FC_cutoff = settings['fc_value']
+    colors = assign_color(df_volcano, FC_cutoff, THIRD_PVALUE_CUTOFF, SECOND_PVALUE_CUTOFF, FIRST_PVALUE_CUTOFF, settings)
+    
+    patched_fig = patch_figure_layout_settings(Patch(), settings)
+    patched_fig['data'][0]['marker']['color'] = colors.tolist()
+    patched_fig['data'][0]['marker']['size'] = settings['datapoint_size']
+    
+    shapes, cutoff_annotations = generate_volcano_cutoff_shapes_and_annotations(FC_cutoff, THIRD_PVALUE_CUTOFF, SECOND_PVALUE_CUTOFF, FIRST_PVALUE_CUTOFF, settings)
+    patched_fig['layout']['shapes'] = shapes
+    patched_fig['layout']['annotations'] = cutoff_annotations + generate_volcano_datapoint_annotations(stored_points, settings)
+    
+    return patched_fig
 
 
 @app.callback(
@@ -407,8 +431,8 @@ def update_stored_on_click_datapoints(new_plot_clicks, clickData, sig_clicks, st
         The number of times the significant points button has been clicked.
     stored_points : list
         A list of dictionaries containing information on the currently stored data points.
-    stored_volcano_fig : json
-        A JSON representation of the current state of the volcano plot figure.
+    stored_volcano_fig : str
+        Cache key of the JSON representation of the current state of the volcano plot figure.
 
     Returns:
     -------
@@ -421,13 +445,14 @@ def update_stored_on_click_datapoints(new_plot_clicks, clickData, sig_clicks, st
         raise PreventUpdate
 
     # Check if the figure data exists and has the necessary format
-    if not stored_volcano_fig or 'data' not in stored_volcano_fig:
+    stored_fig_json = get_cached_figure_json(stored_volcano_fig)
+    if not stored_fig_json or 'data' not in stored_fig_json:
         raise PreventUpdate
 
     if stored_points is None:
         stored_points = []
     
-    fig_data = json.loads(stored_volcano_fig)  # Parse the JSON to get a dictionary
+    fig_data = json.loads(stored_fig_json)  # Parse the JSON to get a dictionary
     
     # Retrieve settings data for significance criteria
     FC_cutoff = settings.get('fc_value', 1)
@@ -487,8 +512,8 @@ def update_volcano_search_dropdown_options(stored_plot_json):
     
     Parameters:
     ----------
-    stored_plot_json : json
-        JSON representation of the stored volcano plot figure.
+    stored_plot_json : str
+        Cache key of the JSON representation of the stored volcano plot figure.
         
     Returns:
     -------
@@ -497,9 +522,10 @@ def update_volcano_search_dropdown_options(stored_plot_json):
         a dropdown option.
     '''
     
-    if stored_plot_json:
+    stored_fig_json = get_cached_figure_json(stored_plot_json)
+    if stored_fig_json:
         # Convert the JSON string back to a plotly figure
-        stored_fig = plotly.io.from_json(stored_plot_json)
+        stored_fig = plotly.io.from_json(stored_fig_json)
         
         # Assuming that metabolite names are stored as point labels or some other trace attribute
         metabolite_names = []
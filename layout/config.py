@@ -105,3 +105,17 @@ metabolite_ratios_default = [
     {'numerator': 'NADP+', 'denominator': 'NADPH'},
     {'numerator': 'GSH', 'denominator': 'GSSG'},
 ]
+
+# Default linear regression plot settings, also used as the initial values of the settings modal
+lingress_settings_default = {
+    'height': 500,
+    'width': 800,
+    'font_selector': 'Arial',
+    'font_size': 14,
+    'datapoint_size': 7,
+    'datapoint_color': '#000000',
+    'line_thickness': 5,
+    'line_color': '#FF0000',
+    'line_opacity': 1,
+    'show_stats': True
+}
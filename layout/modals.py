@@ -4,9 +4,46 @@ import dash_bootstrap_components as dbc
 import dash_ag_grid as dag
 from dash import dcc, html
 
-from layout.config import classes_options_w_mets, tooltips, met_class_list_preselected, p_value_correction_options
+from layout.config import classes_options_w_mets, tooltips, met_class_list_preselected, p_value_correction_options, lingress_settings_default
 from layout.utilities_layout import create_button
 
+
+# Font choices for all text components in the plots (add more fonts or edit if needed)
+font_options = [
+    {"label": "Arial", "value": "Arial"},
+    {"label": "Helvetica", "value": "Helvetica"},
+    {"label": "Times New Roman", "value": "Times New Roman"},
+    {"label": "Courier New", "value": "Courier New"},
+    {"label": "Comic Sans MS", "value": "Comic Sans MS"},
+    {"label": "Impact", "value": "Impact"},
+    {"label": "Verdana", "value": "Verdana"},
+    {"label": "Georgia", "value": "Georgia"},
+    {"label": "Lucida Sans Unicode", "value": "Lucida Sans Unicode"},
+    {"label": "Tahoma", "value": "Tahoma"},
+    {"label": "Trebuchet MS", "value": "Trebuchet MS"},
+    {"label": "Palatino Linotype", "value": "Palatino Linotype"},
+    {"label": "Garamond", "value": "Garamond"},
+    {"label": "Bookman", "value": "Bookman"},
+    {"label": "Avant Garde", "value": "Avant Garde"},
+]
+
+
+# Slider marks shared by the settings sliders of the same range
+_MARKS_0P1_3 = {0.1: '0.1', 0.5: '0.5', 1: '1', 2: '2', 3: '3'}
+_MARKS_0P1_2 = {0.1: '0.1', 0.5: '0.5', 1: '1', 2: '2'}
+_MARKS_0P1_1 = {0.1: '0.1', 1: '1'}
+_MARKS_0_1 = {0: '0', 1: '1'}
+_MARKS_100_2000 = {100: '100', 500: '500', 1000: '1000', 1500: '1500', 2000: '2000'}
+_MARKS_100_1500 = {100: '100', 500: '500', 1000: '1000', 1500: '1500'}
+_MARKS_1_10 = {1: '1', 5: '5', 10: '10'}
+_MARKS_5_20 = {5: '5', 20: '20'}
+
+
+# Creates a settings slider with the given range, default value and marks
+def _slider(id_, lo, hi, step, val, marks):
+    return dcc.Slider(id=id_, min=lo, max=hi, step=step, value=val, marks=marks)
+
+
 def build_modal_components():
     modal_components = []
     
@@ -301,7 +338,7 @@ def get_settings_modal_bulk_heatmap():
                                     max=3,
                                     step=0.1,
                                     value=1,
-                                    marks={0.1: '0.1', 0.5: '0.5', 1: '1', 2: '2', 3: '3'},
+                                    marks=_MARKS_0P1_3,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -313,7 +350,7 @@ def get_settings_modal_bulk_heatmap():
                                     max=3,
                                     step=0.1,
                                     value=1,
-                                    marks={0.1: '0.1', 0.5: '0.5', 1: '1', 2: '2', 3: '3'},
+                                    marks=_MARKS_0P1_3,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -323,24 +360,7 @@ def get_settings_modal_bulk_heatmap():
                                 # Selection of the font for all text components in the plots.
                                 dbc.Select(
                                     id='bulk-heatmap-font-selector',
-                                    options=[
-                                        {"label": "Arial", "value": "Arial"},
-                                        {"label": "Helvetica", "value": "Helvetica"},
-                                        {"label": "Times New Roman", "value": "Times New Roman"},
-                                        {"label": "Courier New", "value": "Courier New"},
-                                        {"label": "Comic Sans MS", "value": "Comic Sans MS"},
-                                        {"label": "Impact", "value": "Impact"},
-                                        {"label": "Verdana", "value": "Verdana"},
-                                        {"label": "Georgia", "value": "Georgia"},
-                                        {"label": "Lucida Sans Unicode", "value": "Lucida Sans Unicode"},
-                                        {"label": "Tahoma", "value": "Tahoma"},
-                                        {"label": "Trebuchet MS", "value": "Trebuchet MS"},
-                                        {"label": "Palatino Linotype", "value": "Palatino Linotype"},
-                                        {"label": "Garamond", "value": "Garamond"},
-                                        {"label": "Bookman", "value": "Bookman"},
-                                        {"label": "Avant Garde", "value": "Avant Garde"},
-                                        # Add more fonts or edit if needed.
-                                    ],
+                                    options=font_options,
                                     value="Arial",  # Default value for fonts
                                     style={'marginTop': '10px'}
                                 )
@@ -354,7 +374,7 @@ def get_settings_modal_bulk_heatmap():
                                     max=20,
                                     step=1,
                                     value=12,
-                                    marks={5: '5', 20: '20'},
+                                    marks=_MARKS_5_20,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -439,7 +459,7 @@ def get_settings_modal_bulk_isotopologue_heatmap():
                                     max=3,
                                     step=0.1,
                                     value=1,
-                                    marks={0.1: '0.1', 0.5: '0.5', 1: '1', 2: '2', 3: '3'},
+                                    marks=_MARKS_0P1_3,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -451,7 +471,7 @@ def get_settings_modal_bulk_isotopologue_heatmap():
                                     max=3,
                                     step=0.1,
                                     value=1,
-                                    marks={0.1: '0.1', 0.5: '0.5', 1: '1', 2: '2', 3: '3'},
+                                    marks=_MARKS_0P1_3,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -461,24 +481,7 @@ def get_settings_modal_bulk_isotopologue_heatmap():
                                 # Selection of the font for all text components in the plots.
                                 dbc.Select(
                                     id='bulk-isotopologue-heatmap-font-selector',
-                                    options=[
-                                        {"label": "Arial", "value": "Arial"},
-                                        {"label": "Helvetica", "value": "Helvetica"},
-                                        {"label": "Times New Roman", "value": "Times New Roman"},
-                                        {"label": "Courier New", "value": "Courier New"},
-                                        {"label": "Comic Sans MS", "value": "Comic Sans MS"},
-                                        {"label": "Impact", "value": "Impact"},
-                                        {"label": "Verdana", "value": "Verdana"},
-                                        {"label": "Georgia", "value": "Georgia"},
-                                        {"label": "Lucida Sans Unicode", "value": "Lucida Sans Unicode"},
-                                        {"label": "Tahoma", "value": "Tahoma"},
-                                        {"label": "Trebuchet MS", "value": "Trebuchet MS"},
-                                        {"label": "Palatino Linotype", "value": "Palatino Linotype"},
-                                        {"label": "Garamond", "value": "Garamond"},
-                                        {"label": "Bookman", "value": "Bookman"},
-                                        {"label": "Avant Garde", "value": "Avant Garde"},
-                                        # Add more fonts or edit if needed.
-                                    ],
+                                    options=font_options,
                                     value="Arial",  # Default value for fonts
                                     style={'marginTop': '10px'}
                                 )
@@ -492,7 +495,7 @@ def get_settings_modal_bulk_isotopologue_heatmap():
                                     max=20,
                                     step=1,
                                     value=12,
-                                    marks={5: '5', 20: '20'},
+                                    marks=_MARKS_5_20,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -572,7 +575,7 @@ def get_settings_modal_custom_heatmap():
                                     max=2,
                                     step=0.1,
                                     value=1,
-                                    marks={0.1: '0.1', 0.5: '0.5', 1: '1', 2: '2'},
+                                    marks=_MARKS_0P1_2,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -584,7 +587,7 @@ def get_settings_modal_custom_heatmap():
                                     max=2,
                                     step=0.1,
                                     value=1,
-                                    marks={0.1: '0.1', 0.5: '0.5', 1: '1', 2: '2'},
+                                    marks=_MARKS_0P1_2,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -594,24 +597,7 @@ def get_settings_modal_custom_heatmap():
                                 # Selection of the font for all text components in the plots.
                                 dbc.Select(
                                     id='custom-heatmap-font-selector',
-                                    options=[
-                                        {"label": "Arial", "value": "Arial"},
-                                        {"label": "Helvetica", "value": "Helvetica"},
-                                        {"label": "Times New Roman", "value": "Times New Roman"},
-                                        {"label": "Courier New", "value": "Courier New"},
-                                        {"label": "Comic Sans MS", "value": "Comic Sans MS"},
-                                        {"label": "Impact", "value": "Impact"},
-                                        {"label": "Verdana", "value": "Verdana"},
-                                        {"label": "Georgia", "value": "Georgia"},
-                                        {"label": "Lucida Sans Unicode", "value": "Lucida Sans Unicode"},
-                                        {"label": "Tahoma", "value": "Tahoma"},
-                                        {"label": "Trebuchet MS", "value": "Trebuchet MS"},
-                                        {"label": "Palatino Linotype", "value": "Palatino Linotype"},
-                                        {"label": "Garamond", "value": "Garamond"},
-                                        {"label": "Bookman", "value": "Bookman"},
-                                        {"label": "Avant Garde", "value": "Avant Garde"},
-                                        # Add more fonts or edit if needed.
-                                    ],
+                                    options=font_options,
                                     value="Arial",  # Default value for fonts
                                     style={'marginTop': '10px'}
                                 )
@@ -625,7 +611,7 @@ def get_settings_modal_custom_heatmap():
                                     max=20,
                                     step=1,
                                     value=12,
-                                    marks={5: '5', 20: '20'},
+                                    marks=_MARKS_5_20,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -709,7 +695,7 @@ def get_settings_modal_metabolomics():
                                     max=1500,
                                     step=50,
                                     value=400,
-                                    marks={100: '100', 500: '500', 1000: '1000', 1500: '1500'},
+                                    marks=_MARKS_100_1500,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -721,7 +707,7 @@ def get_settings_modal_metabolomics():
                                     max=2000,
                                     step=50,
                                     value=600,
-                                    marks={100: '100', 500: '500', 1000: '1000', 1500: '1500', 2000: '2000'},
+                                    marks=_MARKS_100_2000,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -731,24 +717,7 @@ def get_settings_modal_metabolomics():
                                 # Selection of the font for all text components in the plots.
                                 dbc.Select(
                                     id='metabolomics-font-selector',
-                                    options=[
-                                        {"label": "Arial", "value": "Arial"},
-                                        {"label": "Helvetica", "value": "Helvetica"},
-                                        {"label": "Times New Roman", "value": "Times New Roman"},
-                                        {"label": "Courier New", "value": "Courier New"},
-                                        {"label": "Comic Sans MS", "value": "Comic Sans MS"},
-                                        {"label": "Impact", "value": "Impact"},
-                                        {"label": "Verdana", "value": "Verdana"},
-                                        {"label": "Georgia", "value": "Georgia"},
-                                        {"label": "Lucida Sans Unicode", "value": "Lucida Sans Unicode"},
-                                        {"label": "Tahoma", "value": "Tahoma"},
-                                        {"label": "Trebuchet MS", "value": "Trebuchet MS"},
-                                        {"label": "Palatino Linotype", "value": "Palatino Linotype"},
-                                        {"label": "Garamond", "value": "Garamond"},
-                                        {"label": "Bookman", "value": "Bookman"},
-                                        {"label": "Avant Garde", "value": "Avant Garde"},
-                                        # Add more fonts or edit if needed.
-                                    ],
+                                    options=font_options,
                                     value="Arial",  # Default value for fonts
                                     style={'marginTop': '10px'}
                                 )
@@ -762,7 +731,7 @@ def get_settings_modal_metabolomics():
                                     max=20,
                                     step=1,
                                     value=14,
-                                    marks={5: '5', 20: '20'},
+                                    marks=_MARKS_5_20,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -774,7 +743,7 @@ def get_settings_modal_metabolomics():
                                     max=1,
                                     step=0.05,
                                     value=0.5,
-                                    marks={0: '0', 1: '1'},
+                                    marks=_MARKS_0_1,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -786,7 +755,7 @@ def get_settings_modal_metabolomics():
                                     max=1,
                                     step=0.05,
                                     value=0.3,
-                                    marks={0: '0', 1: '1'},
+                                    marks=_MARKS_0_1,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -898,7 +867,7 @@ def get_settings_modal_iso_distribution():
                                     max=1500,
                                     step=50,
                                     value=400,
-                                    marks={100: '100', 500: '500', 1000: '1000', 1500: '1500'},
+                                    marks=_MARKS_100_1500,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -910,7 +879,7 @@ def get_settings_modal_iso_distribution():
                                     max=2000,
                                     step=50,
                                     value=1000,
-                                    marks={100: '100', 500: '500', 1000: '1000', 1500: '1500', 2000: '2000'},
+                                    marks=_MARKS_100_2000,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -921,24 +890,7 @@ def get_settings_modal_iso_distribution():
                                 # Selection of the font for all text components in the plots.
                                 dbc.Select(
                                     id='isotopologue-distribution-font-selector',
-                                    options=[
-                                        {"label": "Arial", "value": "Arial"},
-                                        {"label": "Helvetica", "value": "Helvetica"},
-                                        {"label": "Times New Roman", "value": "Times New Roman"},
-                                        {"label": "Courier New", "value": "Courier New"},
-                                        {"label": "Comic Sans MS", "value": "Comic Sans MS"},
-                                        {"label": "Impact", "value": "Impact"},
-                                        {"label": "Verdana", "value": "Verdana"},
-                                        {"label": "Georgia", "value": "Georgia"},
-                                        {"label": "Lucida Sans Unicode", "value": "Lucida Sans Unicode"},
-                                        {"label": "Tahoma", "value": "Tahoma"},
-                                        {"label": "Trebuchet MS", "value": "Trebuchet MS"},
-                                        {"label": "Palatino Linotype", "value": "Palatino Linotype"},
-                                        {"label": "Garamond", "value": "Garamond"},
-                                        {"label": "Bookman", "value": "Bookman"},
-                                        {"label": "Avant Garde", "value": "Avant Garde"},
-                                        # Add more fonts or edit if needed.
-                                    ],
+                                    options=font_options,
                                     value="Arial",  # Default value for fonts
                                     style={'marginTop': '10px'}
                                 )
@@ -952,7 +904,7 @@ def get_settings_modal_iso_distribution():
                                     max=20,
                                     step=1,
                                     value=14,
-                                    marks={5: '5', 20: '20'},
+                                    marks=_MARKS_5_20,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -964,7 +916,7 @@ def get_settings_modal_iso_distribution():
                                     max=1,
                                     step=0.05,
                                     value=0.1,
-                                    marks={0: '0', 1: '1'},
+                                    marks=_MARKS_0_1,
                                 )
                             ], className="settings-dbc-col"),
                             dbc.Col([
@@ -976,7 +928,7 @@ def get_settings_modal_iso_distribution():
                                     max=1,
                                     step=0.05,
                                     value=0.2,
-                                    marks={0: '0', 1: '1'},
+                                    marks=_MARKS_0_1,
                                 )
                             ], className="settings-dbc-col"),
                         ], className="settings-dbc-row"),
@@ -1008,7 +960,7 @@ def get_settings_modal_volcano():
                                 max=2000,
                                 step=50,
                                 value=800,
-                                marks={100: '100', 500: '500', 1000: '1000', 1500: '1500', 2000: '2000'},
+                                marks=_MARKS_100_2000,
                             )
                         ], className="settings-dbc-col"),
                         dbc.Col([
@@ -1020,7 +972,7 @@ def get_settings_modal_volcano():
                                 max=2000,
                                 step=50,
                                 value=800,
-                                marks={100: '100', 500: '500', 1000: '1000', 1500: '1500', 2000: '2000'},
+                                marks=_MARKS_100_2000,
                             )
                         ], className="settings-dbc-col"),
                     ], className="settings-dbc-row"),
@@ -1031,24 +983,7 @@ def get_settings_modal_volcano():
                             # Selection of the font for all text components in the plots.
                             dbc.Select(
                                 id='volcano-plot-font-selector',
-                                options=[
-                                    {"label": "Arial", "value": "Arial"},
-                                    {"label": "Helvetica", "value": "Helvetica"},
-                                    {"label": "Times New Roman", "value": "Times New Roman"},
-                                    {"label": "Courier New", "value": "Courier New"},
-                                    {"label": "Comic Sans MS", "value": "Comic Sans MS"},
-                                    {"label": "Impact", "value": "Impact"},
-                                    {"label": "Verdana", "value": "Verdana"},
-                                    {"label": "Georgia", "value": "Georgia"},
-                                    {"label": "Lucida Sans Unicode", "value": "Lucida Sans Unicode"},
-                                    {"label": "Tahoma", "value": "Tahoma"},
-                                    {"label": "Trebuchet MS", "value": "Trebuchet MS"},
-                                    {"label": "Palatino Linotype", "value": "Palatino Linotype"},
-                                    {"label": "Garamond", "value": "Garamond"},
-                                    {"label": "Bookman", "value": "Bookman"},
-                                    {"label": "Avant Garde", "value": "Avant Garde"},
-                                    # Add more fonts or edit if needed.
-                                ],
+                                options=font_options,
                                 value="Arial",  # Default value for fonts
                                 style={'marginTop': '10px'}
                             )
@@ -1062,7 +997,7 @@ def get_settings_modal_volcano():
                                 max=20,
                                 step=1,
                                 value=14,
-                                marks={5: '5', 20: '20'},
+                                marks=_MARKS_5_20,
                             )
                         ], className="settings-dbc-col"),
                         dbc.Col([
@@ -1297,143 +1232,12 @@ def get_pvalue_modal_isotopologue_distribution():
     
     
 def get_settings_modal_lingress():
+    # The body is only filled in with get_settings_modal_lingress_body() when the modal is first opened
     return dbc.Modal(
         [
             dbc.ModalHeader('Configure settings for the linear regression to metabolomics plots.'),
             
-            dbc.ModalBody([
-                    dbc.Row([
-                        dbc.Col([
-                            html.Label("Height"),
-                            # Slider for height of the volcano plot.
-                            dcc.Slider(
-                                id="lingress-plot-height",
-                                min=100,
-                                max=2000,
-                                step=50,
-                                value=500,
-                                marks={100: '100', 500: '500', 1000: '1000', 1500: '1500', 2000: '2000'},
-                            )
-                        ], className="settings-dbc-col"),
-                        dbc.Col([
-                            html.Label("Width"),
-                            # Slider for the width of the volcano plot.
-                            dcc.Slider(
-                                id="lingress-plot-width",
-                                min=100,
-                                max=2000,
-                                step=50,
-                                value=800,
-                                marks={100: '100', 500: '500', 1000: '1000', 1500: '1500', 2000: '2000'},
-                            )
-                        ], className="settings-dbc-col"),
-                    ], className="settings-dbc-row"),
-                    
-                    dbc.Row([
-                        dbc.Col([
-                            html.Label("Plot Font Style"),
-                            # Selection of the font for all text components in the plots.
-                            dbc.Select(
-                                id='lingress-font-selector',
-                                options=[
-                                    {"label": "Arial", "value": "Arial"},
-                                    {"label": "Helvetica", "value": "Helvetica"},
-                                    {"label": "Times New Roman", "value": "Times New Roman"},
-                                    {"label": "Courier New", "value": "Courier New"},
-                                    {"label": "Comic Sans MS", "value": "Comic Sans MS"},
-                                    {"label": "Impact", "value": "Impact"},
-                                    {"label": "Verdana", "value": "Verdana"},
-                                    {"label": "Georgia", "value": "Georgia"},
-                                    {"label": "Lucida Sans Unicode", "value": "Lucida Sans Unicode"},
-                                    {"label": "Tahoma", "value": "Tahoma"},
-                                    {"label": "Trebuchet MS", "value": "Trebuchet MS"},
-                                    {"label": "Palatino Linotype", "value": "Palatino Linotype"},
-                                    {"label": "Garamond", "value": "Garamond"},
-                                    {"label": "Bookman", "value": "Bookman"},
-                                    {"label": "Avant Garde", "value": "Avant Garde"},
-                                    # Add more fonts or edit if needed.
-                                ],
-                                value="Arial",  # Default value for fonts
-                                style={'marginTop': '10px'}
-                            )
-                        ], className="settings-dbc-col"),
-                        dbc.Col([
-                            html.Label("Plot Font Size"),
-                            # Slider for changing the font size for all text elements in the plots.
-                            dcc.Slider(
-                                id="lingress-font-size",
-                                min=5,
-                                max=20,
-                                step=1,
-                                value=14,
-                                marks={5: '5', 20: '20'},
-                            )
-                        ], className="settings-dbc-col"),
-                        dbc.Col([
-                            html.Label("Datapoint Size"),
-                            # Slider for changing size of datapoints if visible.
-                            dcc.Slider(
-                                id="lingress-datapoint-size",
-                                min=1,
-                                max=20,
-                                step=1,
-                                value=7,
-                                marks={1: '1', 10: '10', 20: '20'},
-                            )
-                        ], className="settings-dbc-col"),
-                        dbc.Col([
-                            html.Label("Datapoint Color"),
-                            # Color selection for the datapoint display color
-                            # Default is black
-                            dbc.Input(id="lingress-datapoint-color", type="color", value="#000000")
-                        ], className="settings-dbc-col"),
-                    ], className="settings-dbc-row"),
-                    
-                    dbc.Row([
-                        dbc.Col([
-                            html.Label("Line Thickness"),
-                            # Slider for changing the font size for all text elements in the plots.
-                            dcc.Slider(
-                                id="lingress-line-thickness",
-                                min=1,
-                                max=10,
-                                step=1,
-                                value=5,
-                                marks={1: '1', 5: '5', 10: '10'},
-                            )
-                        ], className="settings-dbc-col"),
-                        dbc.Col([
-                            html.Label("Line Color"),
-                            dbc.Input(id="lingress-line-color", type="color", value="#FF0000")
-                        ], className="settings-dbc-col"),
-                        dbc.Col([
-                            html.Label("Line Opacity"),
-                            # Slider for changing the font size for all text elements in the plots.
-                            dcc.Slider(
-                                id="lingress-line-opacity",
-                                min=0.1,
-                                max=1,
-                                step=0.1,
-                                value=1,
-                                marks={0.1: '0.1', 1: '1'},
-                            )
-                        ], className="settings-dbc-col"),
-                    ], className="settings-dbc-row"),
-                    
-                    dbc.Row([
-                        dbc.Col([
-                            html.Label("Show Stats in Graph"),
-                            dbc.Checklist(
-                                        options=[
-                                            {"value": 1},
-                                        ],
-                                        value=[1],
-                                        id="lingress-show-stats-in-graph",
-                                        inline=True
-                                    )
-                        ], className="settings-dbc-col"),
-                    ], className="settings-dbc-row"),
-            ]),
+            dbc.ModalBody(id='modal-settings-lingress-body'),
                     
             dbc.ModalFooter(
                 dbc.Button("Update", id="update-settings-lingress", n_clicks=0, color="success")
@@ -1443,4 +1247,84 @@ def get_settings_modal_lingress():
         size='xl',
         is_open=False,
         backdrop="static"
-    )
\ No newline at end of file
+    )
+
+
+# Settings controls of the linear regression modal, rendered on the first opening of the modal
+def get_settings_modal_lingress_body():
+    return [
+        dbc.Row([
+            dbc.Col([
+                html.Label("Height"),
+                # Slider for height of the volcano plot.
+                _slider("lingress-plot-height", 100, 2000, 50, lingress_settings_default['height'], _MARKS_100_2000)
+            ], className="settings-dbc-col"),
+            dbc.Col([
+                html.Label("Width"),
+                # Slider for the width of the volcano plot.
+                _slider("lingress-plot-width", 100, 2000, 50, lingress_settings_default['width'], _MARKS_100_2000)
+            ], className="settings-dbc-col"),
+        ], className="settings-dbc-row"),
+        
+        dbc.Row([
+            dbc.Col([
+                html.Label("Plot Font Style"),
+                # Selection of the font for all text components in the plots.
+                dbc.Select(
+                    id='lingress-font-selector',
+                    options=font_options,
+                    value=lingress_settings_default['font_selector'],  # Default value for fonts
+                    style={'marginTop': '10px'}
+                )
+            ], className="settings-dbc-col"),
+            dbc.Col([
+                html.Label("Plot Font Size"),
+                # Slider for changing the font size for all text elements in the plots.
+                _slider("lingress-font-size", 5, 20, 1, lingress_settings_default['font_size'], _MARKS_5_20)
+            ], className="settings-dbc-col"),
+            dbc.Col([
+                html.Label("Datapoint Size"),
+                # Slider for changing size of datapoints if visible.
+                _slider("lingress-datapoint-size", 1, 20, 1, lingress_settings_default['datapoint_size'],
+                        {1: '1', 10: '10', 20: '20'})
+            ], className="settings-dbc-col"),
+            dbc.Col([
+                html.Label("Datapoint Color"),
+                # Color selection for the datapoint display color
+                # Default is black
+                dbc.Input(id="lingress-datapoint-color", type="color", value=lingress_settings_default['datapoint_color'])
+            ], className="settings-dbc-col"),
+        ], className="settings-dbc-row"),
+        
+        dbc.Row([
+            dbc.Col([
+                html.Label("Line Thickness"),
+                # Slider for changing the font size for all text elements in the plots.
+                _slider("lingress-line-thickness", 1, 10, 1, lingress_settings_default['line_thickness'], _MARKS_1_10)
+            ], className="settings-dbc-col"),
+            dbc.Col([
+                html.Label("Line Color"),
+                # dbc.Input is kept for the color pickers, html.Input does not send its value back to callbacks
+                dbc.Input(id="lingress-line-color", type="color", value=lingress_settings_default['line_color'])
+            ], className="settings-dbc-col"),
+            dbc.Col([
+                html.Label("Line Opacity"),
+                # Slider for changing the font size for all text elements in the plots.
+                _slider("lingress-line-opacity", 0.1, 1, 0.1, lingress_settings_default['line_opacity'], _MARKS_0P1_1)
+            ], className="settings-dbc-col"),
+        ], className="settings-dbc-row"),
+        
+        dbc.Row([
+            dbc.Col([
+                html.Label("Show Stats in Graph"),
+                dbc.Checklist(
+                            options=[
+                                {"value": 1},
+                            ],
+                            value=[1] if lingress_settings_default['show_stats'] else [],
+                            id="lingress-show-stats-in-graph",
+                            inline=True
+                        )
+            ], className="settings-dbc-col"),
+        ], className="settings-dbc-row"),
+    ]
@@ -1,19 +1,125 @@
 # storage.py
 
+import uuid
+
 from dash import dcc
 
+from app import cache
+
 
 def get_storage(id, storage_type='memory', initial_data=None):
     return dcc.Store(id = id, storage_type = storage_type, data=initial_data)
+
+
+def _cache_value(value, key=None):
+    '''
+    Store a value in the server-side cache, overwriting the entry of the given key so that a new upload
+    replaces the previous one, or under a new unique key if there is none yet.
+    A value of None removes the entry of the given key.
+    '''
+    if value is None:
+        if key is not None:
+            cache.delete(key)
+        return None
+
+    if key is None:
+        key = uuid.uuid4().hex
+    cache.set(key, value)
+    return key
+
+
+def _get_cached_value(key):
+    '''
+    Retrieve a value from the server-side cache, returning None for a missing or expired key.
+    '''
+    if key is None:
+        return None
+
+    return cache.get(key)
+
+
+def cache_dataframe(df, key=None):
+    '''
+    Store a DataFrame in the server-side cache and return the key that references it.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame or None
+        The DataFrame to be cached.
+    key : str or None
+        The key currently kept in the dcc.Store of this data, whose entry is overwritten (or removed if
+        there is no DataFrame), so that a new upload does not leave the previous DataFrame behind.
+
+    Returns:
+    -------
+    str or None
+        A short unique key to be kept in a dcc.Store, or None if there is no DataFrame.
+    '''
+    return _cache_value(df, key)
+
+
+def get_cached_dataframe(key):
+    '''
+    Retrieve a DataFrame from the server-side cache by the key kept in a dcc.Store.
+
+    Parameters:
+    ----------
+    key : str or None
+        The cache key returned by `cache_dataframe`.
+
+    Returns:
+    -------
+    pandas.DataFrame or None
+        The cached DataFrame, or None if the key is missing or expired.
+    '''
+    return _get_cached_value(key)
+
+
+def cache_figure_json(fig_json, key=None):
+    '''
+    Store an already serialized figure (JSON string) in the server-side cache, so the
+    figure is serialized once and only its key travels through the plot stores.
+
+    Parameters:
+    ----------
+    fig_json : str or None
+        The JSON representation of the figure(s), e.g. from `plotly.io.to_json`.
+    key : str or None
+        The key currently kept in the plot's dcc.Store, whose entry is overwritten (or removed if
+        there is no figure), so that a new plot does not leave the previous one behind.
+
+    Returns:
+    -------
+    str or None
+        A short unique key to be kept in a dcc.Store, or None if there is no figure.
+    '''
+    return _cache_value(fig_json, key)
+
+
+def get_cached_figure_json(key):
+    '''
+    Retrieve a serialized figure from the server-side cache by the key kept in a dcc.Store.
+
+    Parameters:
+    ----------
+    key : str or None
+        The cache key returned by `cache_figure_json`.
+
+    Returns:
+    -------
+    str or None
+        The cached JSON string, or None if the key is missing or expired.
+    '''
+    return _get_cached_value(key)
     
 # Define all of your storage components here
 def build_storage_components():
     storage_components = []
     
-    # For data storage
-    storage_components.append(get_storage('store-data-pool', 'local'))
-    storage_components.append(get_storage('store-data-iso', 'local'))
-    storage_components.append(get_storage('store-data-lingress', 'local'))
+    # For data storage (only the server-side cache keys are stored in the browser)
+    storage_components.append(get_storage('store-data-pool'))
+    storage_components.append(get_storage('store-data-iso'))
+    storage_components.append(get_storage('store-data-lingress'))
     
     # For user selection
     storage_components.append(get_storage('store-metabolite-ratios'))
@@ -32,9 +138,6 @@ def build_storage_components():
     storage_components.append(get_storage('store-settings-lingress'))
     
     # For plots
-    storage_components.append(get_storage('store-bulk-heatmap-plot'))
-    storage_components.append(get_storage('store-bulk-isotopologue-heatmap-plot'))
-    storage_components.append(get_storage('store-custom-heatmap-plot'))
     storage_components.append(get_storage('store-volcano-plot'))
     
     # For statistics
@@ -51,12 +154,7 @@ def build_storage_components():
     storage_components.append(get_storage('store-user-metabolite-ratio-cleared', 'memory', {'cleared': False}))
     
     return storage_components
-    
-    
-    
-    
-    
-    
-    
-    
-    
+
+
+# Built once at import, the layout references this tuple instead of calling the builder
+STORAGE_COMPONENTS = tuple(build_storage_components())
@@ -5,6 +5,12 @@ from dash import html, dcc
 
 from layout.utilities_layout import create_dropdown_with_label, create_button
 
+
+# Builds a centered row with each of the given buttons in its own 'just-a-button' column
+def _action_row(*btns):
+    return dbc.Row([dbc.Col(b, className='just-a-button') for b in btns], justify='center', align='center')
+
+
 # Gets the dbc.Tabs parent component with all the tabs
 def get_tabs_parent():
     return dbc.Tabs(
@@ -38,23 +44,10 @@ def get_tab_bulk_pool_heatmap():
             justify='center',
             align='center'),
             
-            dbc.Row([
-                 dbc.Col(
-                     create_button("Generate Bulk Heatmap",
-                                             "generate-bulk-heatmap-plot",
-                                             color='success'),
-                     className='just-a-button'
-                 ),
-                 
-                 dbc.Col(
-                     create_button("Change Heatmap Settings",
-                                             "change-settings-bulk-heatmap",
-                                             color='secondary'),
-                     className='just-a-button'
-                 )
-            ],
-            justify='center',
-            align='center'),
+            _action_row(
+                create_button("Generate Bulk Heatmap", "generate-bulk-heatmap-plot", color='success'),
+                create_button("Change Heatmap Settings", "change-settings-bulk-heatmap", color='secondary')
+            ),
             
             html.Div(id='normalization-display-container-bulk-heatmap', className='normalization-display'),
             
@@ -74,23 +67,10 @@ def get_tab_bulk_isotopologue_heatmap():
     return dbc.Tab(
         label='Bulk Isotopologue Heatmap',
         children=[
-             dbc.Row([
-                 dbc.Col(
-                     create_button("Generate Bulk Isotopologue Heatmap",
-                                             "generate-bulk-isotopologue-heatmap-plot",
-                                             color='success'),
-                     className='just-a-button'
-                 ),
-                 
-                 dbc.Col(
-                     create_button("Change Heatmap Settings",
-                                             "change-settings-bulk-isotopologue-heatmap",
-                                             color='secondary'),
-                     className='just-a-button'
-                 )
-            ],
-            justify='center',
-            align='center'),
+            _action_row(
+                create_button("Generate Bulk Isotopologue Heatmap", "generate-bulk-isotopologue-heatmap-plot", color='success'),
+                create_button("Change Heatmap Settings", "change-settings-bulk-isotopologue-heatmap", color='secondary')
+             ),
              
             html.Div(
                 id="loader-wrapper-bulk-Isotopologue-heatmap", 
@@ -131,23 +111,10 @@ def get_tab_custom_heatmap():
             justify='center',
             align='center'),
             
-            dbc.Row([
-                 dbc.Col(
-                     create_button("Generate Custom Heatmap",
-                                             "generate-custom-heatmap-plot",
-                                             color='success'),
-                     className='just-a-button'
-                 ),
-                 
-                 dbc.Col(
-                     create_button("Change Heatmap Settings",
-                                             "change-settings-custom-heatmap",
-                                             color='secondary'),
-                     className='just-a-button'
-                 )
-            ],
-            justify='center',
-            align='center'),
+            _action_row(
+                create_button("Generate Custom Heatmap", "generate-custom-heatmap-plot", color='success'),
+                create_button("Change Heatmap Settings", "change-settings-custom-heatmap", color='secondary')
+            ),
             
             html.Div(id='normalization-display-container-custom-heatmap', className='normalization-display'),
             
@@ -168,28 +135,10 @@ def get_tab_bulk_metabolomics():
     return dbc.Tab(
         label="Bulk Metabolomics",
         children=[
-            dbc.Row([
-                dbc.Col(
-                    create_button("Configure p-value Calculations",
-                                            "configure-p-value-metabolomics",
-                                            color="info"),
-                    className='just-a-button'
-                ),
-                dbc.Col(
-                    create_button("Generate Metabolomics Plots",
-                                            "generate-metabolomics",
-                                            color="success"),
-                    className='just-a-button'
-                ),
-                dbc.Col(
-                    create_button("Change Metabolomics Plot Settings",
-                                            "change-settings-metabolomics",
-                                            color="secondary"),
-                    className='just-a-button'
-                ),
-            ],
-            justify='center',
-            align='center'
+            _action_row(
+                create_button("Configure p-value Calculations", "configure-p-value-metabolomics", color="info"),
+                create_button("Generate Metabolomics Plots", "generate-metabolomics", color="success"),
+                create_button("Change Metabolomics Plot Settings", "change-settings-metabolomics", color="secondary")
             ),
             
             html.Div(id='normalization-display-container-bulk-metabolomics', className='normalization-display'),
@@ -213,16 +162,9 @@ def get_tab_isotopologue_distribution():
     return dbc.Tab(
         label="Isotopologue Distribution",
         children=[
-            dbc.Row([
-                dbc.Col(
-                     create_button("Generate All Isotopologue Distribution Plot",
-                                            "generate-isotopologue-distribution-all",
-                                            color="secondary"),
-                    className='just-a-button'
-                ),
-            ],
-            justify='center',
-            align='center'),
+            _action_row(
+                create_button("Generate All Isotopologue Distribution Plot", "generate-isotopologue-distribution-all", color="secondary")
+            ),
 
             dbc.Row([
                 dbc.Col(
@@ -234,28 +176,10 @@ def get_tab_isotopologue_distribution():
             justify='center',
             align='center'),
             
-            dbc.Row([
-                dbc.Col(
-                    create_button("Configure p-value Calculations",
-                                            "configure-p-value-isotopologue-distribution",
-                                            color="info"),
-                    className='just-a-button'
-                ),
-                dbc.Col(
-                    create_button("Generate Individual Isotopologue Distribution Plot",
-                                            "generate-isotopologue-distribution",
-                                            color="success"),
-                    className='just-a-button'
-                ),
-                dbc.Col(
-                    create_button("Change Isotopologue Distribution Plot Settings",
-                                            "change-settings-isotopologue-distribution",
-                                            color="secondary"),
-                    className='just-a-button'
-                ),
-            ],
-            justify='center',
-            align='center'
+            _action_row(
+                create_button("Configure p-value Calculations", "configure-p-value-isotopologue-distribution", color="info"),
+                create_button("Generate Individual Isotopologue Distribution Plot", "generate-isotopologue-distribution", color="success"),
+                create_button("Change Isotopologue Distribution Plot Settings", "change-settings-isotopologue-distribution", color="secondary")
             ),
             
             html.Div(id='isotopologue-distribution-container', 
@@ -287,28 +211,11 @@ def get_tab_volcano():
             justify='center',
             align='center'),
             
-            dbc.Row([
-                dbc.Col(
-                    create_button("Mark Significant Points",
-                                  "volcano-click-significant-points",
-                                  color="info"),
-                    className='just-a-button'
-                ),
-                dbc.Col(
-                    create_button("Generate Volcano Plot",
-                                  "generate-volcano-plot",
-                                  color="success"),
-                    className='just-a-button'
-                ),
-                dbc.Col(
-                    create_button("Change Volcano Settings",
-                                  "change-settings-volcano",
-                                  color="secondary"),
-                    className='just-a-button'
-                )
-            ],
-            justify='center',
-            align='center'),
+            _action_row(
+                create_button("Mark Significant Points", "volcano-click-significant-points", color="info"),
+                create_button("Generate Volcano Plot", "generate-volcano-plot", color="success"),
+                create_button("Change Volcano Settings", "change-settings-volcano", color="secondary")
+            ),
             
             dbc.Row([
                 dbc.Col(
@@ -350,20 +257,10 @@ def get_tab_lingress():
             justify='center',
             align='center'),
             
-            dbc.Row([
-                dbc.Col(
-                    create_button("Generate Linear Regression Plots",
-                                  "generate-lingress",
-                                  color="success"),
-                    className='just-a-button'
-                ),
-                dbc.Col(
-                    create_button("Change Linear Regression Plot Settings",
-                                  "change-settings-lingress",
-                                  color="secondary"),
-                    className='just-a-button'
-                ),
-            ]),
+            _action_row(
+                create_button("Generate Linear Regression Plots", "generate-lingress", color="success"),
+                create_button("Change Linear Regression Plot Settings", "change-settings-lingress", color="secondary")
+            ),
             
             html.Div(id='normalization-display-container-lingress', className='normalization-display'),
             
@@ -1,6 +1,33 @@
 # toast_component.py
 import dash_bootstrap_components as dbc
 
+# Shared by every toast: fixed position at the top right of the screen
+_TOAST_STYLE = {"position": "fixed", "top": 0, "right": 0, "width": 350, "zIndex": 9999}
+
+# CSS classes for each of the supported toast types
+_TOAST_CLASSES = {
+    'success': 'toast-success',
+    'error': 'toast-error',
+    'warning': 'toast-warning'
+}
+
+# Serialized Toast component for each toast type, only the header and message are filled in per call
+_TOAST_TEMPLATES = {
+    toast_type: dbc.Toast(
+        header='',
+        children='',
+        is_open=True,
+        dismissable=True,
+        # The className property is used to apply your custom CSS classes
+        className=toast_class,
+        # Override the position to 'fixed' and place at top right
+        style=_TOAST_STYLE,
+        duration=4000,  # Duration for auto-dismissal of toast
+    ).to_plotly_json()
+    for toast_type, toast_class in _TOAST_CLASSES.items()
+}
+
+
 def generate_toast(toast_type, header, message):
     """
     Generates a toast notification with custom styling.
@@ -15,7 +42,7 @@ def generate_toast(toast_type, header, message):
     - message (str): The main message text of the toast notification.
 
     Returns:
-    - dbc.Toast: A Toast component styled and configured to display as a popup notification.
+    - dict: A serialized dbc.Toast component styled and configured to display as a popup notification.
     
     The toast is set to dismiss after a set duration automatically and is styled according to the type 
     specified, which corresponds to custom CSS classes that control the appearance.
@@ -25,20 +52,19 @@ def generate_toast(toast_type, header, message):
     user actions.
 
     Note:
-    The 'className' attribute of the returned Toast is dynamically set based on the toast_type argument to 
-    match the corresponding CSS class for styling.
+    The Toast for each toast_type is built and serialized once at import, with the 'className' attribute 
+    matching the corresponding CSS class for styling. Each call only copies it and sets the header and message.
+    
+    Raises:
+    - KeyError: If toast_type is not one of 'success', 'error' or 'warning'.
     """
     
-    toast_class = f"toast-{toast_type}"
+    try:
+        template = _TOAST_TEMPLATES[toast_type]
+    except KeyError:
+        raise KeyError(f"Unknown toast type '{toast_type}', expected one of {list(_TOAST_TEMPLATES)}.")
     
-    return dbc.Toast(
-        header=header,
-        children=message,
-        is_open=True,
-        dismissable=True,
-        # The className property is used to apply your custom CSS classes
-        className=toast_class,
-        # Override the position to 'fixed' and place at top right
-        style={"position": "fixed", "top": 0, "right": 0, "width": 350, "zIndex": 9999},
-        duration=4000,  # Duration for auto-dismissal of toast
-    )
\ No newline at end of file
+    toast = dict(template)
+    toast['props'] = {**template['props'], 'header': header, 'children': message}
+    
+    return toast
@@ -4,10 +4,9 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 import warnings
-from scipy.stats import linregress
 from statsmodels.stats.multitest import multipletests
 
-from layout.utilities_figure import normalize_met_pool_data, group_met_pool_data, compile_met_pool_ratio_data, filter_and_order_isotopologue_data_by_met_class
+from layout.utilities_figure import normalize_met_pool_data, group_met_pool_data, compile_met_pool_ratio_data, filter_and_order_isotopologue_data_by_met_class, nan_row_stats, welch_ttest_pvalues
 from layout.config import get_pvalue_label_from_value
 
 def get_download_df_normalized_pool(df_pool, met_classes, normalization_selected, grouped_samples, met_ratio_selection):
@@ -50,7 +49,9 @@ def get_download_df_normalized_pool(df_pool, met_classes, normalization_selected
     # compiled and added to the end of the pool data dataframe
     if 'metabolite ratios' in met_classes and met_ratio_selection is not None:
         df_ratio = compile_met_pool_ratio_data(df_pool_normalized, met_ratio_selection)
-        df_pool_normalized_grouped = pd.concat([df_pool_normalized_grouped, df_ratio])
+        # Skip the concatenation (and the copy it makes) when no ratio could be compiled
+        if len(df_ratio):
+            df_pool_normalized_grouped = pd.concat([df_pool_normalized_grouped, df_ratio])
 
     return df_pool_normalized_grouped
 
@@ -73,9 +74,10 @@ def get_download_df_iso(df_iso, met_classes):
         Returns None if met_classes is empty.
     """
 
-    if df_iso['Compound'].isin(['group']).any():
-        df_iso = df_iso[~df_iso['Compound'].isin(['group'])]
-        df_iso = df_iso.reset_index(drop=True)
+    # Drop the 'group' rows, computing the mask only once
+    not_group = df_iso['Compound'].to_numpy() != 'group'
+    if not not_group.all():
+        df_iso = df_iso[not_group].reset_index(drop=True)
 
     if not met_classes:
          return None
@@ -83,7 +85,7 @@ def get_download_df_iso(df_iso, met_classes):
     return df_iso
 
 
-def get_download_df_lingress(df_var_data, df_pool, met_classes, normalization_selected, grouped_samples, met_ratio_selection):
+def get_download_df_lingress(df_var_data, df_pool, met_classes, normalization_selected, grouped_samples, met_ratio_selection, df_pool_normalized_grouped=None):
     """
     Performs linear regression analysis between metabolite data and an external variable for each compound
     and get it ready for downloading. 
@@ -103,6 +105,9 @@ def get_download_df_lingress(df_var_data, df_pool, met_classes, normalization_se
     met_ratio_selection : list
         A list of metabolite ratios to be included if 'metabolite ratios'
         is in the selected classes.
+    df_pool_normalized_grouped : pd.DataFrame, optional
+        The result of get_download_df_normalized_pool for the same arguments, if it was already
+        computed. It is computed here when not given.
 
     Returns:
     -------
@@ -111,115 +116,160 @@ def get_download_df_lingress(df_var_data, df_pool, met_classes, normalization_se
         Includes a 'ND Reason' column indicating reasons for compounds that were not analyzed.
     """
 
-    # Initialize an empty dataframe to store the results
-    results_list = []
-
-    # Get normalized and grouped pool data
-    df_pool_normalized_grouped = get_download_df_normalized_pool(df_pool, met_classes, normalization_selected, grouped_samples, met_ratio_selection)
+    # Get normalized and grouped pool data, unless the caller already has it
+    if df_pool_normalized_grouped is None:
+        df_pool_normalized_grouped = get_download_df_normalized_pool(df_pool, met_classes, normalization_selected, grouped_samples, met_ratio_selection)
     
     # Flatten grouped_samples to get a list of all relevant sample columns
     all_samples = [sample for group_samples in grouped_samples.values() for sample in group_samples]
 
-    for _, row in df_pool_normalized_grouped.iterrows():
-        compound_name = row['Compound']
-        met_values = row[all_samples].astype(float)
-        
-        df_var_data_filtered = df_var_data[all_samples].astype(float)
-        var_values = df_var_data_filtered.iloc[0]
-
-        # Filter out NaN values and ensure equal lengths
-        valid_indices = (~var_values.isna()) & (~met_values.isna())
-        var_values_filtered = var_values[valid_indices]
-        met_values_filtered = met_values[valid_indices]
-
-        # Skip if not enough valid data points
-        if len(var_values_filtered) < 2 or len(met_values_filtered) < 2:
-            results_list.append({
-                'Compound': compound_name,
-                'ND Reason': 'Insufficient valid data points'
-            })
-            continue
-
-        # Perform linear regression
-        try:
-            slope, intercept, r_value, p_value, std_err = linregress(var_values_filtered, met_values_filtered)
-            results_list.append({
-                'Compound': compound_name,
-                'slope': slope,
-                'intercept': intercept,
-                'r_value': r_value,
-                'p_value (two-sided Wald Test)': p_value,
-                'std_err': std_err,
-                'ND Reason': ''
-            })
-        except Exception as e:
-            results_list.append({
-                'Compound': compound_name,
-                'ND Reason': f'Error during linregress: {e}'
-            })
-
-    # Convert the results_list to a DataFrame
-    results_df = pd.DataFrame(results_list)
+    # Metabolite values (compounds x samples) and the external variable values, extracted once
+    met_values = df_pool_normalized_grouped[all_samples].to_numpy(dtype=np.float64)
+    var_values = df_var_data[all_samples].iloc[0].to_numpy(dtype=np.float64)
+    var_valid = ~np.isnan(var_values)
+
+    # Only use the samples where both the metabolite and the external variable have values
+    valid = ~np.isnan(met_values) & var_valid
+    n = valid.sum(axis=1)
+    x = np.where(valid, var_values, 0.0)
+    y = np.where(valid, met_values, 0.0)
+
+    # Whether all valid x (and y) values of a compound are exactly the same, from the range of the valid values,
+    # since the sums of square differences below can be tiny but not zero for identical non-integer values
+    identical_x = np.where(valid, var_values, -np.inf).max(axis=1) == np.where(valid, var_values, np.inf).min(axis=1)
+    identical_y = np.where(valid, met_values, -np.inf).max(axis=1) == np.where(valid, met_values, np.inf).min(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Means and average sums of square differences from the mean for each compound (as in scipy's linregress)
+        x_mean = x.sum(axis=1) / n
+        y_mean = y.sum(axis=1) / n
+        dx = np.where(valid, x - x_mean[:, None], 0.0)
+        dy = np.where(valid, y - y_mean[:, None], 0.0)
+        # einsum multiplies and sums each row in one pass, without a full-size product array
+        ssxm = np.einsum('ij,ij->i', dx, dx) / n
+        ssym = np.einsum('ij,ij->i', dy, dy) / n
+        ssxym = np.einsum('ij,ij->i', dx, dy) / n
+
+        r_value = np.where((ssxm == 0.0) | (ssym == 0.0), 0.0, np.clip(ssxym / np.sqrt(ssxm * ssym), -1.0, 1.0))
+        slope = ssxym / ssxm
+        intercept = y_mean - slope * x_mean
+
+        # n - 2 degrees of freedom, with two datapoints the fit is exact
+        dof = n - 2
+        t_value = r_value * np.sqrt(dof / ((1.0 - r_value + 1e-20) * (1.0 + r_value + 1e-20)))
+        p_value = 2 * stats.t.sf(np.abs(t_value), dof)
+        std_err = np.sqrt((1 - r_value**2) * ssym / ssxm / dof)
+
+    # Two datapoints: p-value is 1 for a flat line (no spread in y) and 0 otherwise
+    two_points = n == 2
+    p_value[two_points] = np.where(identical_y[two_points], 1.0, 0.0)
+    std_err[two_points] = 0.0
+
+    # Compounds that cannot be analyzed get the reason instead of the regression statistics
+    insufficient = n < 2
+    identical_x &= ~insufficient
+    not_analyzed = insufficient | identical_x
+
+    nd_reason = np.full(len(n), '', dtype=object)
+    nd_reason[identical_x] = 'Error during linregress: Cannot calculate a linear regression if all x values are identical'
+    nd_reason[insufficient] = 'Insufficient valid data points'
+
+    # Clear the statistics of those compounds in the arrays, before the DataFrame is built from them
+    for statistic in (slope, intercept, r_value, p_value, std_err):
+        statistic[not_analyzed] = np.nan
+
+    results_df = pd.DataFrame({
+        'Compound': df_pool_normalized_grouped['Compound'].to_numpy(),
+        'slope': slope,
+        'intercept': intercept,
+        'r_value': r_value,
+        'p_value (two-sided Wald Test)': p_value,
+        'std_err': std_err,
+        'ND Reason': nd_reason
+    })
 
     return results_df
 
 
 def perform_two_sided_ttest_download(df, pvalue_comparisons, grouped_samples, variance_threshold=1e-5):
-    df = df.copy()  # Make a copy of the DataFrame to avoid altering the original
-    results = []
-    all_p_values = []  # List to store all p-values from all comparisons
-    pvalue_index_info = []  # List to store index information for placing p-values back correctly
-
     # Check if 'Compound' column is present
     if 'Compound' not in df.columns:
         print("Columns in the DataFrame:", df.columns)
         raise KeyError("The 'Compound' column is not found in the DataFrame.")
     
-    
-    for metabolite in df['Compound']:
-        metabolite_results = {'Compound': metabolite}
-        for index, column_pair in enumerate(pvalue_comparisons):
-            group_list = list(grouped_samples.keys())
-            
-            # Access the group names using the indices provided by column_pair
-            group1_key = group_list[column_pair[0]]
-            group2_key = group_list[column_pair[1]]
-            
-            # Now use the keys to get the sample names from the grouped_samples dictionary
-            group1_sample_names = grouped_samples[group1_key]
-            group2_sample_names = grouped_samples[group2_key]
-            
-            # Extract the data for each group for the current metabolite and convert to numeric
-            group1_data = pd.to_numeric(df.loc[df['Compound'] == metabolite, group1_sample_names].values.flatten(), errors='coerce')
-            group2_data = pd.to_numeric(df.loc[df['Compound'] == metabolite, group2_sample_names].values.flatten(), errors='coerce')
-            
-            # Col name for the pvalue column with group names
-            p_col_name = f'p | {group1_key} vs {group2_key}'
-
-            # Handle cases with insufficient data with less than 2 datapoints in either group
-            if len(group1_data) < 2 or len(group2_data) < 2:
-                pvalue = np.nan
-                metabolite_results[p_col_name] = "insufficient data"
-            elif np.std(group1_data) < variance_threshold or np.std(group2_data) < variance_threshold:
-                pvalue = np.nan
-                metabolite_results[p_col_name] = "variance < 1E-08"
-            elif np.all(group1_data == group2_data):
-                pvalue = np.nan
-                metabolite_results[p_col_name] = "identical data"
+    compounds = df['Compound'].to_numpy()
+    group_list = list(grouped_samples.keys())
+
+    if not pvalue_comparisons:
+        return pd.DataFrame({'Compound': compounds}), [], []
+
+    # Convert the sample columns of the compared groups to numeric once and look them up by their
+    # position, the 'Compound' and 'pathway_class' columns are never converted or copied
+    sample_cols = list(dict.fromkeys(col for column_pair in pvalue_comparisons for group in column_pair for col in grouped_samples[group_list[group]]))
+    data = df[sample_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    col_to_pos = {col: i for i, col in enumerate(sample_cols)}
+
+    # Each group can take part in several comparisons, so the data and row statistics of every
+    # compared group are computed once and stacked into (compounds x groups) arrays
+    compared_groups = list(dict.fromkeys(group for column_pair in pvalue_comparisons for group in column_pair))
+    group_data = {}
+    group_n, group_mean, group_var, group_std = [], [], [], []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        for group in compared_groups:
+            group_data[group] = data[:, [col_to_pos[col] for col in grouped_samples[group_list[group]]]]
+            n, mean, var = nan_row_stats(group_data[group])
+            group_n.append(n)
+            group_mean.append(mean)
+            group_var.append(var)
+            group_std.append(np.std(group_data[group], axis=1))
+    group_pos = {group: i for i, group in enumerate(compared_groups)}
+
+    # Column positions of the first and second group of every comparison in the stacked arrays
+    pair_idx1 = np.array([group_pos[column_pair[0]] for column_pair in pvalue_comparisons], dtype=np.intp)
+    pair_idx2 = np.array([group_pos[column_pair[1]] for column_pair in pvalue_comparisons], dtype=np.intp)
+    comparison_names = [f'{group_list[column_pair[0]]} vs {group_list[column_pair[1]]}' for column_pair in pvalue_comparisons]
+
+    group_n, group_mean, group_var, group_std = (np.column_stack(stat) for stat in (group_n, group_mean, group_var, group_std))
+
+    # Welch's t-test of all compounds for all comparisons in one call, giving a (compounds x comparisons) array
+    pvalues = welch_ttest_pvalues(group_n[:, pair_idx1], group_mean[:, pair_idx1], group_var[:, pair_idx1],
+                                   group_n[:, pair_idx2], group_mean[:, pair_idx2], group_var[:, pair_idx2])
+    low_variance = (group_std[:, pair_idx1] < variance_threshold) | (group_std[:, pair_idx2] < variance_threshold)
+
+    n_compounds = len(compounds)
+    results = {'Compound': compounds}
+    for pair, column_pair in enumerate(pvalue_comparisons):
+        group1_data = group_data[column_pair[0]]
+        group2_data = group_data[column_pair[1]]
+
+        # Reason why a compound was not tested, empty for the tested compounds
+        nd_reason = np.full(n_compounds, '', dtype=object)
+
+        # Handle cases with insufficient data with less than 2 datapoints in either group
+        if group1_data.shape[1] < 2 or group2_data.shape[1] < 2:
+            tested = np.zeros(n_compounds, dtype=bool)
+            nd_reason[:] = "insufficient data"
+        else:
+            pair_low_variance = low_variance[:, pair]
+            if group1_data.shape == group2_data.shape:
+                identical = ~pair_low_variance & (group1_data == group2_data).all(axis=1)
             else:
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore", category=RuntimeWarning)
-                    pvalue = stats.ttest_ind(group1_data, 
-                                             group2_data, 
-                                             equal_var=False, 
-                                             nan_policy='omit', 
-                                             alternative='two-sided')[1]
-                metabolite_results[p_col_name] = pvalue
-
-            all_p_values.append(pvalue)
-            pvalue_index_info.append((metabolite, f'{group1_key} vs {group2_key}'))
-        
-        results.append(metabolite_results)
+                identical = np.zeros(n_compounds, dtype=bool)
+            tested = ~pair_low_variance & ~identical
+
+            nd_reason[pair_low_variance] = "variance < 1E-08"
+            nd_reason[identical] = "identical data"
+
+        # The p-value columns stay numeric (NaN for compounds that were not tested), the reasons
+        # are kept in a separate categorical column next to them
+        pvalues[~tested, pair] = np.nan
+        results[f'p | {comparison_names[pair]}'] = pvalues[:, pair]
+        results[f'ND Reason | {comparison_names[pair]}'] = pd.Categorical(nd_reason, categories=['', 'insufficient data', 'variance < 1E-08', 'identical data'])
+
+    # p-values and the index information for placing them back are listed per metabolite, then per comparison
+    all_p_values = list(pvalues.ravel())
+    pvalue_index_info = [(metabolite, comparison_name) for metabolite in compounds for comparison_name in comparison_names]
     
     return pd.DataFrame(results), all_p_values, pvalue_index_info
 
@@ -242,20 +292,14 @@ def apply_pvalue_correction_download(pvalues, correction_method):
         An array of corrected p-values with np.nan values in their original positions.
     """
 
-    # Identify the indices of valid p-values (non-NaN)
-    valid_indices = [i for i, p in enumerate(pvalues) if not np.isnan(p)]
-    valid_pvalues = [pvalues[i] for i in valid_indices]
+    # Identify the valid p-values (non-NaN) with one mask
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    valid_mask = ~np.isnan(pvalues)
 
-    # Apply correction only to valid p-values
-    if valid_pvalues:
-        corrected_pvalues = multipletests(valid_pvalues, alpha=0.05, method=correction_method)[1]
-
-        # Re-integrate the corrected p-values into the original list, preserving NaN positions
-        corrected_full = np.full_like(pvalues, np.nan, dtype=np.float64)  # Initialize array of NaNs with the same shape
-        for idx, corr_pval in zip(valid_indices, corrected_pvalues):
-            corrected_full[idx] = corr_pval
-    else:
-        corrected_full = np.full_like(pvalues, np.nan, dtype=np.float64)  # All values are NaN
+    # Apply correction only to valid p-values, the NaN values stay in their original positions
+    corrected_full = np.full_like(pvalues, np.nan)
+    if valid_mask.any():
+        corrected_full[valid_mask] = multipletests(pvalues[valid_mask], alpha=0.05, method=correction_method)[1]
 
     return corrected_full
 
@@ -282,27 +326,28 @@ def generate_corrected_pvalues_download(correction_method, all_p_values, pvalue_
     # Get the p-value correction method label name
     pvalue_correction_label = get_pvalue_label_from_value(correction_method)
     
-    # Initialize the corrected results DataFrame
-    unique_compounds = list(set([info[0] for info in pvalue_index_info]))
+    # Initialize the corrected results DataFrame, keeping the compounds in their original order
+    unique_compounds = list(dict.fromkeys(info[0] for info in pvalue_index_info))
     corrected_results_df = pd.DataFrame({'Compound': unique_compounds})
 
     # Correction of p-values if required
     if correction_method != 'none':
-        valid_pvalues = [p for p in all_p_values if not np.isnan(p) and p <= 1]
-        corrected_pvalues = apply_pvalue_correction_download(valid_pvalues, correction_method) if valid_pvalues else []
+        p_values = np.asarray(all_p_values, dtype=np.float64)
+        valid_mask = ~np.isnan(p_values) & (p_values <= 1)
+        corrected_pvalues = apply_pvalue_correction_download(p_values[valid_mask], correction_method) if valid_mask.any() else []
 
-        # Create a DataFrame to hold corrected p-values
-        comparison_columns = list(set([info[1].replace('p | ', '') for info in pvalue_index_info]))
-        for col in comparison_columns:
-            qvalue_col_name = f'q | {col} ({pvalue_correction_label})'
-            corrected_results_df[qvalue_col_name] = np.nan
+        # Categorical codes give the row (compound) and column (comparison) of every p-value
+        comparison_columns = list(dict.fromkeys(info[1].replace('p | ', '') for info in pvalue_index_info))
+        compound_codes = pd.Categorical([info[0] for info in pvalue_index_info], categories=unique_compounds).codes
+        comparison_codes = pd.Categorical([info[1].replace('p | ', '') for info in pvalue_index_info], categories=comparison_columns).codes
 
-        correction_map = dict(zip([pvalue_index_info[i] for i in range(len(all_p_values)) if all_p_values[i] in valid_pvalues], corrected_pvalues))
-        for index, (compound_key, col) in enumerate(pvalue_index_info):
-            original_col_name = col.replace('p | ', '')  # Remove 'p | ' from column name
-            qvalue_col_name = f'q | {original_col_name} ({pvalue_correction_label})'
-            corrected_pvalue = correction_map.get((compound_key, col), np.nan)
-            corrected_results_df.loc[corrected_results_df['Compound'] == compound_key, qvalue_col_name] = corrected_pvalue
+        # Place the corrected p-values in a compounds x comparisons array in one step
+        qvalues = np.full((len(unique_compounds), len(comparison_columns)), np.nan)
+        qvalues[compound_codes[valid_mask], comparison_codes[valid_mask]] = corrected_pvalues
+
+        for col_index, col in enumerate(comparison_columns):
+            qvalue_col_name = f'q | {col} ({pvalue_correction_label})'
+            corrected_results_df[qvalue_col_name] = qvalues[:, col_index]
 
     return corrected_results_df
 
@@ -312,14 +357,18 @@ def sort_pvalue_df_cols(df_pvalues, df_qvalues):
     df_pvalues = df_pvalues.sort_values(by='Compound').reset_index(drop=True)
     df_qvalues = df_qvalues.sort_values(by='Compound').reset_index(drop=True)
 
-    # Merge the DataFrames on 'Compound'
-    df_merged = pd.merge(df_pvalues, df_qvalues, on='Compound')
+    # Both DataFrames hold the same compounds in the same order after sorting, so their columns
+    # can be put side by side. Fall back to merging on 'Compound' if the rows do not line up.
+    if df_pvalues['Compound'].equals(df_qvalues['Compound']):
+        df_merged = pd.concat([df_pvalues, df_qvalues.drop(columns='Compound')], axis=1)
+    else:
+        df_merged = pd.merge(df_pvalues, df_qvalues, on='Compound')
 
-    # Extract p-value and q-value columns
-    p_columns = [col for col in df_pvalues.columns if col != 'Compound']
+    # Extract p-value, q-value and not-tested reason columns
+    p_columns = [col for col in df_pvalues.columns if col.startswith('p | ')]
     q_columns = [col for col in df_qvalues.columns if col != 'Compound']
 
-    # Create a mapping of comparison names to p and q columns
+    # Create a mapping of comparison names to p, q and reason columns
     comparison_pairs = {}
     for p_col in p_columns:
         comparison_name = p_col.split(' | ')[1]
@@ -328,14 +377,16 @@ def sort_pvalue_df_cols(df_pvalues, df_qvalues):
         if matching_q_col:
             comparison_pairs[comparison_name] = {
                 'p_col': p_col,
-                'q_col': matching_q_col
+                'q_col': matching_q_col,
+                'reason_col': f'ND Reason | {comparison_name}'
             }
 
-    # Reorder columns to interleave p and q values
+    # Reorder columns to interleave p and q values, followed by the reason of each comparison
     ordered_columns = ['Compound']
     for comparison, cols in comparison_pairs.items():
         ordered_columns.append(cols['p_col'])
         ordered_columns.append(cols['q_col'])
+        ordered_columns.append(cols['reason_col'])
 
     df_merged = df_merged[ordered_columns]
 
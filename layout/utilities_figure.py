@@ -8,6 +8,10 @@ from scipy.stats import linregress
 from statsmodels.stats.multitest import multipletests
 
 import os
+import warnings
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import combinations
 from datetime import datetime
 import time
 
@@ -36,16 +40,21 @@ def generate_single_met_pool_figure(df_metabolite, grouped_samples, settings):
     
     factor_mult = 1000  # Multiplication factor for y-values
     
+    # Column positions and the metabolite row values, looked up once for all sample groups
+    col_to_pos = {col: i for i, col in enumerate(df_metabolite.columns)}
+    row_values = df_metabolite.iloc[0].to_numpy()
+    
     # Loop through each sample group, creating box plots for each
     for sample_group, cols_in_group in grouped_samples.items():
         
-        sample_group_cols = np.where(np.isin(df_metabolite.columns, cols_in_group))[0]
+        # Positions of the group's columns, in the column order of the DataFrame
+        sample_group_cols = sorted({col_to_pos[col] for col in cols_in_group if col in col_to_pos})
         
         # Scaling y-values
-        y_values = df_metabolite.iloc[0, sample_group_cols] * factor_mult
+        y_values = row_values[sample_group_cols].astype(np.float64) * factor_mult
         
         # Counting zero values
-        zero_values_count = (y_values == 0).sum()
+        zero_values_count = int((y_values == 0).sum())
         
         # Creating hover text for each box plot
         hover_text = df_metabolite.columns[sample_group_cols].to_list()
@@ -156,14 +165,14 @@ def update_metabolomics_figure_layout(fig, array_columns, settings):
         adjusted_interline = interline
         adjusted_text_offset = text_offset
     
-    # If height or top margin are None, assign them a value
-    current_height = fig.layout.height
+    # Read the current height and top margin once, if they are None assign them a value
+    current_height = fig.layout.height or settings['height']
     current_margin_t = fig.layout.margin.t or 0  # assuming 0 as a default top margin value
     
-    # Update the figure layout (height and margins)
+    # Update the figure layout (height and margins) in a single call
     fig.update_layout(
         height=current_height + adjusted_additional_space,
-        margin=dict(t=current_margin_t + adjusted_additional_space)
+        margin_t=current_margin_t + adjusted_additional_space
     )
     # Adjust the domain to maintain data's vertical space after plot height increase
     fig.update_yaxes(domain=[0, 0.99])  
@@ -171,7 +180,7 @@ def update_metabolomics_figure_layout(fig, array_columns, settings):
     return adjusted_interline, adjusted_text_offset
 
 
-def calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met_name, corrected_pvalues, numerical_present, label=None):
+def calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met_name, corrected_pvalues, numerical_present, label=None, pvalue=None):
     '''
     Calculates the p-value of the two sets of observations and determines the appropriate
     annotation symbol to display on the plot. Handles edge cases such as zero variance or insufficient data.
@@ -186,6 +195,9 @@ def calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met
         If True, returns a string with the actual p-value rounded to four decimal places
         or "< 0.0001" if the p-value is smaller than 0.0001. Otherwise, it returns a string
         of asterisks representing the significance level or 'ns' for not significant.
+    pvalue : float, optional
+        The p-value of the t-test between the zero-filtered observations, when it was already computed
+        for many comparisons at once. If None, the t-test is performed here.
 
     Returns:
     -------
@@ -215,8 +227,9 @@ def calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met
     if np.all(y0_data == y1_data):
         return "identical"
     
-    # Perform t-test
-    pvalue = perform_two_sided_ttest(filtered_y0_data, filtered_y1_data)
+    # Perform t-test unless the p-value was already computed
+    if pvalue is None:
+        pvalue = perform_two_sided_ttest(filtered_y0_data, filtered_y1_data)
     
     uncorrected_symbol = get_significance_symbol(pvalue, numerical_present, label='p')
 
@@ -225,19 +238,24 @@ def calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met
         # Ensure you are fetching the value using both 'met_name' and 'label' as indices
         if label is not None:
             try:
-                corrected_pvalue = corrected_pvalues.at[(met_name, label), str(column_pair)]
+                corrected_pvalue = corrected_pvalues.at[(met_name, label), tuple(column_pair)]
                 corrected_symbol = get_significance_symbol(corrected_pvalue, numerical_present, label='q')
                 return f"{uncorrected_symbol} | {corrected_symbol}"
             except KeyError:
                 return uncorrected_symbol  # Return uncorrected symbol if no corrected p-value exists
         else:
-            corrected_pvalue = corrected_pvalues.at[met_name, str(column_pair)]
+            corrected_pvalue = corrected_pvalues.at[met_name, tuple(column_pair)]
             corrected_symbol = get_significance_symbol(corrected_pvalue, numerical_present, label='q')
             return f"{uncorrected_symbol} | {corrected_symbol}"
     else:
         return uncorrected_symbol  # Handling cases where the corrected p-values DataFrame does not exist or is empty
 
 
+# p-value thresholds and the significance symbol of each bucket they delimit
+_SIGNIFICANCE_THRESHOLDS = (0.001, 0.01, 0.05)
+_SIGNIFICANCE_SYMBOLS = ('***', '**', '*', 'ns')
+
+
 def get_significance_symbol(pvalue, numerical_present, label=None):
     '''
     Determines the appropriate annotation symbol based on the provided p-value.
@@ -260,15 +278,9 @@ def get_significance_symbol(pvalue, numerical_present, label=None):
     if pvalue is None or np.isnan(pvalue):
         return 'nd'  # Not determined or data not available
 
-    # Determine the symbol or numeric representation based on the p-value
-    if pvalue < 0.001:
-        symbol = '***'
-    elif pvalue < 0.01:
-        symbol = '**'
-    elif pvalue < 0.05:
-        symbol = '*'
-    else:
-        symbol = 'ns'
+    # Determine the symbol or numeric representation based on the p-value, the bucket is the number
+    # of thresholds that the p-value is not below
+    symbol = _SIGNIFICANCE_SYMBOLS[bisect_right(_SIGNIFICANCE_THRESHOLDS, pvalue)]
 
     # If numerical representation is requested and the p-value is above a certain threshold
     if numerical_present:
@@ -281,7 +293,7 @@ def get_significance_symbol(pvalue, numerical_present, label=None):
 
 
 # Adapted from https://stackoverflow.com/questions/67505252/plotly-box-p-value-significant-annotation
-def add_pvalue_shapes_and_annotations(fig, index, column_pair, symbol, settings, y_range, adjusted_text_offset, color='black'):
+def add_pvalue_shapes_and_annotations(fig, index, column_pair, symbol, settings, y_range, adjusted_text_offset, color='black', shapes=None, annotations=None):
     '''
     Adds line shapes and text annotations for displaying p-values on a given Plotly figure.
 
@@ -303,28 +315,30 @@ def add_pvalue_shapes_and_annotations(fig, index, column_pair, symbol, settings,
         The calculated offset to apply to the y-coordinate for text annotations.
     color : str
         The color for the annotation lines and text.
+    shapes, annotations : list, optional
+        When given, the shape and annotation dicts are appended to these lists instead of being
+        added to the figure, so that the caller can add all of them in a single layout update.
+        Otherwise they are added to the figure in one layout update of their own.
 
     Returns:
     -------
     None
     '''
     
-    # Adding line shapes for p-value annotations
-    for column in column_pair:
-        fig.add_shape(type="line",
-            xref="x", yref="paper",
-            x0=column, y0=y_range[index][0], 
-            x1=column, y1=y_range[index][1],
-            line=dict(color=color, width=0.7))
-        
-    fig.add_shape(type="line",
-        xref="x", yref="paper",
-        x0=column_pair[0], y0=y_range[index][1], 
-        x1=column_pair[1], y1=y_range[index][1],
-        line=dict(color=color, width=0.7))
-    
-    # Adding text annotations for p-values
-    fig.add_annotation(dict(
+    # Line shapes for p-value annotations, two vertical ticks and the horizontal bracket
+    line = dict(color=color, width=0.7)
+    pvalue_shapes = [dict(type="line", xref="x", yref="paper",
+                          x0=column, y0=y_range[index][0],
+                          x1=column, y1=y_range[index][1],
+                          line=line)
+                     for column in column_pair]
+    pvalue_shapes.append(dict(type="line", xref="x", yref="paper",
+                              x0=column_pair[0], y0=y_range[index][1],
+                              x1=column_pair[1], y1=y_range[index][1],
+                              line=line))
+    
+    # Text annotation for the p-value
+    pvalue_annotation = dict(
         font=dict(
             color=color,
             family=settings['font_selector'],
@@ -337,7 +351,15 @@ def add_pvalue_shapes_and_annotations(fig, index, column_pair, symbol, settings,
         textangle=0,
         xref="x",
         yref="paper"
-    ))
+    )
+
+    if shapes is not None and annotations is not None:
+        shapes.extend(pvalue_shapes)
+        annotations.append(pvalue_annotation)
+    else:
+        # Add the three lines and the text as plain dicts in one layout update
+        fig.update_layout(shapes=fig.layout.shapes + tuple(pvalue_shapes),
+                          annotations=fig.layout.annotations + (pvalue_annotation,))
 
 
 def add_p_value_annotations_pool(fig, met_name, array_columns, numerical_present, corrected_pvalues, settings, color='black'):
@@ -378,7 +400,8 @@ def add_p_value_annotations_pool(fig, met_name, array_columns, numerical_present
         y_range[i] = [1.01 + (i * adjusted_interline if i > 0 else 0),
                       1.02 + i * adjusted_interline]
 
-    # Print the p-values
+    # Print the p-values, collecting the shapes and annotations of all comparisons
+    shapes, annotations = [], []
     for index, column_pair in enumerate(array_columns):
         # Read the data from the figure
         y0_data = np.array(fig.data[column_pair[0]]['y']).astype(float)
@@ -387,7 +410,11 @@ def add_p_value_annotations_pool(fig, met_name, array_columns, numerical_present
         # Get the pvalue annotation symbol from calculate_pvalue_and_symbol function
         symbol = calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met_name, corrected_pvalues, numerical_present)
         
-        add_pvalue_shapes_and_annotations(fig, index, column_pair, symbol, settings, y_range, adjusted_text_offset, color='black')
+        add_pvalue_shapes_and_annotations(fig, index, column_pair, symbol, settings, y_range, adjusted_text_offset, color='black',
+                                          shapes=shapes, annotations=annotations)
+    
+    # Add all p-value shapes and annotations in a single layout update
+    fig.update_layout(shapes=fig.layout.shapes + tuple(shapes), annotations=fig.layout.annotations + tuple(annotations))
     
     return fig
 
@@ -413,34 +440,47 @@ def generate_single_met_iso_figure(df_metabolite, grouped_samples, settings):
     
     fig = go.Figure()
     
-    # Initialize num_not_detected with zeros for each sample group
-    num_not_detected = {sample_group: 0 for sample_group in grouped_samples}
-
-    # Iterate over each sample group to count non-detected samples by column
-    for sample_group, cols_in_group in grouped_samples.items():
-        # Check each column in the current group
-        for col in cols_in_group:
-            # If all values in the column are zero, increment the count for this group
-            if (df_metabolite[col].sum() == 0):
-                num_not_detected[sample_group] += 1
+    # Sample values as one array and the column positions of each group, computed once for all labels
+    sample_columns = list(dict.fromkeys(col for cols_in_group in grouped_samples.values() for col in cols_in_group))
+    col_to_pos = {col: i for i, col in enumerate(sample_columns)}
+    sample_values = df_metabolite[sample_columns].to_numpy(dtype=np.float64)
+    group_cols = {sample_group: np.asarray([col_to_pos[col] for col in cols_in_group], dtype=np.int64)
+                  for sample_group, cols_in_group in grouped_samples.items()}
+    
+    # Count the non-detected samples of each group, a sample is not detected when all of its values sum to zero
+    # (missing values are skipped like in a pandas column sum)
+    not_detected = np.nansum(sample_values, axis=0) == 0
+    num_not_detected = {sample_group: int(not_detected[group_cols[sample_group]].sum()) for sample_group in grouped_samples}
+    
+    # Row positions of every label from a single pass over 'C_Label', labels in order of appearance
+    label_codes, unique_labels = pd.factorize(df_metabolite['C_Label'])
+    label_order = np.argsort(label_codes, kind='stable')
+    label_positions = np.split(label_order, np.cumsum(np.bincount(label_codes, minlength=len(unique_labels)))[:-1])
     
     # Iterating over unique labels in the DataFrame to generate bar plots for each.
-    for label in df_metabolite['C_Label'].unique():
+    for label, positions in zip(unique_labels, label_positions):
         y_values, y_errors, hover_texts, x_values = [], [], [], []
         
-        
+        # Rows of the current label, selected once for all sample groups
+        label_rows = sample_values[positions]
         
         # Iterating over grouped samples to calculate means, errors and generate hover texts.
         for sample_group, cols_in_group in grouped_samples.items():
-            data_for_label = df_metabolite[df_metabolite['C_Label'] == label][cols_in_group]
+            label_values = label_rows[:, group_cols[sample_group]]
             
-            mean_for_label = data_for_label.mean(axis=1).mean()
-            std_for_label = data_for_label.std(axis=1).mean()
+            # Mean of the row means and of the row standard deviations, from one pass over the values
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                _, row_means, row_vars = nan_row_stats(label_values)
+                mean_for_label = np.nanmean(row_means)
+                std_for_label = np.nanmean(np.sqrt(row_vars))
             
-            # Generating hover text for each bar in the plot.
-            hover_data = data_for_label.stack().reset_index()
+            # Generating hover text for each bar in the plot, one line per non-missing value
+            # (row by row, like the stacked data) straight from the array
             hover_texts.append(
-                "<br>".join([f"M{label}, {row['level_1']}: {row[0]:.3f}" for _, row in hover_data.iterrows()]) +
+                "<br>".join([f"M{label}, {col}: {value:.3f}"
+                             for row in label_values
+                             for col, value in zip(cols_in_group, row) if not np.isnan(value)]) +
                 f"<br>Average: {mean_for_label:.3f} ± {std_for_label:.3f}"
             )
             
@@ -455,14 +495,15 @@ def generate_single_met_iso_figure(df_metabolite, grouped_samples, settings):
             
             x_values.append(x_value)
         
-        # Adding each isotopologue as a separate trace in the bar plot.
+        # Adding each isotopologue as a separate trace in the bar plot, the values are passed as arrays
+        # so that Plotly takes them as a whole instead of converting element by element
         fig.add_trace(go.Bar(
             x=x_values,
-            y=y_values,
+            y=np.asarray(y_values, dtype=np.float64),
             width=settings['boxwidth'],
             name=f'M{int(label)}',
             marker_color=iso_color_palette[int(label)],  # Using a predefined color palette.
-            error_y=dict(type='data', array=y_errors, visible=True),
+            error_y=dict(type='data', array=np.asarray(y_errors, dtype=np.float64), visible=True),
             hoverinfo="text+name",
             hovertext=hover_texts,
             hovertemplate="%{hovertext}<extra></extra>",
@@ -542,7 +583,8 @@ def add_p_value_annotations_iso(fig, df_metabolite, met_name, grouped_samples, a
     # Get data where the C_label is not 0
     df_metabolite_label = df_metabolite[df_metabolite['C_Label'] != 0]
     
-    # Enumerate through the p_value comparisons submitted by the user
+    # Enumerate through the p_value comparisons submitted by the user, collecting the shapes and annotations
+    shapes, annotations = [], []
     for index, column_pair in enumerate(array_columns):
         
         group_list = list(grouped_samples.keys())
@@ -562,7 +604,11 @@ def add_p_value_annotations_iso(fig, df_metabolite, met_name, grouped_samples, a
         # Get the pvalue annotation symbol from calculate_pvalue_and_symbol function
         symbol = calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met_name, corrected_pvalues, numerical_present)
 
-        add_pvalue_shapes_and_annotations(fig, index, column_pair, symbol, settings, y_range, adjusted_text_offset, color)
+        add_pvalue_shapes_and_annotations(fig, index, column_pair, symbol, settings, y_range, adjusted_text_offset, color,
+                                          shapes=shapes, annotations=annotations)
+    
+    # Add all p-value shapes and annotations in a single layout update
+    fig.update_layout(shapes=fig.layout.shapes + tuple(shapes), annotations=fig.layout.annotations + tuple(annotations))
     
     return fig
 
@@ -586,7 +632,7 @@ def generate_corrected_pvalues(df, grouped_samples, comparisons, correction_meth
     Returns:
     -------
     pandas.DataFrame
-        A DataFrame with one column per comparison, containing the corrected p-values, and retains specified columns with metabolite information.
+        A DataFrame with one column per comparison (labelled by the comparison pair as a tuple), containing the corrected p-values, and retains specified columns with metabolite information.
     """
 
     # Convert numeric columns in the dataframe to numeric type
@@ -613,66 +659,120 @@ def generate_corrected_pvalues(df, grouped_samples, comparisons, correction_meth
         summed_df = df.set_index('Compound')
         results_df = pd.DataFrame(index=summed_df.index.unique())
 
-    all_p_values = []  # List to store all p-values from all comparisons
-    pvalue_indices = []  # List to store index information for placing p-values back correctly
-
-    keys_list = list(grouped_samples.keys())
+    keys_list = tuple(grouped_samples)
+
+    # Convert the sample columns to one array once, zero values are ignored like missing ones, and
+    # keep the column positions of each group so that the statistics only slice this array
+    sample_columns = list(dict.fromkeys(numeric_columns))
+    col_to_pos = {col: i for i, col in enumerate(sample_columns)}
+    sample_values = summed_df[sample_columns].to_numpy(dtype=np.float64, copy=True)
+    sample_values[sample_values == 0] = np.nan
+    group_cols = {key: np.asarray([col_to_pos[col] for col in cols], dtype=np.int64) for key, cols in grouped_samples.items()}
+
+    if comparisons:
+        # Count, mean and variance of every group for all rows, computed once (rows x groups) and shared
+        # by all comparisons that include the group
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            group_stats = [nan_row_stats(sample_values[:, group_cols[key]]) for key in keys_list]
+        group_n, group_mean, group_var = (np.column_stack(stat) for stat in zip(*group_stats))
+
+        # Welch's t-test for all rows and comparisons in one go (rows x comparisons)
+        pair_idx1 = np.asarray([comp_pair[0] for comp_pair in comparisons], dtype=np.int64)
+        pair_idx2 = np.asarray([comp_pair[1] for comp_pair in comparisons], dtype=np.int64)
+        all_p_values = welch_ttest_row_stats((group_n[:, pair_idx1], group_mean[:, pair_idx1], group_var[:, pair_idx1]),
+                                             (group_n[:, pair_idx2], group_mean[:, pair_idx2], group_var[:, pair_idx2]))
+
+        # Correction of the valid p-values of all comparisons together (one row per comparison)
+        all_p_values = np.ascontiguousarray(all_p_values.T)
+        valid_mask = ~np.isnan(all_p_values) & (all_p_values <= 1)
+
+        corrected_pvalues = np.full_like(all_p_values, np.nan)
+        if valid_mask.any():
+            corrected_pvalues[valid_mask] = apply_pvalue_correction(all_p_values[valid_mask], correction_method)
+
+        # One column per comparison, labelled by the comparison pair as a tuple (kept as a flat Index of tuples
+        # instead of a MultiIndex), built as a whole from the corrected block
+        comparison_labels = pd.Index([tuple(comp_pair) for comp_pair in comparisons], tupleize_cols=False)
+        results_df = pd.DataFrame(corrected_pvalues.T, index=results_df.index, columns=comparison_labels)
 
-    for comp_pair in comparisons:
-        column_name = str(comp_pair)
-        p_values = []
+    return results_df
 
-        for idx, group_data in summed_df.iterrows():
-            compound_key = idx  # compound_key is set directly from the index
-            group1_columns = grouped_samples[keys_list[comp_pair[0]]]
-            group2_columns = grouped_samples[keys_list[comp_pair[1]]]
 
-            try:
-                data_group1 = pd.to_numeric(group_data[group1_columns].replace(0, np.nan).dropna(), errors='coerce')
-                data_group2 = pd.to_numeric(group_data[group2_columns].replace(0, np.nan).dropna(), errors='coerce')
+def nan_row_stats(data):
+    """
+    Count, mean and sample variance (ddof=1) of each row of a 2D array, ignoring NaN values.
+    The NaN mask is built once and shared by all three statistics.
+    """
+    valid = ~np.isnan(data)
+    n = valid.sum(axis=1)
+    mean = np.where(valid, data, 0.0).sum(axis=1) / n
+    deviation = np.where(valid, data - mean[:, None], 0.0)
+    var = np.where(n > 1, np.einsum('ij,ij->i', deviation, deviation) / (n - 1), np.nan)
+    return n, mean, var
 
-            except KeyError as e:
-                print(f"KeyError: {e}")
-                continue
 
-            if data_group1.empty or data_group2.empty:
-                pvalue = np.nan
-            else:
-                pvalue = perform_two_sided_ttest(data_group1, data_group2)
+def welch_ttest_pvalues(n1, mean1, var1, n2, mean2, var2):
+    """
+    Two-sided Welch's t-test from the count, mean and sample variance of both groups (arrays of any shape).
+    Gives the same p-values as stats.ttest_ind(..., equal_var=False, nan_policy='omit') on the raw data.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        vn1 = var1 / n1
+        vn2 = var2 / n2
 
-            p_values.append(pvalue)
-            all_p_values.append(pvalue)
-            pvalue_indices.append((compound_key, column_name))
+        # Welch-Satterthwaite degrees of freedom, scipy falls back to 1 when they are undefined
+        dof = (vn1 + vn2)**2 / (vn1**2 / (n1 - 1) + vn2**2 / (n2 - 1))
+        dof = np.where(np.isnan(dof), 1, dof)
 
-        results_df[column_name] = p_values  # Store uncorrected p-values temporarily
+        t_value = (mean1 - mean2) / np.sqrt(vn1 + vn2)
+        return 2 * stats.t.sf(np.abs(t_value), dof)
 
-    # Correction of p-values
-    valid_pvalues = [p for p in all_p_values if not np.isnan(p) and p <= 1]
 
-    corrected_pvalues = apply_pvalue_correction(valid_pvalues, correction_method) if valid_pvalues else []
+def welch_ttest_row_stats(stats_1, stats_2, variance_threshold=1e-8):
+    """
+    Welch's t-test p-values from the (count, mean, sample variance) statistics of both groups, as returned by
+    nan_row_stats, with the conditions of perform_two_sided_ttest: NaN unless both groups have more than one
+    value and a population variance above variance_threshold.
+    """
+    n1, mean1, var1 = stats_1
+    n2, mean2, var2 = stats_2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        tested = (n1 > 1) & (n2 > 1) & (var1 * (n1 - 1) / n1 > variance_threshold) & (var2 * (n2 - 1) / n2 > variance_threshold)
+    return np.where(tested, welch_ttest_pvalues(n1, mean1, var1, n2, mean2, var2), np.nan)
 
-    correction_map = dict(zip([pvalue_indices[i] for i in range(len(all_p_values)) if all_p_values[i] in valid_pvalues], corrected_pvalues))
-    for index, (compound_key, col) in enumerate(pvalue_indices):
-        corrected_pvalue = correction_map.get((compound_key, col), np.nan)
-        results_df.loc[compound_key, col] = corrected_pvalue
 
-    return results_df
+def welch_ttest_rows(values_1, values_2, variance_threshold=1e-8):
+    """
+    Welch's t-test p-value of each row of two 2D arrays, ignoring NaN values (see welch_ttest_row_stats).
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        stats_1, stats_2 = nan_row_stats(values_1), nan_row_stats(values_2)
+    return welch_ttest_row_stats(stats_1, stats_2, variance_threshold)
 
 
 def perform_two_sided_ttest(group_1, group_2, variance_threshold=1e-8):
     # Convert to numpy arrays to ignore any index-related issues
-    group_1 = np.array(group_1)
-    group_2 = np.array(group_2)
-
-    # Perform t-test if conditions are met
-    if len(group_1) > 1 and len(group_2) > 1 and np.var(group_1) > variance_threshold and np.var(group_2) > variance_threshold:
-        pvalue = stats.ttest_ind(group_1, 
-                                 group_2, 
-                                 equal_var=False, 
-                                 nan_policy='omit', 
-                                 alternative='two-sided')[1]
+    group_1 = np.asarray(group_1, dtype=np.float64)
+    group_2 = np.asarray(group_2, dtype=np.float64)
+
+    n1, n2 = len(group_1), len(group_2)
+    if n1 < 2 or n2 < 2:
+        return np.nan
+
+    # Sample variance of each group computed once, the population variance for the threshold is derived from it
+    var1 = group_1.var(ddof=1)
+    var2 = group_2.var(ddof=1)
+
+    # Perform Welch's t-test if conditions are met, straight from the group statistics
+    # (same p-value as stats.ttest_ind with equal_var=False, without its per-call input handling)
+    if var1 * (n1 - 1) / n1 > variance_threshold and var2 * (n2 - 1) / n2 > variance_threshold:
+        pvalue = welch_ttest_pvalues(n1, group_1.mean(), var1, n2, group_2.mean(), var2)
         
-        return pvalue
+        return float(pvalue)
     else:
         return np.nan
     
@@ -698,24 +798,38 @@ def apply_pvalue_correction(pvalues, correction_method):
         An array of corrected p-values with np.nan values in their original positions.
     """
 
-    # Identify the indices of valid p-values (non-NaN)
-    valid_indices = [i for i, p in enumerate(pvalues) if not np.isnan(p)]
-    valid_pvalues = [pvalues[i] for i in valid_indices]
+    # Identify the valid p-values (non-NaN) with one mask
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    valid_mask = ~np.isnan(pvalues)
 
-    # Apply correction only to valid p-values
-    if valid_pvalues:
-        corrected_pvalues = multipletests(valid_pvalues, alpha=0.05, method=correction_method)[1]
-
-        # Re-integrate the corrected p-values into the original list, preserving NaN positions
-        corrected_full = np.full_like(pvalues, np.nan, dtype=np.float64)  # Initialize array of NaNs with the same shape
-        for idx, corr_pval in zip(valid_indices, corrected_pvalues):
-            corrected_full[idx] = corr_pval
-    else:
-        corrected_full = np.full_like(pvalues, np.nan, dtype=np.float64)  # All values are NaN
+    # Apply correction only to valid p-values, the NaN values stay in their original positions
+    corrected_full = np.full_like(pvalues, np.nan)
+    if valid_mask.any():
+        valid_pvalues = pvalues[valid_mask]
+        
+        # Redraws of the same data correct the same p-values again, so small sizes are looked up
+        # by their exact bytes (the key is the data itself, a new upload can not hit a stale entry).
+        # With at most 16 entries of under 10,000 p-values the memoized keys and results stay below 3 MB
+        if valid_pvalues.size < 10_000:
+            corrected_full[valid_mask] = _cached_multipletests(valid_pvalues.tobytes(), correction_method)
+        else:
+            corrected_full[valid_mask] = multipletests(valid_pvalues, alpha=0.05, method=correction_method)[1]
 
     return corrected_full
 
 
+@lru_cache(maxsize=16)
+def _cached_multipletests(pvalue_bytes, correction_method):
+    """
+    Memoized multipletests correction of the float64 p-values in pvalue_bytes (the result is read-only).
+    """
+
+    corrected = multipletests(np.frombuffer(pvalue_bytes, dtype=np.float64), alpha=0.05, method=correction_method)[1]
+    corrected.flags.writeable = False
+
+    return corrected
+
+
 def normalize_met_pool_data(df_pool, grouped_samples, normalization_list):
     '''
     Normalizes a DataFrame of pool metabolomics data based on selected sample group values 
@@ -746,25 +860,21 @@ def normalize_met_pool_data(df_pool, grouped_samples, normalization_list):
         # Flatten grouped_samples to get a list of all relevant sample columns
         all_samples = [sample for group_samples in grouped_samples.values() for sample in group_samples]
     
-    # Filter the DataFrame to include only the relevant sample columns
-    df_pool_filter = df_pool[all_samples]
-    
-    # Concatenate the metabolite names column back to the filtered DataFrame
-    df_pool_filtered = pd.concat([pool_met_name_column, df_pool_filter], axis=1)
+    # Take the values of the relevant sample columns as one array
+    pool_values = df_pool[all_samples].to_numpy(dtype=np.float64)
     
-    # Extract rows corresponding to metabolites in the normalization_list
-    df_pool_normalization = df_pool_filtered[df_pool_filtered['Compound'].isin(normalization_list)]
+    # Find the rows corresponding to metabolites in the normalization_list
+    normalization_rows = pool_met_name_column.isin(normalization_list).to_numpy()
     
     # Calculate the normalization factors by taking the product of values in normalization rows
-    df_pool_norm_series = df_pool_normalization.set_index('Compound').prod().to_list()
+    # (missing values are skipped like in a pandas product)
+    pool_norm_factors = np.nanprod(pool_values[normalization_rows], axis=0)
     
-    # Normalize the DataFrame using the calculated normalization factors
-    df_pool_normalized = df_pool_filtered.set_index("Compound").div(df_pool_norm_series)
-    df_pool_normalized = df_pool_normalized.reset_index(drop=False)
-    
-    # Remove rows corresponding to the metabolites used for normalization
-    df_pool_normalized = df_pool_normalized[~df_pool_normalized['Compound'].isin(normalization_list)]
-    df_pool_normalized = df_pool_normalized.reset_index(drop=True)
+    # Normalize the remaining rows using the calculated normalization factors, the metabolites used
+    # for normalization are left out before dividing, and the frame is built once from the result
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df_pool_normalized = pd.DataFrame(pool_values[~normalization_rows] / pool_norm_factors, columns=all_samples)
+    df_pool_normalized.insert(0, 'Compound', pool_met_name_column[~normalization_rows].to_numpy())
     
     return df_pool_normalized
 
@@ -790,11 +900,17 @@ def group_met_pool_data(df, selected_met_classes):
     # Filter the metabolite groups based on the selected metabolite classes
     df_met_group_select = df_met_group_list[df_met_group_list['pathway_class'].isin(selected_met_classes)]
     
-    # Merge the selected metabolite groups with the normalized pool data
-    df_filtered = df_met_group_select.merge(df, left_on='analyte_name', right_on='Compound', how='inner')
+    # Integer codes of the metabolite names from one factorization of both name columns, so that the
+    # merge hashes integers instead of comparing strings
+    key_codes, _ = pd.factorize(pd.concat([df_met_group_select['analyte_name'], df['Compound']], ignore_index=True))
+    num_selected = len(df_met_group_select)
+    
+    # Merge the selected metabolite groups with the normalized pool data on the name codes
+    df_filtered = df_met_group_select.assign(met_key=key_codes[:num_selected]).merge(
+        df.assign(met_key=key_codes[num_selected:]), on='met_key', how='inner', sort=False)
     
-    # Drop the redundant 'analyte_name' column
-    df_filtered.drop('analyte_name', axis=1, inplace=True)
+    # Drop the redundant 'analyte_name' column and the merge key
+    df_filtered.drop(['analyte_name', 'met_key'], axis=1, inplace=True)
     
     return df_filtered
 
@@ -822,35 +938,35 @@ def compile_met_pool_ratio_data(df_pool_normalized_grouped, ratio_list):
         concatenated with the df that comes after group_met_pool_data.
     '''
 
-    df_ratios = pd.DataFrame()
+    sample_columns = df_pool_normalized_grouped.columns[1:]
+    compounds = df_pool_normalized_grouped['Compound'].to_list()
     
-    for ratio in ratio_list:
-        numerator = ratio['numerator']
-        denominator = ratio['denominator']
-        
-        # Check presence
-        if numerator in df_pool_normalized_grouped['Compound'].values and denominator in df_pool_normalized_grouped['Compound'].values:
-            
-            # Extract values
-            num_values = df_pool_normalized_grouped.loc[df_pool_normalized_grouped['Compound'] == numerator, df_pool_normalized_grouped.columns[1:]].values
-            denom_values = df_pool_normalized_grouped.loc[df_pool_normalized_grouped['Compound'] == denominator, df_pool_normalized_grouped.columns[1:]].values
-            
-            # Ensure single row extraction
-            if num_values.shape[0] == 1 and denom_values.shape[0] == 1:
-
-                 # Avoid division by zero by setting ratios to 0 where denominator is 0
-                ratio_values = np.where(denom_values != 0, num_values / denom_values, 0)
-                
-                # Create temp DataFrame
-                temp_df = pd.DataFrame(ratio_values, columns=df_pool_normalized_grouped.columns[1:])
-                temp_df['Compound'] = f"{numerator} / {denominator}"
-                temp_df['pathway_class'] = 'metabolite ratios'
-                temp_df = temp_df[['pathway_class', 'Compound'] + list(df_pool_normalized_grouped.columns[1:])]
-                
-                # Append to main DataFrame
-                df_ratios = pd.concat([df_ratios, temp_df])
-    
-    df_ratios = df_ratios.reset_index(drop=True)
+    # Row position of each compound, compounds that appear in more than one row are not used for ratios
+    compound_to_row = {compound: row for row, compound in enumerate(compounds)}
+    duplicated_compounds = set(df_pool_normalized_grouped.loc[df_pool_normalized_grouped['Compound'].duplicated(), 'Compound'])
+    
+    # Keep the ratios whose numerator and denominator are both present as a single row
+    valid_ratios = [(ratio['numerator'], ratio['denominator']) for ratio in ratio_list
+                    if ratio['numerator'] in compound_to_row and ratio['denominator'] in compound_to_row
+                    and ratio['numerator'] not in duplicated_compounds and ratio['denominator'] not in duplicated_compounds]
+    
+    if not valid_ratios:
+        return pd.DataFrame()
+    
+    # Extract the numerator and denominator rows of all ratios at once
+    sample_values = df_pool_normalized_grouped[sample_columns].to_numpy(dtype=np.float64)
+    num_values = sample_values[[compound_to_row[numerator] for numerator, _ in valid_ratios]]
+    denom_values = sample_values[[compound_to_row[denominator] for _, denominator in valid_ratios]]
+    
+    # Avoid division by zero by setting ratios to 0 where denominator is 0, the division is only evaluated
+    # where the denominator is not 0 and written straight into the zero-filled result
+    ratio_values = np.zeros(num_values.shape, dtype=np.float64)
+    np.divide(num_values, denom_values, out=ratio_values, where=(denom_values != 0))
+    
+    # Build the ratio DataFrame in one go
+    df_ratios = pd.DataFrame(ratio_values, columns=sample_columns)
+    df_ratios.insert(0, 'Compound', [f"{numerator} / {denominator}" for numerator, denominator in valid_ratios])
+    df_ratios.insert(0, 'pathway_class', 'metabolite ratios')
     
     return df_ratios
     
@@ -953,80 +1069,152 @@ def generate_volcano_plot(df_volcano, FC_cutoff, third_pvalue_cutoff, second_pva
         ),
     )
 
+    # Cutoff lines and their annotations, added in a single layout update
+    shapes, annotations = generate_volcano_cutoff_shapes_and_annotations(FC_cutoff, third_pvalue_cutoff, second_pvalue_cutoff, first_pvalue_cutoff, settings)
+    if shapes:
+        fig.update_layout(shapes=shapes, annotations=annotations)
+    
+    return fig
+
+
+def generate_volcano_cutoff_shapes_and_annotations(FC_cutoff, third_pvalue_cutoff, second_pvalue_cutoff, first_pvalue_cutoff, settings):
+    """
+    Generate the cutoff lines of the volcano plot and the labels of the p-value cutoff lines as plain dicts.
+
+    Parameters:
+    - FC_cutoff (float): The fold change cutoff, marked by vertical lines.
+    - third_pvalue_cutoff, second_pvalue_cutoff, first_pvalue_cutoff (float): The -log10 p-value cutoffs, marked by horizontal lines.
+    - settings (dict): Volcano plot settings with the cutoff line visibility and font settings.
+
+    Returns:
+    - tuple: The list of line shapes and the list of annotations.
+    """
+    
+    cutoff_line = dict(width=1.5, dash='dash', color='rgba(150,150,150,0.5)')
+    cutoff_font = dict(size=settings['font_size'], family=settings['font_selector'])
+    shapes, annotations = [], []
+
     if settings['fc_visible'] == True:
-        fig.add_vline(x=FC_cutoff, line_width=1.5, line_dash='dash', line_color='rgba(150,150,150,0.5)')
-        fig.add_vline(x=-FC_cutoff, line_width=1.5, line_dash='dash', line_color='rgba(150,150,150,0.5)')
+        # Vertical lines spanning the plot height at both fold change cutoffs
+        for x_value in (FC_cutoff, -FC_cutoff):
+            shapes.append(dict(type='line', xref='x', yref='y domain', x0=x_value, x1=x_value, y0=0, y1=1, line=cutoff_line))
 
     if settings['p_value_visible'] == True:
-        fig.add_hline(y=first_pvalue_cutoff, 
-                    annotation_text="* pvalue < 0.05" if settings.get('p_value_text_visible', False) else '', 
-                    annotation_position="top right",
-                    line_width=1.5, line_dash='dash', 
-                    line_color='rgba(150,150,150,0.5)',
-                    annotation_font=dict(size=settings['font_size'], family=settings['font_selector']))
-        fig.add_hline(y=second_pvalue_cutoff, 
-                    annotation_text="* pvalue < 0.01" if settings.get('p_value_text_visible', False) else '',
-                    annotation_position="top right",
-                    line_width=1.5, line_dash='dash', 
-                    line_color='rgba(150,150,150,0.5)',
-                    annotation_font=dict(size=settings['font_size'], family=settings['font_selector']))
-        fig.add_hline(y=third_pvalue_cutoff, 
-                    annotation_text="*** pvalue < 0.001" if settings.get('p_value_text_visible', False) else '',
-                    annotation_position="top right",
-                    line_width=1.5, 
-                    line_dash='dash', 
-                    line_color='rgba(150,150,150,0.5)',
-                    annotation_font=dict(size=settings['font_size'], family=settings['font_selector']))
+        # Horizontal lines spanning the plot width at the p-value cutoffs, with the label at the top right of each line
+        p_value_text_visible = settings.get('p_value_text_visible', False)
+        for y_value, text in ((first_pvalue_cutoff, "* pvalue < 0.05"),
+                              (second_pvalue_cutoff, "* pvalue < 0.01"),
+                              (third_pvalue_cutoff, "*** pvalue < 0.001")):
+            shapes.append(dict(type='line', xref='x domain', yref='y', x0=0, x1=1, y0=y_value, y1=y_value, line=cutoff_line))
+            annotations.append(dict(text=text if p_value_text_visible else '', font=cutoff_font, showarrow=False,
+                                    xref='x domain', yref='y', x=1, y=y_value, xanchor='right', yanchor='bottom'))
+
+    return shapes, annotations
+
+
+def generate_volcano_datapoint_annotations(stored_points, settings):
+    """
+    Generate the annotations that label the clicked datapoints of the volcano plot.
+
+    Parameters:
+    - stored_points (list): Dictionaries with the x and y values and the metabolite name of each clicked datapoint.
+    - settings (dict): Volcano plot settings with the font settings.
+
+    Returns:
+    - list: One annotation dict per clicked datapoint, with an arrow pointing away from the plot center.
+    """
     
-    return fig
+    annotations = []
+    for point in stored_points or []:
+        annotations.append(dict(
+            text=point['met_name'],  # Metabolite name as the annotation text
+            x=point['x'],
+            y=point['y'],
+            showarrow=True,  # Show arrows pointing to the annotated points
+            ax=30 if point['x'] > 0 else -30,
+            ay=-30 if point['y'] > 1.3 else 30,
+            standoff=8,  # Distance between the point and the start of the arrow
+            arrowhead=1,
+            arrowwidth=1,
+            arrowsize=1,
+            arrowcolor="#636363",
+            font=dict(
+                family=settings['font_selector'],
+                size=settings['font_size'],
+                color="rgba(0,0,0,1)"  # Font color
+            )
+        ))
+    
+    return annotations
 
 
-def ttest_volcano(row, ctrl_cols, cond_cols):
+def patch_figure_layout_settings(patched_fig, settings):
+    """
+    Writes the size and axis font settings into a figure update without rebuilding the figure.
+
+    Parameters:
+    - patched_fig (dash.Patch): Partial figure update to be sent to a dcc.Graph 'figure' property.
+    - settings (dict): Plot settings containing 'height', 'width', 'font_selector' and 'font_size'.
+
+    Returns:
+    - dash.Patch: The same partial update with the layout settings assigned.
+    """
+    
+    patched_fig['layout']['height'] = settings['height']
+    patched_fig['layout']['width'] = settings['width']
+    
+    # Axis titles and ticks share the same font family and size
+    for axis in ['xaxis', 'yaxis']:
+        patched_fig['layout'][axis]['title']['font']['family'] = settings['font_selector']
+        patched_fig['layout'][axis]['title']['font']['size'] = settings['font_size']
+        patched_fig['layout'][axis]['tickfont']['family'] = settings['font_selector']
+        patched_fig['layout'][axis]['tickfont']['size'] = settings['font_size']
+            
+    return patched_fig
+
+
+def ttest_volcano(df, ctrl_cols, cond_cols):
     '''
     Conducts an independent two-sided t-test on the control and condition values 
-    of a specific metabolite to determine the p-value. 
+    of every metabolite to determine the p-values, for all rows of the dataframe at once.
     
     Parameters:
     ----------
-    row : pd.Series
-        A row of the dataframe, which includes the values for a specific metabolite.
+    df : pd.DataFrame
+        The dataframe with one row per metabolite, which includes the control and condition values.
         
     ctrl_cols : list
-        List of column indices or names corresponding to the control group in the row.
+        List of column names corresponding to the control group.
         
     cond_cols : list
-        List of column indices or names corresponding to the condition group in the row.
+        List of column names corresponding to the condition group.
         
     Returns:
     -------
-    float or np.nan
-        The p-value resulting from the t-test if the test is valid; np.nan otherwise.
+    np.ndarray
+        The p-value of each row (in the row order of df) resulting from the t-test if the test is valid; np.nan otherwise.
     '''
     
-    # Convert values to numeric, ignoring non-numeric values (errors='coerce'), 
-    # and then dropping any resulting NaN values
-    ctrl_values = pd.to_numeric(row[ctrl_cols], errors='coerce').dropna() 
-    cond_values = pd.to_numeric(row[cond_cols], errors='coerce').dropna()
+    # Convert values to numeric, ignoring non-numeric values (errors='coerce'), zero values
+    # are ignored like the resulting NaN values
+    ctrl_values = df[ctrl_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    cond_values = df[cond_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    ctrl_values[ctrl_values == 0] = np.nan
+    cond_values[cond_values == 0] = np.nan
     
-    # Perform an independent two-sided t-test, assuming equal variance,
-    # between the control and condition groups
-    filtered_ctrl_values = ctrl_values[ctrl_values != 0]
-    filtered_cond_values = cond_values[cond_values != 0]
+    # Perform Welch's t-test between the control and condition groups for all rows in one go
+    return welch_ttest_rows(ctrl_values, cond_values)
 
-    pvalue = perform_two_sided_ttest(filtered_ctrl_values, filtered_cond_values)
-    
-    return pvalue
 
-
-def assign_color(row, FC_cutoff, third_pvalue_cutoff, second_pvalue_cutoff, first_pvalue_cutoff, settings):
+def assign_color(df_volcano, FC_cutoff, third_pvalue_cutoff, second_pvalue_cutoff, first_pvalue_cutoff, settings):
     '''
-    Assigns a color to a metabolite based on its log2 fold change (log2FC) and 
+    Assigns a color to every metabolite based on its log2 fold change (log2FC) and 
     the negative logarithm of its p-value (logp-value) according to specified cutoffs.
     
     Parameters:
     ----------
-    row : pd.Series
-        A row of the dataframe containing the 'logp-value' and 'log2FC' values for a specific metabolite.
+    df_volcano : pd.DataFrame
+        The dataframe containing the 'logp-value' and 'log2FC' values, one row per metabolite.
         
     FC_cutoff : float
         The fold change cutoff value used for color assignment.
@@ -1036,39 +1224,28 @@ def assign_color(row, FC_cutoff, third_pvalue_cutoff, second_pvalue_cutoff, firs
         
     Returns:
     -------
-    str
-        A color code corresponding to the classification of the metabolite based on its values.
+    np.ndarray
+        The color code of each row corresponding to the classification of the metabolite based on its values.
     '''
     
-    plot_pvalue = row['logp-value']
-    plot_FC = row['log2FC']
+    plot_pvalue = df_volcano['logp-value'].to_numpy(dtype=np.float64)
+    plot_FC = df_volcano['log2FC'].to_numpy(dtype=np.float64)
     
-    # Read the color for not significant points from the settings
-    ns_color = settings['datapoint_color']
+    # Significance level of each row: 3 above the third cutoff, 2 above the second, 1 above the first
+    # and 0 otherwise (a missing p-value is not significant)
+    pvalue_level = np.digitize(plot_pvalue, [first_pvalue_cutoff, second_pvalue_cutoff, third_pvalue_cutoff], right=True)
+    pvalue_level[np.isnan(plot_pvalue)] = 0
     
-    # Color assignment based on log2FC and p-value cutoffs
-    if plot_FC > FC_cutoff:
-        if plot_pvalue > third_pvalue_cutoff:
-            return settings['color_inc_3']
-        elif plot_pvalue <= third_pvalue_cutoff and plot_pvalue > second_pvalue_cutoff:
-            return settings['color_inc_2']
-        elif plot_pvalue <= second_pvalue_cutoff and plot_pvalue > first_pvalue_cutoff:
-            return settings['color_inc_1']
-        else:
-            return ns_color
-        
-    elif plot_FC < -FC_cutoff:
-        if plot_pvalue > third_pvalue_cutoff:
-            return settings['color_dec_3']
-        elif plot_pvalue <= third_pvalue_cutoff and plot_pvalue > second_pvalue_cutoff:
-            return settings['color_dec_2']
-        elif plot_pvalue <= second_pvalue_cutoff and plot_pvalue > first_pvalue_cutoff:
-            return settings['color_dec_1']
-        else:
-            return ns_color
-        
-    else:
-        return ns_color
+    increased = plot_FC > FC_cutoff
+    decreased = plot_FC < -FC_cutoff
+    
+    # Color assignment based on log2FC and p-value cutoffs, not significant points get the datapoint color
+    conditions = [increased & (pvalue_level == 3), increased & (pvalue_level == 2), increased & (pvalue_level == 1),
+                  decreased & (pvalue_level == 3), decreased & (pvalue_level == 2), decreased & (pvalue_level == 1)]
+    colors = [settings['color_inc_3'], settings['color_inc_2'], settings['color_inc_1'],
+              settings['color_dec_3'], settings['color_dec_2'], settings['color_dec_1']]
+    
+    return np.select(conditions, colors, default=settings['datapoint_color'])
 
 
 def log2_transform(df, excluded_columns=['Compound', 'pathway_class']):
@@ -1088,23 +1265,31 @@ def log2_transform(df, excluded_columns=['Compound', 'pathway_class']):
         A new dataframe with log2-transformed values.
     '''
     
-    # Creating a copy of the input dataframe to avoid modifying the original dataframe
-    transformed_df = df.copy()
+    # Applying log2 transformation to the columns that are not in the excluded_columns list, together as one array
+    columns = [column for column in df.columns if column not in excluded_columns]
+    log2_values = log2_nonzero(df[columns].to_numpy(dtype=np.float64))
+    column_positions = {column: position for position, column in enumerate(columns)}
     
-    # Iterating over each column in the dataframe
-    for column in transformed_df.columns:
-        
-        # Applying log2 transformation to columns that are not in the excluded_columns list
-        if column not in excluded_columns:
-            
-            # Applying log2 transformation to each value in the column
-            # np.log2(x) is used for the transformation, and a check is added to avoid log2(0)
-            transformed_df[column] = transformed_df[column].apply(lambda x: np.log2(x) if x != 0 else 0)
+    # Building a new dataframe in the original column order from the transformed values and the excluded
+    # columns, so that the original dataframe is not modified without first copying all of it
+    transformed_df = pd.DataFrame({column: log2_values[:, column_positions[column]] if column in column_positions else df[column]
+                                   for column in df.columns}, index=df.index)
             
     # Returning the dataframe with transformed values
     return transformed_df
 
 
+def log2_nonzero(values):
+    """
+    Element-wise log2 of an array that keeps zeros as zero, the log2 is written straight into a
+    zero-filled output array and only evaluated where the values are not zero to avoid log2(0).
+    """
+    log2_values = np.zeros(np.shape(values), dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.log2(values, out=log2_values, where=(values != 0))
+    return log2_values
+
+
 def transform_log2_and_adjust_control_data(df, grouped_samples, ctrl_group):
     """
     Process and adjust the control data from a dataframe by performing log2 transformation and 
@@ -1127,46 +1312,38 @@ def transform_log2_and_adjust_control_data(df, grouped_samples, ctrl_group):
         A new DataFrame in which the log2-transformed control averages have been subtracted from the 
         corresponding sample data, with the exception that original zeros remain unchanged. Columns 
         exclusive to control group data and metadata (like 'Compound' and 'pathway_class') are excluded 
-        from transformation and subtraction, and the 'ctrl_avg' column used for adjustment is dropped 
-        from the resulting DataFrame.
+        from transformation and subtraction.
     
     Notes:
     -----
-    - The control average ('ctrl_avg') is calculated by replacing zero values with NaN to prevent them 
-      from affecting the mean. After mean calculation, NaNs are transformed to zeros using log2 transformation.
+    - The control average is calculated by replacing zero values with NaN to prevent them 
+      from affecting the mean. After mean calculation, NaNs are set to zero, which the log2 transformation keeps as zero.
     - Subtraction of control averages from sample data is performed only if the original sample value 
       before transformation was non-zero to preserve the biological relevance of zero values indicating 
       non-detection or absence of a compound.
-    - The function uses a predefined 'log2_transform' function to apply log2 transformation to DataFrame 
-      values, excluding specified columns.
+    - The function uses the 'log2_nonzero' function to apply log2 transformation to the data values and the
+      control averages, excluding the 'Compound' and 'pathway_class' columns.
     """
         
     ctrl_cols = grouped_samples[ctrl_group]
+    data_columns = [col for col in df.columns if col not in ['Compound', 'pathway_class']]
     
-    df_ctrl_avg = pd.DataFrame(index=df.index)
-    df_ctrl_avg['Compound'] = df['Compound']
-
-    ctrl_avg_values = df[ctrl_cols].replace(0, np.nan).mean(axis=1, skipna=True)
-    ctrl_avg_values = ctrl_avg_values.fillna(0)
-    
-    df_ctrl_avg['ctrl_avg'] = ctrl_avg_values
-
-    df_ctrl_avg_log2 = log2_transform(df_ctrl_avg).drop_duplicates()
-    df_log2_transformed = log2_transform(df)
-    
-    df_log2_transformed = df_log2_transformed.merge(df_ctrl_avg_log2, on='Compound', how='left')
+    # Mean of the non-zero control values of each row, rows without any are set to 0
+    ctrl_values = df[ctrl_cols].to_numpy(dtype=np.float64, copy=True)
+    ctrl_values[ctrl_values == 0] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        ctrl_avg = np.nan_to_num(np.nanmean(ctrl_values, axis=1), nan=0.0)
     
-    columns_to_subtract = [col for col in df_log2_transformed.columns if col not in ['Compound', 'pathway_class', 'ctrl_avg']]
+    # Log2 transform the data and the control averages, then subtract the control average of each row
+    # from its data values in one pass, only where the transformed value is not zero
+    log2_values = log2_nonzero(df[data_columns].to_numpy(dtype=np.float64))
+    log2_ctrl_avg = log2_nonzero(ctrl_avg)
     
-    # Subtract the control averages from the data columns
-    for column in columns_to_subtract:
-           # Use numpy.where to vectorize the condition: subtract only if original value is not zero
-            df_log2_transformed[column] = np.where(df_log2_transformed[column] != 0,
-                                           df_log2_transformed[column] - df_log2_transformed['ctrl_avg'],
-                                           0)
+    np.subtract(log2_values, log2_ctrl_avg[:, None], out=log2_values, where=(log2_values != 0))
     
-    # Drop 'ctrl_avg' as it's not needed anymore
-    df_log2_transformed.drop(columns=['ctrl_avg'], inplace=True)
+    df_log2_transformed = df.reset_index(drop=True)
+    df_log2_transformed[data_columns] = log2_values
     
     return df_log2_transformed
 
@@ -1186,29 +1363,16 @@ def generate_individual_heatmap(pathway_df, grouped_samples, settings, group_sig
     - Figure: A Plotly Figure object containing the generated heatmap.
     """
 
-    def find_group(sample_name, groups):
-        """
-        Identify the group of a sample.
-        
-        Parameters:
-        - sample_name (str): The name of the sample.
-        - groups (dict): A dictionary containing sample grouping.
-        
-        Returns:
-        - str: The group name where the sample is found, otherwise None.
-        """
-        for group, samples in groups.items():
-            if sample_name in samples:
-                return group
-        return None
+    # Group of each sample, a sample listed in more than one group belongs to the first one
+    col_to_group = {}
+    for group, samples in grouped_samples.items():
+        for sample in samples:
+            col_to_group.setdefault(sample, group)
     
     # Dropping non heatmap columns and copying data to new DataFrame
     heatmap_data = pathway_df.drop(columns=non_heatmap_columns).copy()
     y_labels = pathway_df['Compound']
     
-    # Getting the maximum absolute value for color scaling
-    max_val = heatmap_data.abs().max().max()
-    
     if data_type == 'pool':
         colorscale = [[0, settings['decreased_color']],
                       [0.5, settings['unchanged_color']],
@@ -1218,41 +1382,40 @@ def generate_individual_heatmap(pathway_df, grouped_samples, settings, group_sig
         colorscale = [[0, settings['unchanged_color']],
                       [1, settings['increased_color']]]
         
-    # Creating new DataFrames for the heatmap and hover text
-    plot_heatmap_data = pd.DataFrame(index=heatmap_data.index)
-    hovertext = pd.DataFrame(index=heatmap_data.index)  
+    # Column labels of the heatmap and the positions (in the data columns) where empty gap columns go
+    x_labels = []
+    gap_positions = []
     
     if settings['first_gap_present'] == True:
-        plot_heatmap_data['gap_start'] = np.nan  # Adding a starting gap column with NaN values
-        hovertext['gap_start'] = ''
+        gap_positions.append(0)  # Adding a starting gap column with NaN values
+        x_labels.append('gap_start')
     
     prev_group = None
-    for column in heatmap_data.columns:
-        current_group = find_group(column, grouped_samples)
+    for position, column in enumerate(heatmap_data.columns):
+        current_group = col_to_group.get(column)
         
         if settings['group_gaps_present'] == True:
-            # Insert a gap column when group changes
-            if current_group != prev_group and prev_group is not None:
-                gap_column_name = f'gap_{prev_group}'
-                plot_heatmap_data[gap_column_name] = np.nan
-                hovertext[gap_column_name] = ''
-        
-        # Insert the actual data
-        plot_heatmap_data[column] = heatmap_data[column]
-        hovertext[column] = heatmap_data[column]
+            # Insert a gap column when group changes, a gap label that is already used is not added again
+            gap_column_name = f'gap_{prev_group}'
+            if current_group != prev_group and prev_group is not None and gap_column_name not in x_labels:
+                gap_positions.append(position)
+                x_labels.append(gap_column_name)
         
+        x_labels.append(column)
         prev_group = current_group
     
+    # Insert all gap columns into the heatmap values (NaN) and hover texts (empty) in one go
+    plot_heatmap_values = np.insert(heatmap_data.to_numpy(dtype=np.float64), gap_positions, np.nan, axis=1)
+    hovertext = np.insert(heatmap_data.to_numpy(dtype=object), gap_positions, '', axis=1)
+    
     # Adding the data to the Plotly figure
     heatmap = go.Figure()
-    heatmap.add_trace(go.Heatmap(z=plot_heatmap_data.values,
+    heatmap.add_trace(go.Heatmap(z=plot_heatmap_values,
                                  hovertext=hovertext,
                                  y=y_labels,
-                                 x=plot_heatmap_data.columns,
+                                 x=x_labels,
                                  colorscale=colorscale,
                                  showscale=True,
-                                 zmin=-max_val,
-                                 zmax=max_val,
                                  colorbar=dict(
                                      len=0.7,
                                      thickness=5
@@ -1329,9 +1492,10 @@ def generate_individual_heatmap(pathway_df, grouped_samples, settings, group_sig
         if group_significance is not None:
             heatmap = add_heatmap_significance_annotations(heatmap, y_labels, group_significance, settings)
     
-    add_nd_annotations_and_update_values(heatmap, ctrl_cols)
+    # The color range is set once from the final 'z' values, after the control zeros have been applied
+    z_data = add_nd_annotations_and_update_values(heatmap, ctrl_cols)
         
-    update_colorscale(heatmap, colorscale, data_type)
+    update_colorscale(heatmap, z_data, data_type)
     
     return heatmap
 
@@ -1374,27 +1538,22 @@ def calculate_heatmap_group_middle_points(grouped_samples, include_first_gap, in
     return middle_points
 
 
-def update_colorscale(heatmap_fig, colorscale, data_type):
+def update_colorscale(heatmap_fig, z_data, data_type):
     """
-    Updates the colorscale of a heatmap figure. Adjusts the color scaling to be symmetrical around zero for 'pool' data type,
-    and unsymmetrical for 'iso' data type. It finds the maximum (and minimum, if needed) values within the 'z' data of the
-    heatmap, ignoring NaN values, to set the 'zmin' and 'zmax' for the figure accordingly.
+    Updates the color range of a heatmap figure. Adjusts the color scaling to be symmetrical around zero for 'pool' data type,
+    and unsymmetrical for 'iso' data type. It finds the maximum absolute value within the 'z' data of the heatmap, 
+    ignoring NaN values, to set the 'zmin' and 'zmax' for the figure accordingly.
 
     Parameters:
         heatmap_fig (go.Figure): The heatmap figure object to update.
-        colorscale (str or list): The colorscale to be applied to the heatmap. This can be a predefined colorscale 
-                                  name, or a list of colors defining the scale.
+        z_data (np.ndarray): The 'z' values of the heatmap, as set on the figure.
         data_type (str): Type of data that is displayed in the heatmap, 'pool' or 'iso'.
     Returns:
         None: The function updates the heatmap figure in place and does not return any value.
     """
-    # Find the min and max z values, ignoring NaN values
-    z_data = np.array(heatmap_fig.data[0].z)
-    non_nan_z_values = z_data[~np.isnan(z_data)]
-
     if data_type == 'pool':
-        # Find the max absolute value for the color scaling to be symmetrical around zero
-        max_val = np.max(np.abs(non_nan_z_values))
+        # Find the max absolute value for the color scaling to be symmetrical around zero, ignoring NaN values
+        max_val = np.nanmax(np.abs(z_data))
         zmin = -max_val
         zmax = max_val
     elif data_type == 'iso':
@@ -1402,16 +1561,16 @@ def update_colorscale(heatmap_fig, colorscale, data_type):
         zmin = 0
         zmax = 1
     
-    # Update the traces with the new scale
-    heatmap_fig.update_traces(zmin=zmin, zmax=zmax, colorscale=colorscale)
+    # Update the trace with the new range, the colorscale itself is set when the heatmap trace is created
+    heatmap_fig.update_traces(zmin=zmin, zmax=zmax)
 
 
 def add_nd_annotations_and_update_values(heatmap_fig, ctrl_cols):
     """
     Annotates heatmap cells with 'nd' (no data) for zero values and updates the heatmap 'z' values based on 
     control columns. If all control column values for a row are zero, all corresponding cells in that row are 
-    set to zero and annotated with red '0'. It also tracks cells that have been annotated to prevent duplicate 
-    annotations.
+    set to zero and annotated with red '0'. Cells that are already annotated with 'nd' are masked out to prevent
+    duplicate annotations.
 
     Parameters:
         heatmap_fig (go.Figure): The heatmap figure object to update with annotations and value changes.
@@ -1419,64 +1578,50 @@ def add_nd_annotations_and_update_values(heatmap_fig, ctrl_cols):
                           row's values should be updated based on these control values.
 
     Returns:
-        None: The function updates the heatmap figure in place with new annotations and modified 'z' data 
-              and does not return any value.
+        np.ndarray: The modified 'z' data, which is also set on the heatmap figure in place together with
+                    the new annotations.
     """
-    z_data = np.array(heatmap_fig.data[0].z)  # The 'z' values as an array for processing
+    z_data = np.array(heatmap_fig.data[0].z, dtype=np.float64)  # The 'z' values as a writable array for processing
     x_data = list(heatmap_fig.data[0].x)  # The 'x' values as a list
-    y_data = heatmap_fig.data[0].y  # The 'y' values
+    y_data = list(heatmap_fig.data[0].y)  # The 'y' values as a list
 
-    # Create a set to track 'nd' annotated cells by their (row, column) index
-    nd_annotated_cells = set()
+    # Mask of the 'nd' annotated cells, exact zeros only (NaNs and gaps are not equal to zero)
+    nd_mask = z_data == 0
 
     # Determine the indices for the control columns
     ctrl_col_indices = [x_data.index(col) for col in ctrl_cols if col in x_data]
 
-    # First pass to annotate 'nd' for zero values, ignoring NaNs
-    for y_index, y_val in enumerate(y_data):
-        for x_index, x_val in enumerate(x_data):
-            value = z_data[y_index][x_index]
-            if value == 0:  # Annotate only exact zeros, skip NaNs and gaps
-                heatmap_fig.add_annotation(
-                    text='nd',
-                    x=x_val,
-                    y=y_val,
-                    xref='x1',
-                    yref='y1',
-                    showarrow=False,
-                    font=dict(size=10, color='black'),
-                    bgcolor='white'
-                )
-                # Add the cell to the 'nd' annotated set
-                nd_annotated_cells.add((y_index, x_index))
+    # First pass to annotate 'nd' for zero values, one annotation per zero cell in row order
+    nd_font = dict(size=10, color='black')
+    new_annotations = [dict(text='nd', x=x_data[x_index], y=y_data[y_index], xref='x1', yref='y1',
+                            showarrow=False, font=nd_font, bgcolor='white')
+                       for y_index, x_index in np.argwhere(nd_mask).tolist()]
 
     # Check if the user has submitted ctrl_cols (bulk isotopologue heatmap does not need it)
     if ctrl_cols != []:
-        # Second pass to set zeros based on control columns being all zero
-        for y_index, y_val in enumerate(y_data):
-            # Extract control column values for the current row, skipping NaNs
-            control_values = [z_data[y_index][ctrl_col_index] for ctrl_col_index in ctrl_col_indices if not np.isnan(z_data[y_index][ctrl_col_index])]
-            # If control values are all zero and the list is not empty (which means control columns had valid numbers and not just NaNs)
-            if control_values and all(val == 0 for val in control_values):
-                # Update the row's 'z' values to zero where 'nd' is not annotated, skipping NaNs and gaps
-                for x_index, x_val in enumerate(x_data):
-                    if (y_index, x_index) not in nd_annotated_cells and not np.isnan(z_data[y_index][x_index]):
-                        # Set the value to zero
-                        z_data[y_index][x_index] = 0
-                        # Add a unique red '0' annotation
-                        heatmap_fig.add_annotation(
-                            text='0',
-                            x=x_val,
-                            y=y_val,
-                            xref='x1',
-                            yref='y1',
-                            showarrow=False,
-                            font=dict(size=10, color='red'),
-                            bgcolor='white'
-                        )
+        # Second pass to set zeros in the rows where the control columns are all zero, ignoring NaNs
+        # (a row needs at least one valid control value, not just NaNs)
+        ctrl_values = z_data[:, ctrl_col_indices]
+        ctrl_valid = ~np.isnan(ctrl_values)
+        zero_ctrl_rows = ctrl_valid.any(axis=1) & ((ctrl_values == 0) | ~ctrl_valid).all(axis=1)
+
+        # Update the row's 'z' values to zero where 'nd' is not annotated, skipping NaNs and gaps
+        zeroed_mask = zero_ctrl_rows[:, None] & ~nd_mask & ~np.isnan(z_data)
+        z_data[zeroed_mask] = 0
 
-    # Update the figure with the modified 'z' data
-    heatmap_fig.data[0].z = z_data.tolist()
+        # Add a unique red '0' annotation to each of the zeroed cells
+        zeroed_font = dict(size=10, color='red')
+        new_annotations.extend(dict(text='0', x=x_data[x_index], y=y_data[y_index], xref='x1', yref='y1',
+                                    showarrow=False, font=zeroed_font, bgcolor='white')
+                               for y_index, x_index in np.argwhere(zeroed_mask).tolist())
+
+    # Add all annotations in a single layout update
+    heatmap_fig.update_layout(annotations=heatmap_fig.layout.annotations + tuple(new_annotations))
+
+    # Update the figure with the modified 'z' data, kept as an array so that it is not converted to nested lists
+    heatmap_fig.data[0].z = z_data
+    
+    return z_data
 
 
 def add_heatmap_significance_annotations(heatmap_fig, y_labels, group_significance, settings, gap_col_name='gap_start'):
@@ -1513,42 +1658,50 @@ def add_heatmap_significance_annotations(heatmap_fig, y_labels, group_significan
 
     y_labels = y_labels.reset_index(drop=True)
     
-    # Get the list of all current x-axis categories in the heatmap (which includes gap columns)
-    x_categories = list(heatmap_fig.data[0].x)
+    # Get all current x-axis categories in the heatmap (which includes gap columns) as an array
+    x_categories = np.asarray(heatmap_fig.data[0].x)
 
-    # Find the index for the gap_start column in the x-axis categories
-    if gap_col_name in x_categories:
-        gap_start_index = x_categories.index(gap_col_name)
-    else:
+    # Find the index for the gap_start column in the x-axis categories with one array comparison
+    gap_hits = np.flatnonzero(x_categories == gap_col_name)
+    if gap_hits.size == 0:
         return heatmap_fig
+    gap_start_index = int(gap_hits[0])
 
     filtered_group_significance = filter_group_significance(y_labels, group_significance)
 
-    # Iterate over the group significance dictionary to create annotations
+    # Row position of each molecule on the y-axis (its first occurrence)
+    molecule_positions = {}
+    for label_index, label in enumerate(y_labels):
+        molecule_positions.setdefault(label, label_index)
+
+    # Shared styling of the significance dots
+    dot_font = dict(size=20, color='red')
+    dot_hoverlabel = dict(font_size=settings['font_size'], font_family=settings['font_selector'])
+
+    # Iterate over the group significance dictionary to create annotations, collected as plain dicts
+    new_annotations = []
     for molecule, group_pairs in filtered_group_significance.items():
         # Check if the molecule is in the y_labels
-        if molecule in y_labels.values:
-            molecule_index = y_labels[y_labels == molecule].index[0]
-
+        if molecule in molecule_positions:
             # Create hovertext displaying all group pairs for the molecule
             hovertexts = f"Significant differences for {molecule}:<br>" + "<br>".join([f"{pair[0]} vs {pair[1]}" for pair in group_pairs])
 
-            # Add annotation directly to the figure with styling
-            heatmap_fig.add_annotation(
+            new_annotations.append(dict(
                 x=gap_start_index,
-                y=molecule_index,
+                y=molecule_positions[molecule],
                 text="●",
                 showarrow=False,
                 xref="x",
                 yref="y",
                 xanchor="center",
                 yanchor="middle",
-                font=dict(size=20, 
-                          color='red'),
+                font=dot_font,
                 hovertext=hovertexts,
-                hoverlabel=dict(font_size=settings['font_size'], 
-                                font_family=settings['font_selector'])
-            )
+                hoverlabel=dot_hoverlabel
+            ))
+
+    # Add all annotations to the figure in a single layout update
+    heatmap_fig.update_layout(annotations=heatmap_fig.layout.annotations + tuple(new_annotations))
 
     return heatmap_fig
 
@@ -1561,7 +1714,7 @@ def generate_group_significance(df_pool, grouped_samples):
 
     Parameters:
         df_pool (pd.DataFrame): A DataFrame containing compound data with samples as columns and compounds as rows.
-                                The 'pathway_class' column, if present, will be dropped.
+                                The 'pathway_class' column, if present, is ignored.
         grouped_samples (dict): A dictionary mapping group names to column names in `df_pool`. Each group is 
                                 associated with a list of sample column names that belong to that group.
 
@@ -1569,45 +1722,46 @@ def generate_group_significance(df_pool, grouped_samples):
         dict: A dictionary with compounds as keys, each key containing a list of tuples. Each tuple represents 
               a pair of group names for which the difference in means of compound levels is statistically significant.
 
-    The function first sanitizes the input data by converting sample values to numeric, handling NaNs, and removing 
-    the 'pathway_class' column if present. It then computes the t-test for each compound across all pairs of groups 
+    The function first sanitizes the input data by converting sample values to numeric and handling NaNs. It then computes the t-test for each compound across all pairs of groups 
     and stores the results for pairs with p-values below the significance threshold, ensuring that no duplicate 
     group comparisons are recorded.
     """
     significant_results = {}  # Dictionary to store results
 
-    # Check if 'pathway_class' column exists and drop it
-    if 'pathway_class' in df_pool.columns:
-        df_pool = df_pool.drop(columns=['pathway_class'])
-    
-    # Create all unique pairs for comparison by sorting to ensure uniqueness
-    unique_pairs = [(group1, group2) for i, group1 in enumerate(grouped_samples.keys()) 
-                    for group2 in list(grouped_samples.keys())[i+1:]]
-
-    # Iterate over each compound
-    for index, row in df_pool.iterrows():
-        compound = row['Compound']
-        for (group1, group2) in unique_pairs:
-            # Extract the data and ensure it's numeric and NaNs are handled
-            data1 = pd.to_numeric(row[grouped_samples[group1]], errors='coerce').dropna()
-            data2 = pd.to_numeric(row[grouped_samples[group2]], errors='coerce').dropna()
-
-            filtered_data1 = data1[data1 != 0]
-            filtered_data2 = data2[data2 != 0]
-
-            pvalue = perform_two_sided_ttest(filtered_data1, filtered_data2)
-
-            # If p-value < 0.05, store it, ensuring that duplicates are not added
-            if pvalue < 0.05:
-                # Sort the group names to maintain consistency
-                sorted_groups = tuple(sorted([group1, group2]))
-                
-                # Update the significant_results dictionary
-                if compound not in significant_results:
-                    significant_results[compound] = [sorted_groups]
-                else:
-                    if sorted_groups not in significant_results[compound]:  # Check for duplicates
-                        significant_results[compound].append(sorted_groups)
+    # A 'pathway_class' column is left in place, only the sample columns of each group are read
+    
+    # Create all unique pairs for comparison, in the order of the groups
+    unique_pairs = list(combinations(grouped_samples, 2))
+
+    # Count, mean and variance of each group for all compounds, from the numeric data with NaN and zero values ignored
+    group_stats = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        for group, samples in grouped_samples.items():
+            values = df_pool[samples].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+            values[values == 0] = np.nan
+            group_stats[group] = nan_row_stats(values)
+
+    # Welch's t-test of all compounds for each pair in one go (compounds x pairs)
+    pair_pvalues = np.full((len(df_pool), len(unique_pairs)), np.nan)
+    for pair_index, (group1, group2) in enumerate(unique_pairs):
+        pair_pvalues[:, pair_index] = welch_ttest_row_stats(group_stats[group1], group_stats[group2])
+
+    # Store the pairs with p-value < 0.05, compound by compound, ensuring that duplicates are not added
+    compounds = df_pool['Compound'].to_numpy()
+    for compound_index, pair_index in np.argwhere(pair_pvalues < 0.05).tolist():
+        compound = compounds[compound_index]
+        group1, group2 = unique_pairs[pair_index]
+
+        # Sort the group names to maintain consistency
+        sorted_groups = tuple(sorted([group1, group2]))
+        
+        # Update the significant_results dictionary
+        if compound not in significant_results:
+            significant_results[compound] = [sorted_groups]
+        else:
+            if sorted_groups not in significant_results[compound]:  # Check for duplicates
+                significant_results[compound].append(sorted_groups)
     
     return significant_results
 
@@ -1632,37 +1786,31 @@ def calculate_offsets_for_volcano_annotations(new_point, stored_points, standoff
 
     # Initialize the best offset to the default values
     best_ax, best_ay = 30, 30
-    found_spot = False
-
-    # Search for offsets in a spiral pattern to avoid overlaps
-    for trial in range(max_trials):
-        # Increase the spiral radius with each trial
-        radius += font_size * pixels_to_units * trial / max_trials
-        # Calculate the trial angle using a golden angle approximation for a uniform distribution of points
-        angle = trial * 137.508  # degrees
-        # Convert angle to radians for trigonometric functions
-        angle_rad = np.radians(angle)
-        # Calculate offsets based on the angle and radius
-        ax_trial = radius * np.cos(angle_rad)
-        ay_trial = radius * np.sin(angle_rad)
-
-        # Check for overlap with existing annotations
-        overlap = any(
-            np.hypot(existing_point['x'] - (new_point['x'] + ax_trial), existing_point['y'] - (new_point['y'] + ay_trial))
-            < standoff for existing_point in stored_points
-        )
-
-        if not overlap:
-            best_ax = ax_trial
-            best_ay = ay_trial
-            found_spot = True
-            break
 
-    # If no spot is found after max_trials, you can choose to return some default or raise an error
-    if not found_spot:
-        # Here, you might want to either use a default value or handle it as an error.
-        # For now, we'll set it to some default offset values
-        best_ax, best_ay = 30, 30  # Default offset when no non-overlapping position is found
+    # All trial offsets of the spiral search at once: the spiral radius increases with each trial and the trial
+    # angle uses a golden angle approximation (degrees) for a uniform distribution of points
+    trials = np.arange(max_trials)
+    angles_rad = np.radians(trials * 137.508)
+    trial_radii = radius + np.cumsum(font_size * pixels_to_units * trials / max_trials)
+    ax_trials = trial_radii * np.cos(angles_rad)
+    ay_trials = trial_radii * np.sin(angles_rad)
+
+    # Without existing annotations the first trial never overlaps
+    if not stored_points:
+        return ax_trials[0], ay_trials[0]
+
+    # Check every trial for overlap with existing annotations in one go (trials x stored points),
+    # the stored coordinates are converted to arrays once
+    stored_x = np.array([existing_point['x'] for existing_point in stored_points], dtype=np.float64)
+    stored_y = np.array([existing_point['y'] for existing_point in stored_points], dtype=np.float64)
+    overlap = (np.hypot(stored_x[None, :] - (new_point['x'] + ax_trials[:, None]),
+                        stored_y[None, :] - (new_point['y'] + ay_trials[:, None])) < standoff).any(axis=1)
+
+    # Take the first trial without overlap, if no spot is found after max_trials the default offset values are kept
+    free_trials = np.flatnonzero(~overlap)
+    if free_trials.size:
+        best_ax = ax_trials[free_trials[0]]
+        best_ay = ay_trials[free_trials[0]]
 
     return best_ax, best_ay
 
@@ -1687,58 +1835,84 @@ def generate_isotopologue_distribution_figure(df_iso_met, grouped_samples, setti
     
     fig = go.Figure()  # Create a new plotly figure
     
-    encountered_groups = set()  # Keep track of processed sample groups to manage legend entries
+    # Bars of each sample group across the isotopologues, collected so that every group becomes a single trace
+    group_bars = {sample_group: dict(x=[], y=[], error=[], hovertext=[]) for sample_group in grouped_samples}
+
+    # Sample values as one array and the column positions of each group, computed once for all labels
+    sample_columns = list(dict.fromkeys(col for cols_in_group in grouped_samples.values() for col in cols_in_group))
+    col_to_pos = {col: i for i, col in enumerate(sample_columns)}
+    sample_values = df_iso_met[sample_columns].to_numpy(dtype=np.float64)
+    group_cols = {sample_group: np.asarray([col_to_pos[col] for col in cols_in_group], dtype=np.int64)
+                  for sample_group, cols_in_group in grouped_samples.items()}
+
+    # Row positions of every label from a single pass over 'C_Label', labels in order of appearance
+    label_codes, unique_labels = pd.factorize(df_iso_met['C_Label'])
+    label_order = np.argsort(label_codes, kind='stable')
+    label_positions = np.split(label_order, np.cumsum(np.bincount(label_codes, minlength=len(unique_labels)))[:-1])
+
+    # Mean of the row means and mean of the row standard deviations of every label and sample group
+    # (labels x groups), from the row statistics of all rows summed per label code
+    label_means = np.empty((len(unique_labels), len(grouped_samples)))
+    label_stds = np.empty((len(unique_labels), len(grouped_samples)))
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        for group_index, sample_group in enumerate(grouped_samples):
+            _, row_means, row_vars = nan_row_stats(sample_values[:, group_cols[sample_group]])
+            for out, row_stat in ((label_means, row_means), (label_stds, np.sqrt(row_vars))):
+                valid = ~np.isnan(row_stat)
+                stat_sums = np.bincount(label_codes, weights=np.where(valid, row_stat, 0), minlength=len(unique_labels))
+                out[:, group_index] = stat_sums / np.bincount(label_codes, weights=valid, minlength=len(unique_labels))
+
+    # Skip the isotopologues with all values zero across all sample groups, found for all labels at once
+    plotted_labels = np.flatnonzero(~(label_means == 0).all(axis=1))
+
+    # Collect the bar of every sample group for the isotopologues that are not all zero
+    for label_index in plotted_labels:
+        label = unique_labels[label_index]
+        label_rows = sample_values[label_positions[label_index]]
+
+        for group_index, (sample_group, cols_in_group) in enumerate(grouped_samples.items()):
+            label_values = label_rows[:, group_cols[sample_group]]
+            mean_for_label = label_means[label_index, group_index]
+            std_for_label = label_stds[label_index, group_index]
+
+            # One hover line per non-missing value, row by row, straight from the array
+            hover_text = "<br>".join([f"M{label}, {col}: {value:.3f}"
+                                      for row in label_values
+                                      for col, value in zip(cols_in_group, row) if not np.isnan(value)])
+            hover_text += f"<br>Average: {mean_for_label:.3f} ± {std_for_label:.3f}"  # Add mean and error
 
-    # Iterate through every isotopologue for the metabolite data
-    for label in df_iso_met['C_Label'].unique():
-        # Check if all values are zero across all sample groups for this C_Label
-        all_zero = True
-        for sample_group, cols_in_group in grouped_samples.items():
-            data_for_label = df_iso_met[df_iso_met['C_Label'] == label][cols_in_group]
-            mean_for_label = data_for_label.mean(axis=1).mean()
-            
-            if mean_for_label != 0:  # If any mean is non-zero, set all_zero to False and exit loop
-                all_zero = False
-                break
+            bars = group_bars[sample_group]
+            bars['x'].append(f'<br>M{label}')
+            bars['y'].append(mean_for_label)
+            bars['error'].append(std_for_label)
+            bars['hovertext'].append(hover_text)
+
+    # Adding one trace per sample group to the figure in a single call, each group keeps its own offset
+    # and color and shows up once in the legend
+    traces = []
+    for sample_group_index, (sample_group, bars) in enumerate(group_bars.items()):
+        if not bars['x']:
+            continue
+
+        color = iso_color_palette[sample_group_index % len(iso_color_palette)]
         
-        if all_zero:
-            continue  # Skip the rest of the code in this iteration and move to the next label
+        # Offset calculation
+        offset = ((sample_group_index - len(grouped_samples) / 2) * (settings['barwidth'] + settings['bargap']) + 0.05)
         
-        # Proceed to plotting if not all values are zero
-        for sample_group_index, (sample_group, cols_in_group) in enumerate(grouped_samples.items()):
-            color = iso_color_palette[sample_group_index % len(iso_color_palette)]
-             
-            data_for_label = df_iso_met[df_iso_met['C_Label'] == label][cols_in_group]
-            
-            # Calculate mean and std deviation across the group columns
-            mean_for_label = data_for_label.mean(axis=1).mean()
-            std_for_label = data_for_label.std(axis=1).mean()
-            
-            # Offset calculation
-            offset = ((sample_group_index - len(grouped_samples) / 2) * (settings['barwidth'] + settings['bargap']) + 0.05)
-            
-            # Determine whether to show this trace in the legend
-            show_in_legend = sample_group not in encountered_groups
-            encountered_groups.add(sample_group)
-            
-            hover_data = data_for_label.stack().reset_index()  # Using stack() to get each sample's data
-            hover_text_list = [f"M{label}, {row['level_1']}: {row[0]:.3f}" for _, row in hover_data.iterrows()]
-            hover_text = "<br>".join(hover_text_list)
-            hover_text += f"<br>Average: {mean_for_label:.3f} ± {std_for_label:.3f}"  # Add mean and error
-
-            # Adding trace to the figure
-            fig.add_trace(go.Bar(
-                name=sample_group if show_in_legend else None,
-                x=[f'<br>M{label}'],
-                offset=offset,
-                y=[mean_for_label],
-                error_y=dict(type='data', array=[std_for_label], visible=True),
-                marker_color=color,
-                width=settings['barwidth'],
-                showlegend=show_in_legend,
-                hoverinfo='text',
-                hovertext=hover_text
-            ))
+        traces.append(go.Bar(
+            name=sample_group,
+            x=bars['x'],
+            offset=offset,
+            y=np.asarray(bars['y'], dtype=np.float64),
+            error_y=dict(type='data', array=np.asarray(bars['error'], dtype=np.float64), visible=True),
+            marker_color=color,
+            width=settings['barwidth'],
+            showlegend=True,
+            hoverinfo='text',
+            hovertext=bars['hovertext']
+        ))
+    fig.add_traces(traces)
             
     # Updating layout of the Plotly graph
     fig.update_layout(
@@ -1796,61 +1970,62 @@ def add_p_value_annotations_iso_distribution(fig, df_iso_met, met_name, grouped_
     # Identify unique group labels (like 'M0', 'M1', etc.)
     group_labels = df_iso_met['C_Label'].unique()
 
-    for label in group_labels:
-        # Calculate the index of the current label
-        label_index = np.where(group_labels == label)[0][0]
-        # Filter DataFrame for the current label
-        df_label = df_iso_met[df_iso_met['C_Label'] == label]
-
+    # Group names in order and the number of groups, looked up once for all labels and pairs
+    group_list = list(grouped_samples.keys())
+    total_groups = len(group_list)
+
+    # Numeric values of the first row of every label (rows in the order of group_labels, missing values as 0),
+    # with the column positions of each group
+    sample_columns = list(dict.fromkeys(all_grouped_columns))
+    col_to_pos = {col: i for i, col in enumerate(sample_columns)}
+    label_values = (df_iso_met.groupby('C_Label', sort=False).head(1)[sample_columns].fillna(0)
+                    .apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64))
+    group_cols = [np.asarray([col_to_pos[col] for col in grouped_samples[group_key]], dtype=np.int64) for group_key in group_list]
+
+    # P-values of all labels for each pair from one Welch's t-test over the zero-filtered values
+    label_values_nonzero = np.where(label_values != 0, label_values, np.nan)
+    pair_pvalues = [welch_ttest_rows(label_values_nonzero[:, group_cols[column_pair[0]]], label_values_nonzero[:, group_cols[column_pair[1]]])
+                    for column_pair in array_columns]
+
+    # The index of each label is its position among the unique labels, the shapes and annotations
+    # of all labels and comparisons are collected
+    shapes, annotations = [], []
+    for label_index, label in enumerate(group_labels):
         for index, column_pair in enumerate(array_columns):
-            group_list = list(grouped_samples.keys())
-
-            # Access the group names using the indices provided by column_pair
-            group1_key = group_list[column_pair[0]]
-            group2_key = group_list[column_pair[1]]
-
-            # Now use the keys to get the sample names from the grouped_samples dictionary
-            group1_sample_names = grouped_samples[group1_key]
-            group2_sample_names = grouped_samples[group2_key]
-            
             # Extract the relevant columns for each group
-            y0_data = df_label[group1_sample_names].fillna(0)
-            y1_data = df_label[group2_sample_names].fillna(0)
-            
-            y0_data = y0_data.iloc[0]
-            y1_data = y1_data.iloc[0]
+            y0_data = label_values[label_index, group_cols[column_pair[0]]]
+            y1_data = label_values[label_index, group_cols[column_pair[1]]]
 
-            # Convert data to numeric and calculate p-value annotation
-            y0_data = pd.to_numeric(y0_data, errors='coerce')
-            y1_data = pd.to_numeric(y1_data, errors='coerce')
-            symbol = calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met_name, corrected_pvalues, numerical_present, label)
+            # Calculate p-value annotation from the precomputed p-value
+            symbol = calculate_metabolomics_pvalue_and_display(y0_data, y1_data, column_pair, met_name, corrected_pvalues, numerical_present, label,
+                                                               pvalue=float(pair_pvalues[index][label_index]))
 
             # Add p-value shapes and annotations
             # Calculate the x-coordinates based on the label's position in the plot
-            x_coord1 = calculate_x_coordinate_for_label(label_index, group1_key, grouped_samples, settings)
-            x_coord2 = calculate_x_coordinate_for_label(label_index, group2_key, grouped_samples, settings)
-            add_pvalue_shapes_and_annotations(fig, index, [x_coord1, x_coord2], symbol, settings, y_range, adjusted_text_offset, color)
+            x_coord1 = calculate_x_coordinate_for_label(label_index, column_pair[0], total_groups, settings)
+            x_coord2 = calculate_x_coordinate_for_label(label_index, column_pair[1], total_groups, settings)
+            add_pvalue_shapes_and_annotations(fig, index, [x_coord1, x_coord2], symbol, settings, y_range, adjusted_text_offset, color,
+                                              shapes=shapes, annotations=annotations)
+
+    # Add all p-value shapes and annotations in a single layout update
+    fig.update_layout(shapes=fig.layout.shapes + tuple(shapes), annotations=fig.layout.annotations + tuple(annotations))
 
     return fig
         
         
-def calculate_x_coordinate_for_label(label_index, group_key, grouped_samples, settings):
+def calculate_x_coordinate_for_label(label_index, group_index, total_groups, settings):
     """
     Calculate the x-coordinate for a specific bar in a grouped bar plot.
 
     Parameters:
     label_index (int): The index of the label (e.g., 0 for "M0", 1 for "M1", etc.)
-    group_key (str): The key of the sample group.
-    grouped_samples (dict): Dictionary of grouped samples.
+    group_index (int): The index of the sample group in the grouped samples.
+    total_groups (int): The number of sample groups.
     settings (dict): Dictionary containing 'barwidth' and 'bargap' settings.
 
     Returns:
     float: The calculated x-coordinate for the bar.
     """
-    # Convert the group key to a numeric index
-    group_index = list(grouped_samples.keys()).index(group_key)
-    total_groups = len(grouped_samples)
-
     # Base x-coordinate for the label (assuming each label is 1 unit apart)
     base_x = label_index
 
@@ -1888,12 +2063,12 @@ def generate_single_lingress_plot(df_met_data, df_var_data, settings):
     met_name = df_met_data['Compound'].iloc[0]
     var_name = df_var_data['Variable'].iloc[0]
     
-    # Extract the relevant data only
-    met_values = df_met_data.iloc[0, 2:].astype(float)
-    var_values = df_var_data.iloc[0, 1:].astype(float)
+    # Extract the relevant data only, as float arrays paired by sample position
+    met_values = df_met_data.iloc[0, 2:].to_numpy(dtype=float)
+    var_values = df_var_data.iloc[0, 1:].to_numpy(dtype=float)
     
     # Filter out NaN values and ensure equal lengths
-    valid_indices = (~var_values.isna()) & (~met_values.isna())
+    valid_indices = ~(np.isnan(var_values) | np.isnan(met_values))
     var_values_filtered = var_values[valid_indices]
     met_values_filtered = met_values[valid_indices]
 
@@ -1901,7 +2076,7 @@ def generate_single_lingress_plot(df_met_data, df_var_data, settings):
     sample_names_filtered = sample_names[valid_indices]
 
     # Determine hover text for each data point
-    hover_texts = [sample_name for sample_name in sample_names_filtered]
+    hover_texts = list(sample_names_filtered)
     
     # Perform linear regression
     slope, intercept, r_value, p_value, std_err = linregress(var_values_filtered, met_values_filtered)
@@ -1974,26 +2149,26 @@ def generate_single_lingress_plot(df_met_data, df_var_data, settings):
         ),
     )
     
-    # Add annotation for stats if required
-    if settings.get('show_stats', False):
-        stats_text = (
-            f"Slope: {slope:.3f} ± {std_err:.3f}<br>"
-            f"R²: {r_value**2:.3f}<br>"
-            f"P-value: {p_value:.3g}"
-        )
-        fig.add_annotation(
-            x=0.5, y=1.05,  # Position the annotation at the top center
-            xref="paper", yref="paper",
-            text=stats_text,
-            showarrow=False,
-            font=dict(
-                family=settings['font_selector'],
-                size=settings['font_size'],
-                color="black"
-            ),
-            align="center",
-            bgcolor="white"
-        )
+    # Add annotation for stats, hidden unless required so that the settings can toggle it on the displayed plot
+    stats_text = (
+        f"Slope: {slope:.3f} ± {std_err:.3f}<br>"
+        f"R²: {r_value**2:.3f}<br>"
+        f"P-value: {p_value:.3g}"
+    )
+    fig.add_annotation(
+        x=0.5, y=1.05,  # Position the annotation at the top center
+        xref="paper", yref="paper",
+        text=stats_text,
+        showarrow=False,
+        font=dict(
+            family=settings['font_selector'],
+            size=settings['font_size'],
+            color="black"
+        ),
+        align="center",
+        bgcolor="white",
+        visible=settings.get('show_stats', False)
+    )
 
     # Regression statistics
     stats = {
@@ -2035,8 +2210,9 @@ def filter_and_order_isotopologue_data_by_met_class(df_iso, met_classes, df_clas
     # Merge the df_iso with the filtered df_class to filter and retain order
     merged_df = pd.merge(filtered_df_class, df_iso, left_on='analyte_name', right_on='Compound', how='inner')
     
-    # Sort the merged DataFrame based on the order of met_classes
-    merged_df['class_order'] = merged_df['pathway_class'].apply(lambda x: met_classes.index(x))
+    # Sort the merged DataFrame based on the order of met_classes, the position of each class comes from
+    # the codes of a categorical with met_classes as its categories (first occurrence of a repeated class)
+    merged_df['class_order'] = pd.Categorical(merged_df['pathway_class'], categories=list(dict.fromkeys(met_classes))).codes
     sorted_df = merged_df.sort_values(by=['class_order', 'analyte_name']).drop(columns=['class_order'])
     
     # Select only the columns present in df_iso for the final output
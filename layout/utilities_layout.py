@@ -2,6 +2,17 @@
 
 from dash import html, dcc
 import dash_bootstrap_components as dbc
+import pandas as pd
+
+
+# Styles shared by the options and tooltips of the metabolite class checklist, created once and reused
+# by every option (the components only read them)
+_INFO_ICON_STYLE = {'border': '5px solid transparent', 'cursor': 'pointer', 'marginRight': '5px'}
+_TOOLTIP_CONTENT_STYLE = {"textAlign": "center", "whiteSpace": "pre-line"}
+_TOOLTIP_DELAY = {"show": 500, "hide": 250}  # delay showing and hiding the tooltip (in milliseconds)
+
+# Default of the modal state lookup in map_button_to_modal for buttons without a modal
+_MISSING_MODAL_STATE = object()
 
 
 def generate_classes_checklist_options_with_met_names(df_met_group_list):
@@ -24,20 +35,26 @@ def generate_classes_checklist_options_with_met_names(df_met_group_list):
       and is targeted at the corresponding info icon included with each pathway class checklist option.
 
     The function groups the DataFrame by 'pathway_class' and iterates over the groups to create a checklist option and tooltip for each.
-    The metabolites are listed in the tooltip content, separated by line breaks.
+    The metabolites are listed in the tooltip content, one per line.
     """
     
+    # Metabolites of each pathway class in order of appearance, collected in a single pass over the two columns
+    # (rows without a pathway class are left out, as groupby does)
+    pathway_metabolites = {}
+    for pathway, metabolite in zip(df_met_group_list['pathway_class'].to_numpy(), df_met_group_list['analyte_name'].to_numpy()):
+        if pd.isna(pathway):
+            continue
+        pathway_metabolites.setdefault(pathway, []).append(metabolite)
+
     options_with_tooltips = []
     tooltips = []
-    for idx, (pathway, metabolites) in enumerate(df_met_group_list.groupby('pathway_class', sort=False)['analyte_name'].apply(list).items()):
+    for idx, (pathway, metabolites) in enumerate(pathway_metabolites.items()):
         tooltip_id = f"tooltip-{idx}"
         option_label = html.Div(
             [
                 # Add tooltip with two spaces for spacing then the pathway name.
-                html.I(className="fa fa-info-circle", id=tooltip_id, style = {'border': '5px solid transparent', 
-                                                                              'cursor': 'pointer',
-                                                                              'marginRight': '5px'}),
-                html.Span(pathway),  # The text of the option
+                html.I(className="fa fa-info-circle", id=tooltip_id, style=_INFO_ICON_STYLE),
+                pathway,  # The text of the option, a plain string child of the flex container instead of a Span component
             ],
             className="met-class-option-label",  # Additional style to align items
         )
@@ -45,18 +62,15 @@ def generate_classes_checklist_options_with_met_names(df_met_group_list):
         option = {"label": option_label, "value": pathway}
         options_with_tooltips.append(option)
 
-        tooltip_content_children = []
-        for metabolite in metabolites:
-            tooltip_content_children.extend([html.Span(metabolite), html.Br()])  # Add metabolite and line break
-            
-        # The tooltip's content division with text aligned to center
-        tooltip_content = html.Div(tooltip_content_children, style={"textAlign": "center"})
+        # The tooltip's content division with text aligned to center, the metabolites as a single text
+        # with one metabolite per line instead of a Span and a line break component per metabolite
+        tooltip_content = html.Div("\n".join(map(str, metabolites)), style=_TOOLTIP_CONTENT_STYLE)
         
         tooltip = dbc.Tooltip(
             tooltip_content,
             target=tooltip_id,
             placement="bottom",
-            delay={"show": 500, "hide": 250},  # delay showing and hiding the tooltip (in milliseconds)
+            delay=_TOOLTIP_DELAY,
         )
         tooltips.append(tooltip)
 
@@ -118,14 +132,7 @@ def generate_available_dropdown_options(selected_value, all_values):
     list
         A list of dictionaries specifying the label, value, and disabled status of each option.
     '''
-    options = []
-    for value in all_values:
-        options.append({
-            'label': value, 
-            'value': value, 
-            'disabled': value == selected_value
-        })
-    return options
+    return [{'label': value, 'value': value, 'disabled': value == selected_value} for value in all_values]
 
 
 def map_button_to_modal(button_id, current_modal_states):
@@ -151,7 +158,9 @@ def map_button_to_modal(button_id, current_modal_states):
     The function assumes that the `button_id` provided is correctly mapped to a modal's visibility state 
     within the `current_modal_states` dictionary.
     """
-    if button_id in current_modal_states:
-        current_modal_states[button_id] = not current_modal_states[button_id]  # Toggle state
+    # Single lookup, with a sentinel so that a modal whose state is still None is toggled too
+    modal_state = current_modal_states.get(button_id, _MISSING_MODAL_STATE)
+    if modal_state is not _MISSING_MODAL_STATE:
+        current_modal_states[button_id] = not modal_state  # Toggle state
     return current_modal_states
 
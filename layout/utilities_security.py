@@ -3,10 +3,17 @@
 
 import datetime
 import base64
+import binascii
 import io
+import re
+import numpy as np
 import pandas as pd
 
 
+# Characters that are not allowed in the column headers of the uploaded sheets
+_INVALID_HEADER_CHARS = re.compile(r'[\'"]')
+
+
 def current_timestamp():
     """
     Gets the current timestamp for logging purposes.
@@ -30,34 +37,57 @@ def decode_contents(contents):
     try:
         content_type, content_string = contents.split(',')
         decoded = base64.b64decode(content_string)
-    except:
+    except (AttributeError, TypeError, ValueError, binascii.Error) as e:
         error_message = "Error with decoding contents."
         print(current_timestamp(), error_message)
-        raise ValueError(error_message)
+        raise ValueError(error_message) from e
         
     return decoded
 
 
-def read_excel_file(decoded_content, required_sheet):
+def open_excel_file(decoded_content):
     """
-    Reads the specified sheet from a decoded Excel file into a DataFrame.
+    Opens a decoded Excel file once so that several of its sheets can be read without parsing it again.
 
     Parameters:
         decoded_content (bytes): The decoded content of an Excel file.
-        required_sheet (str): The name of the sheet to be extracted from the Excel file.
 
     Returns:
-        pd.DataFrame: Data from the required sheet as a pandas DataFrame.
+        pd.ExcelFile: The opened Excel file.
     
     Raises:
-        ValueError: If the required sheet is not present in the Excel file.
+        ValueError: If the uploaded file can not be read as an Excel file.
     """
     try:
         xls = pd.ExcelFile(io.BytesIO(decoded_content))
-    except:
+    except Exception as e:
+        # The Excel readers raise many different exception types for files they can not read
         error_message = "Error with reading the uploaded file."
         print(current_timestamp(), error_message)
-        raise ValueError(error_message)
+        raise ValueError(error_message) from e
+    
+    return xls
+
+
+def read_excel_file(decoded_content, required_sheet):
+    """
+    Reads the specified sheet from a decoded Excel file into a DataFrame.
+
+    Parameters:
+        decoded_content (bytes or pd.ExcelFile): The decoded content of an Excel file, or the Excel file
+            already opened with open_excel_file.
+        required_sheet (str): The name of the sheet to be extracted from the Excel file.
+
+    Returns:
+        pd.DataFrame: Data from the required sheet as a pandas DataFrame.
+    
+    Raises:
+        ValueError: If the file can not be read or the required sheet is not present in the Excel file.
+    """
+    if isinstance(decoded_content, pd.ExcelFile):
+        xls = decoded_content
+    else:
+        xls = open_excel_file(decoded_content)
         
     if required_sheet not in xls.sheet_names:
         error_message = f"\nNo '{required_sheet}' sheet found in the uploaded file."
@@ -121,16 +151,38 @@ def clean_column_headers(df):
     Raises:
         ValueError: If column names contain invalid characters such as quotes.
     """
-    df.columns = df.columns.str.replace(r'\s+', '', regex=True).str.strip()
-    invalid_chars = ["'", '"', '\"']
-    for char in invalid_chars:
-        if df.columns.str.contains(char).any():
-            error_message = f"Sample names should not have '{char}' characters."
-            print(current_timestamp(), error_message)
-            raise ValueError(error_message)
+    # Removing all whitespace also covers the leading and trailing whitespace
+    df.columns = df.columns.str.replace(r'\s+', '', regex=True)
+    
+    # One scan of the headers for both quote characters, the offending one is looked up for the message
+    if df.columns.str.contains(_INVALID_HEADER_CHARS).any():
+        char = "'" if df.columns.str.contains("'", regex=False).any() else '"'
+        error_message = f"Sample names should not have '{char}' characters."
+        print(current_timestamp(), error_message)
+        raise ValueError(error_message)
     return df
 
 
+def c_label_is_empty(c_label):
+    """
+    Checks whether a 'C_Label' column holds no labels, meaning all of its values are NaN or all of them are 0.
+
+    Parameters:
+        c_label (pd.Series): The 'C_Label' column of the isotopologue data.
+
+    Returns:
+        bool: True if all values are NaN or all values are 0.
+    """
+    try:
+        c_label_values = c_label.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        # Labels that are not numeric are compared as they are
+        return c_label.isna().all() or (c_label == 0).all()
+    
+    # Straight on the float array, a NaN counts as a non-zero value for any()
+    return np.isnan(c_label_values).all() or not c_label_values.any()
+
+
 def process_pool_data(contents, filename, compound_column_name="Compound"):
     """
     Processes pool data from an uploaded Excel file. This function ensures the file contains the expected 
@@ -142,7 +194,7 @@ def process_pool_data(contents, filename, compound_column_name="Compound"):
         compound_column_name (str): Name of the column to check for in the pool data.
 
     Returns:
-        str: A JSON string representing the processed DataFrame if all validation checks pass.
+        pd.DataFrame: The processed DataFrame if all validation checks pass.
     """
     decoded_content = decode_contents(contents)
     df_pool = read_excel_file(decoded_content, 'PoolAfterDF')
@@ -151,7 +203,7 @@ def process_pool_data(contents, filename, compound_column_name="Compound"):
     df_pool = clean_compound_column(df_pool, compound_column_name)
     
 
-    return df_pool.to_json(date_format='iso', orient='split')
+    return df_pool
 
 
 def process_iso_data(contents, filename, stored_pool_data, compound_column_name="Compound"):
@@ -162,11 +214,11 @@ def process_iso_data(contents, filename, stored_pool_data, compound_column_name=
     Parameters:
         contents (str): Content of the uploaded file in base64 format.
         filename (str): Original name of the uploaded file for reference.
-        stored_pool_data (str): A JSON string representing previously stored pool data.
+        stored_pool_data (str): Cache key of the previously stored pool data.
         compound_column_name (str): Name of the column to check for in the isotopic data.
 
     Returns:
-        str: A JSON string representing the processed isotopic DataFrame if all validation checks pass, or None if 'Normalized' sheet is not present.
+        pd.DataFrame: The processed isotopic DataFrame if all validation checks pass, or None if 'Normalized' sheet is not present.
     """
     
     decoded_content = decode_contents(contents)
@@ -183,11 +235,11 @@ def process_iso_data(contents, filename, stored_pool_data, compound_column_name=
     
     # Check if 'C_Label' column exists and all its values are 0 or NaN
     if 'C_Label' in df_iso.columns:
-        if df_iso['C_Label'].isna().all() or (df_iso['C_Label'] == 0).all():
+        if c_label_is_empty(df_iso['C_Label']):
             return None
 
         else:
-            return df_iso.to_json(date_format='iso', orient='split')
+            return df_iso
         
     else:
         return None
@@ -202,24 +254,33 @@ def process_lingress_data(contents, filename, stored_pool_data, variable_column_
     Parameters:
         contents (str): Content of the uploaded file in base64 format.
         filename (str): Original name of the uploaded file for reference.
-        stored_pool_data (str): A JSON string representing previously stored pool data.
+        stored_pool_data (str): Cache key of the previously stored pool data.
         compound_column_name (str): Name of the column to check for in the isotopic data.
 
     Returns:
-        str: A JSON string representing the processed isotopic DataFrame if all validation checks pass, or None if 'Normalized' sheet is not present.
+        pd.DataFrame: The processed external variable DataFrame if all validation checks pass, or None if 'Lingress' sheet is not present.
     """
     
     decoded_content = decode_contents(contents)
     
+    # Open the uploaded file once for both sheets, and return early if either sheet is not in it
     try:
-        df_pool = read_excel_file(decoded_content, 'PoolAfterDF')
+        xls = open_excel_file(decoded_content)
+    except ValueError:
+        return None
+    
+    if not {'PoolAfterDF', 'Lingress'} <= set(xls.sheet_names):
+        return None
+    
+    try:
+        df_pool = read_excel_file(xls, 'PoolAfterDF')
     except ValueError:
         # If 'PoolAfterDF' sheet is not found in the Excel file, return None
         # No pool data found in the uploaded sheet
         return None
 
     try:
-        df_lingress = read_excel_file(decoded_content, 'Lingress')
+        df_lingress = read_excel_file(xls, 'Lingress')
     except ValueError:
         # If 'Lingress' sheet is not found in the Excel file, return None
         return None
@@ -227,13 +288,9 @@ def process_lingress_data(contents, filename, stored_pool_data, variable_column_
     df_pool = clean_column_headers(df_pool)
     df_lingress = clean_column_headers(df_lingress)
     
-    # Exclude the first column and get the remaining column names for both DataFrames
-    pool_columns = list(df_pool.columns[1:])
-    lingress_columns = list(df_lingress.columns[1:])
-
-    # Compare the sets of column names
-    if pool_columns == lingress_columns:
-        return df_lingress.to_json(date_format='iso', orient='split')
+    # Compare the column names of both DataFrames, excluding the first column, directly on the Index
+    if df_pool.columns[1:].equals(df_lingress.columns[1:]):
+        return df_lingress
         
     else:
         return None
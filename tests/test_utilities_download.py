@@ -0,0 +1,61 @@
+# test_utilities_download.py
+
+import numpy as np
+import pandas as pd
+from scipy.stats import linregress
+
+from layout.utilities_download import get_download_df_lingress
+
+
+IDENTICAL_X_REASON = 'Error during linregress: Cannot calculate a linear regression if all x values are identical'
+
+
+def run_lingress(var_values, met_values):
+    '''
+    Runs the download linear regression for one external variable against the given metabolite rows.
+    '''
+
+    samples = [f'sample_{i}' for i in range(len(var_values))]
+    df_var_data = pd.DataFrame([['variable'] + list(var_values)], columns=['Variable'] + samples)
+    df_pool_normalized_grouped = pd.DataFrame([[f'met_{i}'] + list(values) for i, values in enumerate(met_values)],
+                                              columns=['Compound'] + samples)
+
+    return get_download_df_lingress(df_var_data, None, ['test'], [], {'group': samples}, None,
+                                    df_pool_normalized_grouped=df_pool_normalized_grouped)
+
+
+def test_constant_non_integer_x_is_not_analyzed():
+    # The sum of square differences of [0.1, 0.1, 0.1] from their mean is not exactly zero
+    results = run_lingress([0.1, 0.1, 0.1], [[1.0, 2.0, 4.0]])
+
+    assert results.loc[0, 'ND Reason'] == IDENTICAL_X_REASON
+    assert np.isnan(results.loc[0, 'slope'])
+    assert np.isnan(results.loc[0, 'p_value (two-sided Wald Test)'])
+
+
+def test_constant_non_integer_x_after_removing_missing_values():
+    results = run_lingress([0.3, 0.3, 7.0], [[1.0, 2.0, np.nan], [1.0, 2.0, 4.0]])
+
+    assert results.loc[0, 'ND Reason'] == IDENTICAL_X_REASON
+    assert results.loc[1, 'ND Reason'] == ''
+
+
+def test_two_points_flat_line_with_non_integer_y():
+    results = run_lingress([1.0, 2.0], [[0.1, 0.1], [0.1, 0.3]])
+
+    assert results['p_value (two-sided Wald Test)'].tolist() == [1.0, 0.0]
+    assert (results['ND Reason'] == '').all()
+
+
+def test_matches_scipy_linregress():
+    var_values = [0.5, 1.5, 2.0, 3.7, 4.1]
+    met_values = [[1.2, 2.9, 4.1, 7.7, 8.0], [5.0, 3.1, 4.4, 1.0, 0.2]]
+    results = run_lingress(var_values, met_values)
+
+    for i, values in enumerate(met_values):
+        expected = linregress(var_values, values)
+        assert np.isclose(results.loc[i, 'slope'], expected.slope)
+        assert np.isclose(results.loc[i, 'intercept'], expected.intercept)
+        assert np.isclose(results.loc[i, 'r_value'], expected.rvalue)
+        assert np.isclose(results.loc[i, 'p_value (two-sided Wald Test)'], expected.pvalue)
+        assert np.isclose(results.loc[i, 'std_err'], expected.stderr)